@@ -53,6 +53,51 @@ def create_app(config_name=None):
     from app.blueprints.main import main_bp
     app.register_blueprint(main_bp)
     
+    # 출석 이벤트 구독 (메모리 스냅샷 갱신)
+    from app.services.attendance_event_service import attendance_events
+    from app.services.attendance_snapshot_service import attendance_snapshots
+    attendance_events.subscribe(attendance_snapshots.apply_events)
+    
+    # 학생 월별 출석 요약 (쓰기마다 캐시된 요약 갱신)
+    from app.services.attendance_history_service import attendance_history
+    attendance_events.subscribe(attendance_history.apply_events)
+    
+    # 홈 화면 일일 결석 카운터
+    from app.services.stats_service import stats_service
+    attendance_events.subscribe(stats_service.apply_events)
+    
+    # 통합 출석 저장소 (ATTENDANCE_DUAL_READ를 켠 경우에만 옛 attendance 테이블도 함께 읽음)
+    from app.services.attendance_store import attendance_store
+    attendance_store.dual_read = app.config['ATTENDANCE_DUAL_READ']
+    
+    # 자습 부재 이상 탐지 (출석 이벤트로 학생별 카운터 갱신)
+    from app.services.anomaly_service import anomaly_service
+    anomaly_service.configure(
+        app.config['ANOMALY_WINDOW_DAYS'], app.config['ANOMALY_MIN_ABSENCES'],
+        app.config['ANOMALY_STREAK_DAYS'], app.config['ANOMALY_PERIOD_ABSENCES'],
+        app.config['ANOMALY_PERIODS']
+    )
+    attendance_events.subscribe(anomaly_service.apply_events)
+    
+    # 좌석 현황 실시간 스트림 (적용된 출석 이벤트를 SSE 변경분으로 전달)
+    from app.services.seat_stream_service import seat_stream
+    seat_stream.configure(
+        app.config['SEAT_STREAM_BUFFER'], app.config['SEAT_STREAM_KEEPALIVE'],
+        app.config['SEAT_STREAM_MAX_SECONDS'], app.config['SEAT_STREAM_MAX_STREAMS']
+    )
+    attendance_events.subscribe(seat_stream.apply_events)
+    
+    # 학기 분석 큐브 (numpy 설치 시)
+    from app.services.attendance_cube_service import attendance_cube
+    if attendance_cube.available():
+        attendance_cube.configure(app.config['ATTENDANCE_CUBE_DIR'])
+        attendance_events.subscribe(attendance_cube.apply_events)
+    
+    # 종료된 학기 출석 기록 보관 작업
+    if app.config.get('ATTENDANCE_ARCHIVE_ENABLED'):
+        from app.services.archive_service import archive_service
+        archive_service.start(app.config['ATTENDANCE_ARCHIVE_INTERVAL_HOURS'])
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -1,7 +1,13 @@
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
-from app.utils.decorators import admin_required, permission_required, role_required
+from app.utils.decorators import admin_required, permission_required, role_required, idempotent
 from app.services.supabase_service import supabase_service
+from app.services.export_service import ExportService
+from app.services.attendance_store import attendance_store
+from app.services.attendance_history_service import attendance_history
+from app.services.stats_service import stats_service
+from app.services.attendance_cube_service import attendance_cube
+from app.services.anomaly_service import anomaly_service
 from datetime import datetime, timedelta
 from . import dashboard_bp
 
@@ -340,6 +346,7 @@ def create_class():
         
         result = supabase_service.create_class(data)
         if result:
+            stats_service.invalidate_teachers()
             return jsonify({'success': True, 'message': '학급이 성공적으로 생성되었습니다.'})
         else:
             return jsonify({'success': False, 'message': '학급 생성에 실패했습니다.'}), 500
@@ -370,6 +377,7 @@ def update_class(class_id):
         
         result = supabase_service.update_class(class_id, update_data)
         if result:
+            stats_service.invalidate_teachers()
             return jsonify({'success': True, 'message': '학급 정보가 성공적으로 수정되었습니다.'})
         else:
             return jsonify({'success': False, 'message': '학급 정보 수정에 실패했습니다.'}), 500
@@ -387,6 +395,7 @@ def delete_class(class_id):
             
         result = supabase_service.delete_class(class_id)
         if result:
+            stats_service.invalidate_teachers()
             return jsonify({'success': True, 'message': '학급이 성공적으로 삭제되었습니다.'})
         else:
             return jsonify({'success': False, 'message': '학급 삭제에 실패했습니다.'}), 500
@@ -461,6 +470,7 @@ def enroll_student():
         
         result = supabase_service.enroll_student_to_class(student_email, class_id)
         if result:
+            stats_service.invalidate_teachers()
             return jsonify({'success': True, 'message': '학생이 성공적으로 학급에 등록되었습니다.'})
         else:
             return jsonify({'success': False, 'message': '학생 등록에 실패했습니다.'}), 500
@@ -491,6 +501,7 @@ def remove_student():
         
         result = supabase_service.remove_student_from_class(student_email, class_id)
         if result:
+            stats_service.invalidate_teachers()
             return jsonify({'success': True, 'message': '학생이 성공적으로 학급에서 제거되었습니다.'})
         else:
             return jsonify({'success': False, 'message': '학생 제거에 실패했습니다.'}), 500
@@ -509,10 +520,8 @@ def get_attendance():
         period = request.args.get('period')
         
         if current_user.role == 'student':
-            # 학생은 자신의 출석 기록만 조회
-            start_date = date
-            end_date = date if date else None
-            attendance = supabase_service.get_student_attendance(current_user.email, start_date, end_date)
+            # 학생은 자신의 출석 기록만 조회 (통합 저장소, 예외 상태만 기록됨)
+            attendance = attendance_store.student_page(current_user.email, limit=100, attendance_date=date)
         else:
             # 교사, 관리자는 담당 학급 또는 전체 출석 기록 조회
             # 교사는 자신의 담임 학급만 조회 가능 (권한 체크는 서비스 레이어에서)
@@ -521,20 +530,10 @@ def get_attendance():
                 if not any(cls['id'] == class_id for cls in teacher_classes):
                     return jsonify({'success': False, 'message': '해당 학급에 대한 권한이 없습니다.'}), 403
             
-            # 출석 기록 조회 파라미터 구성
+            # 학급 출석 기록 조회 (날짜/교시 지정 가능, 기록 없는 학생은 출석)
             attendance = []
-            if class_id and date:
-                if period:
-                    # 특정 교시의 출석 기록 조회
-                    endpoint = f"attendance?class_id=eq.{class_id}&attendance_date=eq.{date}&period=eq.{period}&select=*"
-                    attendance = supabase_service._make_request('GET', endpoint, use_service_role=True)
-                else:
-                    # 특정 날짜의 모든 교시 출석 기록 조회
-                    endpoint = f"attendance?class_id=eq.{class_id}&attendance_date=eq.{date}&select=*&order=period"
-                    attendance = supabase_service._make_request('GET', endpoint, use_service_role=True)
-            elif class_id:
-                # 특정 학급의 모든 출석 기록 조회
-                attendance = supabase_service.get_attendance_records(class_id)
+            if class_id:
+                attendance = attendance_store.class_records(class_id, date, int(period) if period else None)
             
         return jsonify({'success': True, 'attendance': attendance or []})
     except Exception as e:
@@ -542,6 +541,7 @@ def get_attendance():
 
 @dashboard_bp.route('/api/attendance', methods=['POST'])
 @login_required
+@idempotent()
 def mark_attendance():
     """출석 체크"""
     try:
@@ -566,32 +566,187 @@ def mark_attendance():
                 if not any(cls['id'] == data['class_id'] for cls in teacher_classes):
                     return jsonify({'success': False, 'message': '해당 학급에 대한 권한이 없습니다.'}), 403
         
-        # 중복 출석 체크 (UPSERT 방식으로 처리)
-        existing_attendance = None
+        status = attendance_store.normalize_status(data['status'])
+        if status is None:
+            return jsonify({'success': False, 'message': f"알 수 없는 출석 상태입니다: {data['status']}"}), 400
+        
+        # 처리자는 Supabase 사용자 ID(UUID)로 기록 (Flask-Login ID는 로컬 정수 ID)
+        actor = supabase_service.get_user_by_email(current_user.email)
+        if not actor:
+            return jsonify({'success': False, 'message': '사용자 정보를 찾을 수 없습니다.'}), 403
+        
+        # 통합 저장소에 정정 이벤트로 기록 (같은 날짜/교시/학생은 한 행으로 UPSERT)
+        result = attendance_store.record(
+            data['student_email'], data['attendance_date'], int(data['period']), status,
+            class_id=data['class_id'], actor_id=actor['id'], notes=data.get('note', ''),
+            expected_version=data.get('expected_version')
+        )
+        
+        if result.get('conflict'):
+            # 화면에서 본 뒤 다른 사용자가 먼저 변경함 (현재 상태와 버전을 돌려줌)
+            return jsonify({
+                'success': False,
+                'message': result['error'],
+                'status': result['status'],
+                'version': result['version']
+            }), 409
+        
+        if result['success']:
+            # 학생 월별 요약 / 일일 통계 카운터는 출석 이벤트 리스너가 갱신
+            return jsonify({'success': True, 'message': '출석이 성공적으로 기록되었습니다.', 'version': result['version']})
+        else:
+            return jsonify({'success': False, 'message': result.get('error') or '출석 기록에 실패했습니다.'}), 500
+            
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+def _history_student_email():
+    """
+    이력 조회 대상 학생 이메일과 거절 응답
+
+    학생은 본인, 교사는 담당 학급 학생, 관리자는 student_email 파라미터의 학생만 조회할 수 있습니다.
+    """
+    if current_user.role == 'student':
+        return current_user.email, None
+    
+    student_email = request.args.get('student_email')
+    if not student_email:
+        return None, (jsonify({'success': False, 'message': '학생 이메일은 필수 항목입니다.'}), 400)
+    
+    if current_user.role in ('admin', 'super_admin'):
+        return student_email, None
+    
+    if current_user.role == 'teacher':
+        teacher_class_ids = {cls['id'] for cls in supabase_service.get_classes_by_teacher(current_user.email) or []}
+        student_classes = supabase_service.get_student_classes(student_email) or []
+        if any(row.get('class_id') in teacher_class_ids for row in student_classes):
+            return student_email, None
+    
+    return None, (jsonify({'success': False, 'message': '해당 학생에 대한 권한이 없습니다.'}), 403)
+
+@dashboard_bp.route('/api/attendance/summary', methods=['GET'])
+@login_required
+def get_attendance_summary():
+    """학생 월별 출석 요약 (상태별 건수, 최근 결석)"""
+    try:
+        student_email, denied = _history_student_email()
+        if denied:
+            return denied
+        
+        months = attendance_history.get_summary(student_email)
+        month = request.args.get('month')
+        if month:
+            months = {month: months.get(month, {'counts': {}, 'recent_absences': []})}
+        
+        return jsonify({'success': True, 'summary': months})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@dashboard_bp.route('/api/attendance/history', methods=['GET'])
+@login_required
+def get_attendance_history():
+    """학생 출석 상세 이력 (최신순 페이지 조회, cursor로 다음 페이지)"""
+    try:
+        student_email, denied = _history_student_email()
+        if denied:
+            return denied
+        
         try:
-            endpoint = f"attendance?student_email=eq.{data['student_email']}&class_id=eq.{data['class_id']}&attendance_date=eq.{data['attendance_date']}&period=eq.{data['period']}&select=*"
-            existing_records = supabase_service._make_request('GET', endpoint, use_service_role=True)
-            if existing_records and len(existing_records) > 0:
-                existing_attendance = existing_records[0]
-        except Exception:
-            pass
-        
-        if existing_attendance:
-            # 기존 출석 기록 업데이트
-            update_data = {
-                'status': data['status'],
-                'note': data.get('note', '')
-            }
-            result = supabase_service.update_attendance(existing_attendance['id'], update_data)
+            before = attendance_history.parse_cursor(request.args.get('cursor'))
+            limit = min(max(int(request.args.get('limit', 30)), 1), 100)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
+        page = attendance_history.get_history_page(student_email, before, limit)
+        return jsonify({'success': True, **page})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@dashboard_bp.route('/api/attendance/export', methods=['GET'])
+@login_required
+@role_required('teacher', 'admin', 'super_admin')
+def export_attendance():
+    """출석 기록 내보내기 (CSV/XLSX 스트리밍)"""
+    try:
+        date_from = request.args.get('from')
+        date_to = request.args.get('to') or date_from
+        export_format = request.args.get('format', 'csv')
+        # 출석 행은 저장하지 않으므로 명단에서 만들어 포함 (present=false면 예외 상태 행만)
+        include_present = request.args.get('present', 'true') != 'false'
+        
+        if not date_from:
+            return jsonify({'success': False, 'message': '시작 날짜는 필수 항목입니다.'}), 400
+        
+        try:
+            if datetime.strptime(date_from, '%Y-%m-%d') > datetime.strptime(date_to, '%Y-%m-%d'):
+                return jsonify({'success': False, 'message': '시작 날짜가 종료 날짜보다 늦습니다.'}), 400
+        except ValueError:
+            return jsonify({'success': False, 'message': '날짜 형식은 YYYY-MM-DD 입니다.'}), 400
+        
+        export_service = ExportService()
+        filename = f"attendance_{date_from}_{date_to}"
+        
+        if export_format == 'xlsx':
+            stream = export_service.iter_xlsx(date_from, date_to, include_present)
+            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        elif export_format == 'csv':
+            stream = export_service.iter_csv(date_from, date_to, include_present)
+            mimetype = 'text/csv; charset=utf-8'
         else:
-            # 새 출석 기록 생성
-            result = supabase_service.mark_attendance(data)
+            return jsonify({'success': False, 'message': '지원하지 않는 형식입니다. (csv, xlsx)'}), 400
         
-        if result:
-            return jsonify({'success': True, 'message': '출석이 성공적으로 기록되었습니다.'})
+        return Response(
+            stream_with_context(stream),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}.{export_format}'}
+        )
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@dashboard_bp.route('/api/analytics/term', methods=['GET'])
+@login_required
+@role_required('teacher', 'admin', 'super_admin')
+def get_term_analytics():
+    """학기 출석 분석 (학급별 부재율, 상습 부재 학생, 요일/교시 히트맵)"""
+    try:
+        if not attendance_cube.available():
+            return jsonify({'success': False, 'message': '분석 기능을 사용하려면 numpy가 필요합니다.'}), 503
+        
+        report = request.args.get('report', 'classes')
+        grade = request.args.get('grade', type=int)
+        class_number = request.args.get('class_number', type=int)
+        
+        if request.args.get('refresh') and current_user.role in ['admin', 'super_admin']:
+            attendance_cube.rebuild()
+        
+        if report == 'classes':
+            result = attendance_cube.class_absence_rates(grade)
+        elif report == 'chronic':
+            threshold = request.args.get('threshold', 10, type=float) / 100
+            result = attendance_cube.chronic_absentees(threshold)
+        elif report == 'heatmap':
+            result = attendance_cube.period_heatmap(grade, class_number)
         else:
-            return jsonify({'success': False, 'message': '출석 기록에 실패했습니다.'}), 500
-            
+            return jsonify({'success': False, 'message': '지원하지 않는 분석입니다. (classes, chronic, heatmap)'}), 400
+        
+        return jsonify({'success': True, 'report': report, 'result': result})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@dashboard_bp.route('/api/analytics/anomalies', methods=['GET'])
+@login_required
+@role_required('teacher', 'admin', 'super_admin')
+def get_absence_anomalies():
+    """자습 반복 부재 학생 (최근 기간 부재/연속 부재/같은 교시 부재 기준)"""
+    try:
+        grade = request.args.get('grade', type=int)
+        students = anomaly_service.get_flagged(grade)
+        
+        return jsonify({
+            'success': True,
+            'thresholds': anomaly_service.thresholds(),
+            'students': students
+        })
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -709,21 +864,17 @@ def get_home_stats():
                     'total_admins': 4
                 }
         elif current_user.role == 'teacher':
-            # 교사 통계 (담당 학급)
-            stats = {
-                'my_classes': 2,       # 실제로는 담당 학급 수
-                'my_students': 45,     # 실제로는 담당 학생 수
-                'today_attendance': 42, # 실제로는 오늘 출석한 학생 수
-                'pending_tasks': 3     # 실제로는 처리할 업무 수
-            }
+            # 교사 통계 (담당 학급 카운터)
+            stats = stats_service.teacher_stats(current_user.email)
+            stats['pending_tasks'] = 3     # 실제로는 처리할 업무 수
         else:  # student
-            # 학생 통계
-            stats = {
-                'my_attendance_rate': 95,  # 실제로는 출석률
+            # 학생 통계 (이번 학기 출석률)
+            stats = stats_service.student_stats(current_user.email)
+            stats.update({
                 'total_classes': 8,        # 실제로는 수강 과목 수
                 'completed_assignments': 12, # 실제로는 완료한 과제 수
                 'upcoming_events': 2       # 실제로는 예정된 이벤트 수
-            }
+            })
         
         return jsonify({'success': True, 'stats': stats})
     except Exception as e:
@@ -1,15 +1,25 @@
-from flask import render_template, request, jsonify, current_app
+from flask import render_template, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from datetime import datetime, date
 import logging
 
-from app.utils.decorators import role_required
+from app.utils.decorators import role_required, idempotent
 from app.services.seating_service import SeatingService
 from app.services.attendance_service import AttendanceService
+from app.services.supabase_service import SupabaseService
+from app.services.seat_version_service import seat_versions
+from app.services.seat_stream_service import seat_stream
+from app.services.seat_board_service import seat_board
+from app.services.auto_seating_service import auto_seating
+from app.services.student_directory_service import student_directory
+from app.services.period_service import PeriodService
 from . import seating_bp
 
 logger = logging.getLogger(__name__)
 
+# 일괄 부재/복귀 처리 1회 최대 항목 수
+MAX_BATCH_ITEMS = 200
+
 @seating_bp.route('/')
 @login_required
 @role_required(['teacher', 'admin', 'super_admin'])
@@ -31,164 +41,33 @@ def seating_main():
 @login_required
 @role_required(['teacher', 'admin', 'super_admin'])
 def get_seat_arrangement():
-    """자리배치 정보 조회 API (Week 2 시각화용)"""
+    """자리배치/출석 현황 조회 API (배열 기반 압축 형식, app/utils/seat_payload.py 참고)"""
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
         
-        grade = data.get('grade', 1)
-        arrangement_date = data.get('date', date.today().isoformat())
-        period = data.get('period', 1)
+        classroom = data.get('classroom') or f"grade_{int(data.get('grade', 1))}"
+        target_date = datetime.strptime(data.get('date') or date.today().isoformat(), '%Y-%m-%d').date()
+        period = int(data.get('period', 1))
         
-        # Week 2 시각화 테스트용 샘플 데이터
-        sample_data = {
-            'success': True,
-            'grade': grade,
-            'date': arrangement_date,
-            'period': period,
-            'sections': [
-                {
-                    'name': f'{grade}-A섹션',
-                    'rows': [
-                        {
-                            'seats': [
-                                {
-                                    'position': f'{grade}-A-L1',
-                                    'student': {
-                                        'id': '1',
-                                        'name': '김철수',
-                                        'student_number': f'{grade}1001'
-                                    },
-                                    'attendance_status': 'present',
-                                    'activity': None
-                                },
-                                {
-                                    'position': f'{grade}-A-R1',
-                                    'student': {
-                                        'id': '2',
-                                        'name': '이영희',
-                                        'student_number': f'{grade}1002'
-                                    },
-                                    'attendance_status': 'absent',
-                                    'activity': None
-                                },
-                                {
-                                    'position': f'{grade}-A-L3',
-                                    'student': {
-                                        'id': '6',
-                                        'name': '홍길동',
-                                        'student_number': f'{grade}1006'
-                                    },
-                                    'attendance_status': 'present',
-                                    'activity': None
-                                }
-                            ]
-                        },
-                        {
-                            'seats': [
-                                {
-                                    'position': f'{grade}-A-L2',
-                                    'student': {
-                                        'id': '3',
-                                        'name': '박민수',
-                                        'student_number': f'{grade}1003'
-                                    },
-                                    'attendance_status': 'activity',
-                                    'activity': '분임토의실'
-                                },
-                                {
-                                    'position': f'{grade}-A-R2',
-                                    'student': {
-                                        'id': '7',
-                                        'name': '강감찬',
-                                        'student_number': f'{grade}1007'
-                                    },
-                                    'attendance_status': 'activity',
-                                    'activity': '도서관'
-                                },
-                                {
-                                    'position': f'{grade}-A-L4',
-                                    'student': None,
-                                    'attendance_status': 'empty',
-                                    'activity': None
-                                }
-                            ]
-                        }
-                    ]
-                },
-                {
-                    'name': f'{grade}-B섹션',
-                    'rows': [
-                        {
-                            'seats': [
-                                {
-                                    'position': f'{grade}-B-L1',
-                                    'student': {
-                                        'id': '4',
-                                        'name': '최지현',
-                                        'student_number': f'{grade}1004'
-                                    },
-                                    'attendance_status': 'present',
-                                    'activity': None
-                                },
-                                {
-                                    'position': f'{grade}-B-R1',
-                                    'student': {
-                                        'id': '5',
-                                        'name': '정하늘',
-                                        'student_number': f'{grade}1005'
-                                    },
-                                    'attendance_status': 'absent',
-                                    'activity': None
-                                },
-                                {
-                                    'position': f'{grade}-B-L3',
-                                    'student': {
-                                        'id': '8',
-                                        'name': '윤보선',
-                                        'student_number': f'{grade}1008'
-                                    },
-                                    'attendance_status': 'present',
-                                    'activity': None
-                                }
-                            ]
-                        },
-                        {
-                            'seats': [
-                                {
-                                    'position': f'{grade}-B-L2',
-                                    'student': {
-                                        'id': '9',
-                                        'name': '서장훈',
-                                        'student_number': f'{grade}1009'
-                                    },
-                                    'attendance_status': 'present',
-                                    'activity': None
-                                },
-                                {
-                                    'position': f'{grade}-B-R2',
-                                    'student': {
-                                        'id': '10',
-                                        'name': '김유신',
-                                        'student_number': f'{grade}1010'
-                                    },
-                                    'attendance_status': 'activity',
-                                    'activity': '상담실'
-                                },
-                                {
-                                    'position': f'{grade}-B-L4',
-                                    'student': None,
-                                    'attendance_status': 'empty',
-                                    'activity': None
-                                }
-                            ]
-                        }
-                    ]
-                }
-            ]
-        }
+        # 교실/날짜/교시별로 미리 만든 보드에서 변환 (출석/배치가 바뀐 뒤 처음 읽을 때만 다시 생성)
+        entry = seat_board.get(classroom, target_date, period)
+        if entry is None:
+            return jsonify({
+                'success': False,
+                'error': '교실 레이아웃을 찾을 수 없습니다.'
+            }), 404
         
-        return jsonify(sample_data)
+        # POST라 브라우저가 조건부 요청을 보내지 않으므로 ETag 없이 캐시된 압축 JSON을 그대로 반환
+        # (조건부 재검증이 필요하면 GET /seating/api/board 사용)
+        response = Response(seat_board.compact(entry), mimetype='application/json')
+        response.headers['Cache-Control'] = 'no-store'
+        return response
         
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'error': '요청 값이 올바르지 않습니다.'
+        }), 400
     except Exception as e:
         logger.error(f"자리배치 조회 에러: {str(e)}")
         return jsonify({
@@ -204,7 +83,7 @@ def get_attendance_status():
     try:
         attendance_date = request.args.get('date', date.today().isoformat())
         period = request.args.get('period', type=int)
-        classroom = request.args.get('classroom', 'grade_1')
+        classroom = request.args.get('classroom')  # 없으면 전교생
         
         if not period:
             return jsonify({
@@ -212,21 +91,29 @@ def get_attendance_status():
                 'error': '교시 정보가 필요합니다.'
             }), 400
             
-        supabase = SupabaseService()
-        
-        # 출석 상태 조회
-        attendance_records = supabase.get_attendance_records(attendance_date, period, classroom)
+        # 예외 상태(부재/복귀/활동)만 저장되므로 출석 인원은 명단과 교시 설정으로 계산
+        # 상태별 목록과 활동 목록은 스냅샷 한 번으로 함께 구성
+        result = AttendanceService().get_period_status(attendance_date, period, classroom)
+        if not result['success']:
+            return jsonify({
+                'success': False,
+                'error': '출석 상태를 조회할 수 없습니다.'
+            }), 500
         
-        # 활동 정보 조회 (분임토의실 등)
-        activity_records = supabase.get_activity_records(attendance_date, period)
+        scheduled = period in PeriodService().scheduled_periods(attendance_date)
+        counts = dict(result['counts'])
+        if not scheduled:
+            counts['present'] = 0
         
         return jsonify({
             'success': True,
             'date': attendance_date,
             'period': period,
             'classroom': classroom,
-            'attendance': attendance_records,
-            'activities': activity_records
+            'scheduled': scheduled,
+            'counts': counts,
+            'attendance': result['attendance_status'],
+            'activities': result['activities']
         })
         
     except Exception as e:
@@ -411,9 +298,10 @@ def save_seat_arrangement():
                 'error': '필수 정보가 누락되었습니다.'
             }), 400
             
-        supabase = SupabaseService()
+        # 바뀐 위치만 저장하고 자리배치 버전/교실 명단 캐시를 무효화
+        seating_service = SeatingService()
         
-        result = supabase.save_seat_arrangements(
+        result = seating_service.save_seat_arrangements(
             classroom=classroom,
             arrangement_date=arrangement_date,
             arrangements=arrangements,
@@ -422,7 +310,10 @@ def save_seat_arrangement():
         
         return jsonify({
             'success': result['success'],
-            'message': '자리배치가 성공적으로 저장되었습니다.' if result['success'] else result['error']
+            'message': '자리배치가 성공적으로 저장되었습니다.' if result['success'] else result['error'],
+            'touched_rows': result.get('touched_rows', 0),
+            'upserted': result.get('upserted', 0),
+            'deleted': result.get('deleted', 0)
         })
         
     except Exception as e:
@@ -432,6 +323,100 @@ def save_seat_arrangement():
             'error': '자리배치 저장 중 오류가 발생했습니다.'
         }), 500
 
+@seating_bp.route('/api/admin/auto-arrange', methods=['POST'])
+@login_required
+@role_required(['admin', 'super_admin'])
+def auto_arrange_seats():
+    """자동 자리배치 (저장하지 않고 배치안만 반환, 편집 후 save-arrangement로 저장)"""
+    try:
+        data = request.get_json() or {}
+        
+        classroom = data.get('classroom')
+        if not classroom:
+            return jsonify({
+                'success': False,
+                'error': '필수 정보가 누락되었습니다.'
+            }), 400
+        
+        layout = SupabaseService().get_classroom_layout(classroom)
+        if not layout:
+            return jsonify({
+                'success': False,
+                'error': '교실 레이아웃을 찾을 수 없습니다.'
+            }), 404
+        
+        # 입력값 검증 (형식이 틀리면 500 대신 400)
+        students_param = data.get('students')
+        fixed = data.get('fixed') or []
+        separate = data.get('separate') or []
+        try:
+            seed = int(data.get('seed') or 0)
+            grade = int(data['grade']) if data.get('grade') else None
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'seed와 grade는 정수여야 합니다.'
+            }), 400
+        
+        if students_param and (not isinstance(students_param, list)
+                               or not all(isinstance(email, str) for email in students_param)):
+            return jsonify({
+                'success': False,
+                'error': 'students는 학생 이메일 목록이어야 합니다.'
+            }), 400
+        
+        if not isinstance(fixed, list) or not isinstance(separate, list):
+            return jsonify({
+                'success': False,
+                'error': 'fixed와 separate는 목록이어야 합니다.'
+            }), 400
+        
+        try:
+            fixed = [{
+                'email': str(item['email']),
+                'position_key': str(item['position_key']),
+                'row': int(item.get('row', 0))
+            } for item in fixed]
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': "fixed 항목은 {'email', 'position_key', 'row'(정수)} 형식이어야 합니다."
+            }), 400
+        
+        # 명단: 지정한 학생 이메일 목록, 없으면 학년 전체
+        if students_param:
+            students = [student for student in map(student_directory.get, students_param) if student]
+        elif grade:
+            students = student_directory.students_in(student_directory.grade_mask(grade))
+        else:
+            return jsonify({
+                'success': False,
+                'error': '배치할 학생 또는 학년을 지정해주세요.'
+            }), 400
+        
+        separate = [
+            pair for pair in separate
+            if isinstance(pair, list) and len(pair) == 2 and all(isinstance(email, str) for email in pair)
+        ]
+        
+        result = auto_seating.arrange(
+            layout,
+            students,
+            fixed=fixed,
+            separate=separate,
+            keep_classes=bool(data.get('keep_classes', True)),
+            seed=seed
+        )
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"자동 자리배치 에러: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': '자동 자리배치 중 오류가 발생했습니다.'
+        }), 500
+
 # =============================================================================
 # DSHS-Life 스타일 API 엔드포인트
 # =============================================================================
@@ -451,23 +436,18 @@ def get_seats():
                 'error': 'Classroom layouts not found'
             }), 404
         
+        # 오늘 유효한 모든 교실의 자리배치 (건물 전체 스냅샷, 한 번의 조회)
+        building = seat_versions.building(date.today())
+        
         # 자리배치 데이터를 DSHS-Life 형식으로 변환
         seats = []
         for layout in layouts_result['layouts']:
-            classroom_key = layout['classroom_key']
-            
-            # 오늘 날짜의 자리배치 조회
-            today = date.today()
-            arrangement_result = seating_service.get_seat_arrangements(classroom_key, str(today))
-            
-            if arrangement_result['success']:
-                arrangements = arrangement_result['arrangements']
-                for position_key, student_emails in arrangements.items():
-                    # DSHS-Life 형식: prefix, snums
-                    seats.append({
-                        'prefix': position_key,
-                        'snums': student_emails  # 학생 이메일 배열
-                    })
+            for position_key, student_emails in building.get(layout['classroom_key'], {}).items():
+                # DSHS-Life 형식: prefix, snums
+                seats.append({
+                    'prefix': position_key,
+                    'snums': student_emails  # 학생 이메일 배열
+                })
         
         return jsonify({
             'seats': seats
@@ -479,6 +459,50 @@ def get_seats():
             'error': 'Internal server error'
         }), 500
 
+@seating_bp.route('/api/locate')
+@login_required
+@role_required(['teacher', 'admin', 'super_admin'])
+def locate_student():
+    """학생이 앉는 자리 찾기 (모든 교실, 그날 유효한 배치의 역색인)"""
+    try:
+        student_email = request.args.get('email')
+        if not student_email:
+            return jsonify({
+                'error': '학생 이메일이 필요합니다.'
+            }), 400
+        
+        target_date = request.args.get('date', date.today().isoformat())
+        target_date = datetime.strptime(target_date, '%Y-%m-%d').date()
+        
+        student = student_directory.get(student_email)
+        result = {
+            'email': student_email,
+            'name': student['name'] if student else None,
+            'no': student['no'] if student else None,
+            'date': str(target_date),
+            'seats': seat_versions.locate(student_email, target_date)
+        }
+        
+        # 지난 배치 버전에서 앉았던 자리 (DB 조회, student_emails GIN 인덱스)
+        if request.args.get('history') == 'true':
+            result['history'] = [{
+                'classroom': row['classroom'],
+                'position_key': row['position_key'],
+                'effective_from': row['arrangement_date']
+            } for row in SupabaseService().get_student_seat_history(student_email) or []]
+        
+        return jsonify(result)
+        
+    except ValueError:
+        return jsonify({
+            'error': '날짜 형식이 올바르지 않습니다.'
+        }), 400
+    except Exception as e:
+        logger.error(f"Error in locate_student: {e}")
+        return jsonify({
+            'error': 'Internal server error'
+        }), 500
+
 @seating_bp.route('/api/missing')
 @login_required
 @role_required(['teacher', 'admin', 'super_admin'])
@@ -509,6 +533,7 @@ def get_missing():
 @seating_bp.route('/api/missing', methods=['POST'])
 @login_required
 @role_required(['teacher', 'admin', 'super_admin'])
+@idempotent()
 def mark_missing():
     """부재/복귀 처리 (DSHS-Life /selfstudy/missing POST와 동일)"""
     try:
@@ -518,9 +543,13 @@ def mark_missing():
         target_date = data.get('date')
         period = data.get('period')
         student_emails = data.get('uids', [])  # DSHS-Life에서는 uids
+        # 학생 이메일 -> 화면에서 본 기록 버전 (선택, 다르면 충돌로 건너뜀)
+        expected_versions = data.get('versions') or {}
         
         # 입력값 검증
-        if action not in ('miss', 'return'):
+        if action not in ('miss', 'return') or not isinstance(expected_versions, dict) or not all(
+                version is None or (isinstance(version, int) and not isinstance(version, bool))
+                for version in expected_versions.values()):
             return jsonify({
                 'error': 'Bad Request'
             }), 400
@@ -530,8 +559,14 @@ def mark_missing():
                 'error': '필수 정보가 누락되었습니다.'
             }), 400
         
-        # 날짜 변환
-        target_date = datetime.strptime(target_date, '%Y-%m-%d').date()
+        # 날짜/교시 변환
+        try:
+            target_date = datetime.strptime(target_date, '%Y-%m-%d').date()
+            period = int(period)
+        except (TypeError, ValueError):
+            return jsonify({
+                'error': 'Bad Request'
+            }), 400
         
         # 출석 처리
         attendance_service = AttendanceService()
@@ -540,12 +575,16 @@ def mark_missing():
             target_date=target_date,
             period=period,
             student_emails=student_emails,
-            teacher_email=current_user.email
+            teacher_email=current_user.email,
+            expected_versions={
+                email: version for email, version in expected_versions.items() if version is not None
+            }
         )
         
         if result['success']:
             return jsonify({
-                'error': None  # DSHS-Life 응답 형식
+                'error': None,  # DSHS-Life 응답 형식
+                'conflicts': result.get('conflicts', [])
             })
         else:
             return jsonify({
@@ -558,6 +597,196 @@ def mark_missing():
             'error': 'Internal server error'
         }), 500
 
+@seating_bp.route('/api/missing/batch', methods=['POST'])
+@login_required
+@role_required(['teacher', 'admin', 'super_admin'])
+@idempotent()
+def mark_missing_batch():
+    """부재/복귀 일괄 처리 (클라이언트 쓰기 버퍼에서 모아 보낸 탭들을 항목별로 응답)"""
+    try:
+        data = request.get_json() or {}
+        items = data.get('items', [])
+        
+        if not isinstance(items, list) or len(items) == 0:
+            return jsonify({
+                'error': '처리할 항목이 없습니다.'
+            }), 400
+            
+        if len(items) > MAX_BATCH_ITEMS:
+            return jsonify({
+                'error': f'한 번에 최대 {MAX_BATCH_ITEMS}건까지 처리할 수 있습니다.'
+            }), 400
+        
+        results = [None] * len(items)
+        groups = {}
+        
+        # 입력값 검증 후 (action, 날짜, 교시)별로 묶기
+        for position, item in enumerate(items):
+            # 항목 하나의 형식 오류가 배치 전체를 실패시키지 않도록 항목별로 거절
+            if not isinstance(item, dict):
+                results[position] = {'id': None, 'ok': False, 'error': 'Bad Request'}
+                continue
+            
+            action = item.get('action')
+            target_date = item.get('date')
+            period = item.get('period')
+            student_email = item.get('uid')
+            version = item.get('version')
+            
+            try:
+                target_date = datetime.strptime(target_date, '%Y-%m-%d').date()
+                period = int(period)
+            except (TypeError, ValueError):
+                target_date = None
+            
+            valid_version = version is None or (isinstance(version, int) and not isinstance(version, bool))
+            if (action not in ('miss', 'return') or not target_date or not period
+                    or not isinstance(student_email, str) or not student_email or not valid_version):
+                results[position] = {'id': item.get('id'), 'ok': False, 'error': 'Bad Request'}
+                continue
+            
+            groups.setdefault((action, target_date, period), []).append(position)
+        
+        attendance_service = AttendanceService()
+        
+        for (action, target_date, period), positions in groups.items():
+            result = attendance_service.mark_attendance_dshs(
+                action=action,
+                target_date=target_date,
+                period=period,
+                student_emails=[items[position]['uid'] for position in positions],
+                teacher_email=current_user.email,
+                expected_versions={
+                    items[position]['uid']: items[position]['version']
+                    for position in positions if items[position].get('version') is not None
+                }
+            )
+            
+            # 요청 순서대로 항목별 RPC 결과 (모르는 학생은 None, 실패한 경우 결과 없음)
+            unknown_emails = set(result.get('unknown_emails', []))
+            outcomes = result.get('outcomes') or [None] * len(positions)
+            
+            for position, outcome in zip(positions, outcomes):
+                item = items[position]
+                if not result['success']:
+                    results[position] = {'id': item.get('id'), 'ok': False, 'error': result.get('error', 'Processing failed')}
+                elif item['uid'] in unknown_emails:
+                    results[position] = {'id': item.get('id'), 'ok': False, 'error': '학생을 찾을 수 없습니다.'}
+                elif outcome and outcome.get('reason') == 'conflict':
+                    # 화면에서 본 버전 이후 다른 교사가 먼저 변경함
+                    results[position] = {
+                        'id': item.get('id'), 'ok': False, 'conflict': True,
+                        'status': outcome['status'], 'version': outcome['version'],
+                        'error': '다른 사용자가 먼저 변경했습니다.'
+                    }
+                else:
+                    # 이미 같은 상태라 건너뛴(noop) 항목도 요청은 반영된 것으로 응답
+                    # applied/상태/버전은 항목별 RPC 결과 (같은 학생이 두 번 들어와도 각각 보고)
+                    outcome = outcome or {}
+                    results[position] = {
+                        'id': item.get('id'), 'ok': True, 'applied': bool(outcome.get('applied')),
+                        'status': outcome.get('status'), 'version': outcome.get('version'), 'error': None
+                    }
+        
+        return jsonify({
+            'error': None,
+            'results': results
+        })
+            
+    except Exception as e:
+        logger.error(f"Error in mark_missing_batch: {e}")
+        return jsonify({
+            'error': 'Internal server error'
+        }), 500
+
+@seating_bp.route('/api/stream')
+@login_required
+@role_required(['teacher', 'admin', 'super_admin'])
+def stream_seats():
+    """좌석 현황 실시간 변경분 (Server-Sent Events, 교실/날짜/교시별)"""
+    classroom = request.args.get('classroom')
+    period = request.args.get('period', type=int)
+    
+    try:
+        target_date = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        target_date = None
+    
+    if not classroom or not target_date or not period:
+        return jsonify({
+            'error': '필수 정보가 누락되었습니다.'
+        }), 400
+    
+    # 브라우저 자동 재연결은 헤더로, 교시를 바꿨다 돌아온 경우는 쿼리로 마지막 ID를 받음
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    # 연결마다 워커 스레드 하나를 점유하므로 상한을 넘으면 일반 요청용 스레드를 남기고 거절
+    if not seat_stream.acquire():
+        response = jsonify({
+            'error': '실시간 연결이 많아 잠시 후 다시 연결합니다.'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(seat_stream.keepalive_seconds)
+        return response
+    
+    response = Response(
+        stream_with_context(seat_stream.stream(classroom, target_date, period, last_event_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+    # 스트림이 끝나거나 클라이언트가 끊어 응답이 닫힐 때 자리 반납
+    response.call_on_close(seat_stream.release)
+    return response
+
+@seating_bp.route('/api/board')
+@login_required
+@role_required(['teacher', 'admin', 'super_admin'])
+def get_board():
+    """좌석 현황 보드 (미리 만든 JSON 또는 HTML 조각, format=html)"""
+    classroom = request.args.get('classroom')
+    period = request.args.get('period', type=int)
+    
+    try:
+        target_date = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        target_date = None
+    
+    if not classroom or not target_date or not period:
+        return jsonify({
+            'error': '필수 정보가 누락되었습니다.'
+        }), 400
+    
+    try:
+        entry = seat_board.get(classroom, target_date, period)
+        if entry is None:
+            return jsonify({
+                'error': 'Classroom layout not found'
+            }), 404
+        
+        as_html = request.args.get('format') == 'html'
+        etag = f"{entry['etag']}-html" if as_html else entry['etag']
+        
+        # 같은 버전의 보드를 이미 가진 클라이언트에는 본문 없이 응답
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        elif as_html:
+            response = Response(seat_board.html(entry), mimetype='text/html')
+        else:
+            response = Response(entry['json'], mimetype='application/json')
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error in get_board: {e}")
+        return jsonify({
+            'error': 'Internal server error'
+        }), 500
+
 @seating_bp.route('/api/config')
 @login_required
 @role_required(['teacher', 'admin', 'super_admin'])
@@ -0,0 +1,221 @@
+"""
+부재 이상 탐지 서비스
+Absence Anomaly Service (rolling per-student counters maintained from attendance events)
+"""
+
+import logging
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Any, Iterable
+
+from .supabase_service import SupabaseService
+from .student_directory_service import student_directory
+from .archive_service import archive_service
+from .attendance_event_service import applied_status
+
+logger = logging.getLogger(__name__)
+
+# 부재로 세는 상태 (복귀 처리된 교시도 자리를 비웠던 것으로 봄)
+ABSENCE_STATUSES = ('absent', 'returned')
+
+def previous_school_day(day: date) -> date:
+    """직전 평일"""
+    day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+class AnomalyService:
+    """
+    학생별 최근 부재 기록을 메모리에 유지하며 기준을 넘는 학생을 표시하는 서비스 클래스
+
+    처음 조회할 때 기간(window_days) 안의 부재 기록을 한 번 읽고, 이후에는 출석 이벤트로
+    학생별 카운터를 갱신합니다. 날짜가 바뀌면 기간 밖 기록만 메모리에서 정리합니다.
+    """
+
+    def __init__(self, window_days: int = 14, min_absences: int = 4, streak_days: int = 3,
+                 period_absences: int = 3, periods: Iterable[int] = (11, 12)):
+        self.supabase = SupabaseService()
+        self.directory = student_directory
+        self.archive = archive_service
+        self.configure(window_days, min_absences, streak_days, period_absences, periods)
+
+        self._lock = threading.RLock()
+        # 학생 이메일 -> {(날짜, 교시), ...}
+        self._cells: Dict[str, set] = {}
+        # 학생 이메일 -> 탐지 결과 (기준을 넘은 학생만)
+        self._flags: Dict[str, Dict[str, Any]] = {}
+        self._window_start: Optional[str] = None
+        self._today: Optional[date] = None
+
+    def configure(self, window_days: int, min_absences: int, streak_days: int,
+                  period_absences: int, periods: Iterable[int]):
+        """탐지 기준 설정 (다음 조회 때 다시 계산)"""
+        self.window_days = window_days
+        self.min_absences = min_absences
+        self.streak_days = streak_days
+        self.period_absences = period_absences
+        self.periods = tuple(int(period) for period in periods)
+        self._window_start = None
+
+    def thresholds(self) -> Dict[str, Any]:
+        """현재 탐지 기준"""
+        return {
+            'window_days': self.window_days,
+            'min_absences': self.min_absences,
+            'streak_days': self.streak_days,
+            'period_absences': self.period_absences,
+            'periods': list(self.periods)
+        }
+
+    def _ensure_window(self, today: date):
+        """기간 시작이 바뀌었으면 적재하거나 기간 밖 기록 정리 (잠금 안에서 호출)"""
+        window_start = (today - timedelta(days=self.window_days - 1)).isoformat()
+        if self._window_start == window_start and self._today == today:
+            return
+
+        if self._window_start is None:
+            self._load(window_start, today.isoformat())
+        else:
+            for cells in self._cells.values():
+                for cell in [cell for cell in cells if cell[0] < window_start]:
+                    cells.discard(cell)
+
+        self._window_start = window_start
+        self._today = today
+        self._flags = {}
+        for email in list(self._cells):
+            self._evaluate(email)
+
+    def _load(self, date_from: str, date_to: str):
+        """기간 내 부재 기록 한 번 적재 (보관 경계에 걸치면 보관 테이블 포함)"""
+        self._cells = {}
+        for table, segment_from, segment_to in self.archive.tables_for(date_from, date_to):
+            rows = self.supabase.get_absence_cells(segment_from, segment_to, self.periods,
+                                                   ABSENCE_STATUSES, table) or []
+            for row in rows:
+                self._cells.setdefault(row['student_email'], set()).add(
+                    (str(row['attendance_date']), int(row['period']))
+                )
+
+    def _streak(self, dates: List[str]) -> int:
+        """오늘(또는 직전 평일)까지 이어진 연속 부재 평일 수"""
+        if not dates:
+            return 0
+
+        day = self._today
+        if dates[-1] != day.isoformat():
+            day = previous_school_day(day)
+            if dates[-1] != day.isoformat():
+                return 0
+
+        present_dates = set(dates)
+        streak = 0
+        while day.isoformat() in present_dates:
+            streak += 1
+            day = previous_school_day(day)
+        return streak
+
+    def _evaluate(self, student_email: str):
+        """학생 한 명의 카운터로 기준 판정 (잠금 안에서 호출)"""
+        cells = self._cells.get(student_email)
+        if not cells:
+            self._cells.pop(student_email, None)
+            self._flags.pop(student_email, None)
+            return
+
+        dates = sorted({cell[0] for cell in cells})
+        by_period = Counter(cell[1] for cell in cells)
+        streak = self._streak(dates)
+
+        reasons = []
+        if len(cells) >= self.min_absences:
+            reasons.append('window')
+        if streak >= self.streak_days:
+            reasons.append('streak')
+        for period, count in sorted(by_period.items()):
+            if count >= self.period_absences:
+                reasons.append(f'period:{period}')
+
+        if not reasons:
+            self._flags.pop(student_email, None)
+            return
+
+        self._flags[student_email] = {
+            'email': student_email,
+            'absences': len(cells),
+            'absent_days': len(dates),
+            'streak': streak,
+            'by_period': {str(period): count for period, count in sorted(by_period.items())},
+            'last_absence': dates[-1],
+            'reasons': reasons
+        }
+
+    def apply_events(self, events: List[Dict[str, Any]]):
+        """출석 이벤트 리스너: 추적 교시의 부재 기록을 학생별 카운터에 반영"""
+        with self._lock:
+            if self._window_start is None:
+                # 아직 적재 전이면 첫 조회 때 한 번에 읽음
+                return
+
+            changed = set()
+            for event in events:
+                period = int(event['period'])
+                attendance_date = str(event['attendance_date'])
+                if period not in self.periods or attendance_date < self._window_start:
+                    continue
+
+                status = applied_status(event)
+                email = event['student_email']
+                cell = (attendance_date, period)
+
+                if status in ABSENCE_STATUSES:
+                    self._cells.setdefault(email, set()).add(cell)
+                elif email in self._cells:
+                    self._cells[email].discard(cell)
+                changed.add(email)
+
+            for email in changed:
+                self._evaluate(email)
+
+    def get_flagged(self, grade: Optional[int] = None, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        기준을 넘은 학생 목록 (유지 중인 카운터에서 바로 응답)
+
+        Args:
+            grade: 학년 (없으면 전체)
+            today: 기준 날짜 (기본값 오늘)
+
+        Returns:
+            학생 정보와 부재 횟수, 연속 부재일, 교시별 부재, 해당 기준
+        """
+        with self._lock:
+            self._ensure_window(today or date.today())
+            flags = [dict(flag) for flag in self._flags.values()]
+
+        result = []
+        for flag in flags:
+            student = self.directory.get(flag['email'])
+            if not student or (grade is not None and student['grade'] != grade):
+                continue
+            flag.update({
+                'name': student['name'],
+                'no': student['no'],
+                'grade': student['grade'],
+                'class_number': student['class_number']
+            })
+            result.append(flag)
+
+        result.sort(key=lambda flag: (-flag['absences'], -flag['streak'], flag['email']))
+        return result
+
+    def invalidate(self):
+        """다시 적재하도록 상태 초기화"""
+        with self._lock:
+            self._window_start = None
+            self._cells = {}
+            self._flags = {}
+
+# 전역 서비스 인스턴스
+anomaly_service = AnomalyService()
@@ -0,0 +1,121 @@
+"""
+출석 기록 보관 서비스
+Attendance Archive Service (hot table for the current term, monthly-partitioned archive)
+"""
+
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Any, Tuple
+
+from .supabase_service import SupabaseService
+from .period_service import term_start
+
+logger = logging.getLogger(__name__)
+
+HOT_TABLE = 'attendance_records'
+ARCHIVE_TABLE = 'attendance_records_archive'
+
+class ArchiveService:
+    """종료된 학기 기록을 보관 테이블로 옮기고 날짜별로 조회할 테이블을 정하는 서비스 클래스"""
+
+    def __init__(self, cutoff_ttl_seconds: int = 300, batch_size: int = 5000):
+        self.supabase = SupabaseService()
+        self.cutoff_ttl_seconds = cutoff_ttl_seconds
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._cutoff: Optional[str] = None
+        self._cutoff_loaded_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def cutoff(self) -> Optional[str]:
+        """보관 경계 날짜 (YYYY-MM-DD, 보관한 적이 없으면 None)"""
+        with self._lock:
+            if time.monotonic() - self._cutoff_loaded_at <= self.cutoff_ttl_seconds:
+                return self._cutoff
+
+        cutoff = self.supabase.get_attendance_archive_cutoff()
+
+        with self._lock:
+            self._cutoff = str(cutoff) if cutoff else None
+            self._cutoff_loaded_at = time.monotonic()
+            return self._cutoff
+
+    def tables_for(self, date_from, date_to=None) -> List[Tuple[str, str, str]]:
+        """
+        기간 조회 시 읽을 테이블과 구간
+
+        보관 경계 이후 기간은 현재 테이블만 읽습니다. 경계 이전 기간은 보관 테이블과
+        함께, 보관 후 정정되어 현재 테이블로 되돌아온 기록을 위해 현재 테이블도 읽습니다.
+
+        Args:
+            date_from: 시작 날짜
+            date_to: 종료 날짜 (없으면 date_from 하루)
+
+        Returns:
+            (테이블, 시작 날짜, 종료 날짜) 목록
+        """
+        date_from = str(date_from)
+        date_to = str(date_to) if date_to else date_from
+        cutoff = self.cutoff()
+
+        if not cutoff or date_from >= cutoff:
+            return [(HOT_TABLE, date_from, date_to)]
+
+        archive_to = min(date_to, (date.fromisoformat(cutoff) - timedelta(days=1)).isoformat())
+        return [(ARCHIVE_TABLE, date_from, archive_to), (HOT_TABLE, date_from, date_to)]
+
+    def run_once(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        현재 학기 시작 이전 기록을 모두 보관 테이블로 이동
+
+        Args:
+            today: 기준 날짜 (기본값 오늘)
+
+        Returns:
+            보관 결과
+        """
+        before = term_start(today or date.today()).isoformat()
+        archived_count = 0
+
+        try:
+            while True:
+                moved = self.supabase.archive_attendance_records(before, self.batch_size)
+                archived_count += moved
+                if moved < self.batch_size:
+                    break
+
+            with self._lock:
+                self._cutoff_loaded_at = 0.0
+
+            logger.info(f"출석 기록 보관 완료: {before} 이전 {archived_count}건")
+            return {
+                'success': True,
+                'archived_before': before,
+                'archived_count': archived_count
+            }
+
+        except Exception as e:
+            logger.error(f"출석 기록 보관 에러: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def start(self, interval_hours: int = 24):
+        """백그라운드 보관 작업 시작 (워커 프로세스마다 한 번)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        def loop():
+            while True:
+                self.run_once()
+                time.sleep(interval_hours * 3600)
+
+        self._thread = threading.Thread(target=loop, name='attendance-archive', daemon=True)
+        self._thread.start()
+
+# 전역 서비스 인스턴스
+archive_service = ArchiveService()
@@ -0,0 +1,350 @@
+"""
+출석 분석 큐브 서비스
+Attendance Cube Service (memory-mapped int8 students x days x periods matrix for term analytics)
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Any
+
+try:
+    import numpy as np
+except ImportError:  # 학기 분석은 numpy가 설치된 경우에만 사용
+    np = None
+
+from .supabase_service import SupabaseService
+from .student_directory_service import student_directory
+from .archive_service import archive_service
+from .attendance_event_service import next_status
+from .period_service import PeriodService, term_start, next_term_start
+
+logger = logging.getLogger(__name__)
+
+# 교시 축 (1-7: 일반교시, 11-15: 자습, 21-25: 식사/외박)
+PERIOD_AXIS = [1, 2, 3, 4, 5, 6, 7, 11, 12, 13, 14, 15, 21, 22, 23, 24, 25]
+PERIOD_INDEX = {period: i for i, period in enumerate(PERIOD_AXIS)}
+
+# 칸 값 (기록 없음 = 출석)
+STATUS_CODES = {'present': 0, 'absent': 1, 'returned': 2, 'activity': 3,
+                'late': 4, 'early_leave': 5, 'excused': 6}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# 부재로 집계하는 칸 값 (복귀 처리된 부재 포함)
+ABSENCE_CODES = (STATUS_CODES['absent'], STATUS_CODES['returned'])
+
+class AttendanceCube:
+    """한 학기의 학생 x 날짜 x 교시 상태 행렬 (파일에 메모리 매핑)"""
+
+    def __init__(self, start: date, emails: List[str], data, generation: str):
+        self.start = start
+        self.emails = emails
+        self.row_by_email = {email: row for row, email in enumerate(emails)}
+        self.data = data
+        self.generation = generation
+
+    @property
+    def days(self) -> int:
+        return self.data.shape[1]
+
+    def cell(self, attendance_date, period: int) -> Optional[tuple]:
+        """날짜/교시의 (날짜 축, 교시 축) 위치 (범위 밖이면 None)"""
+        if isinstance(attendance_date, str):
+            attendance_date = date.fromisoformat(attendance_date)
+        day = (attendance_date - self.start).days
+        slot = PERIOD_INDEX.get(int(period))
+        if slot is None or not 0 <= day < self.days:
+            return None
+        return day, slot
+
+class AttendanceCubeService:
+    """
+    학기 분석용 출석 큐브를 파일로 만들고 gunicorn 워커들이 같은 파일을 공유 매핑하는 서비스 클래스
+
+    파일 구성 (학기 시작일 기준):
+        attendance_cube_YYYYMMDD.current     - 현재 세대 이름
+        attendance_cube_YYYYMMDD_<세대>.npy  - int8 (학생, 날짜, 교시) 행렬
+        attendance_cube_YYYYMMDD_<세대>.json - 학생 축 이메일 목록
+
+    재구성은 새 세대 파일을 만든 뒤 .current만 교체하므로 읽는 쪽은 항상 짝이 맞는 파일을 봅니다.
+    출석 이벤트는 쓰기를 처리한 워커가 공유 매핑에 바로 반영합니다.
+    """
+
+    def __init__(self, cube_dir: Optional[str] = None, page_size: int = 1000):
+        self.supabase = SupabaseService()
+        self.directory = student_directory
+        self.archive = archive_service
+        self.period_service = PeriodService()
+        self.cube_dir = cube_dir or os.path.join(tempfile.gettempdir(), 'attendance_cube')
+        self.page_size = page_size
+
+        self._lock = threading.RLock()
+        self._cube: Optional[AttendanceCube] = None
+        self._calendars: Dict[date, Any] = {}
+
+    @staticmethod
+    def available() -> bool:
+        """numpy 설치 여부"""
+        return np is not None
+
+    def configure(self, cube_dir: str):
+        """큐브 파일 디렉터리 지정"""
+        with self._lock:
+            self.cube_dir = cube_dir
+            self._cube = None
+
+    def _path(self, start: date, suffix: str) -> str:
+        return os.path.join(self.cube_dir, f"attendance_cube_{start:%Y%m%d}{suffix}")
+
+    def _read_generation(self, start: date) -> Optional[str]:
+        try:
+            with open(self._path(start, '.current'), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def get(self, today: Optional[date] = None) -> AttendanceCube:
+        """
+        학기 큐브 조회 (다른 워커가 재구성했으면 새 세대를 다시 매핑, 없으면 생성)
+
+        Args:
+            today: 기준 날짜 (기본값 오늘)
+
+        Returns:
+            현재 학기 큐브
+        """
+        start = term_start(today or date.today())
+        generation = self._read_generation(start)
+
+        with self._lock:
+            cube = self._cube
+            if cube and cube.start == start and cube.generation == generation:
+                return cube
+
+        if generation is None:
+            return self.rebuild(today)
+
+        with open(self._path(start, f'_{generation}.json'), encoding='utf-8') as f:
+            emails = json.load(f)
+        data = np.load(self._path(start, f'_{generation}.npy'), mmap_mode='r+')
+
+        with self._lock:
+            self._cube = AttendanceCube(start, emails, data, generation)
+            return self._cube
+
+    def rebuild(self, today: Optional[date] = None) -> AttendanceCube:
+        """
+        학기 출석 기록 전체로 큐브 재구성
+
+        Args:
+            today: 기준 날짜 (기본값 오늘)
+
+        Returns:
+            새로 만든 큐브
+        """
+        today = today or date.today()
+        start = term_start(today)
+        days = (next_term_start(today) - start).days
+
+        self.directory.refresh()
+        emails = [self.directory.get_by_index(i)['email'] for i in range(self.directory.size())]
+        row_by_email = {email: row for row, email in enumerate(emails)}
+
+        os.makedirs(self.cube_dir, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+        data = np.lib.format.open_memmap(
+            self._path(start, f'_{generation}.npy'), mode='w+', dtype=np.int8,
+            shape=(len(emails), days, len(PERIOD_AXIS))
+        )
+
+        date_to = (start + timedelta(days=days - 1)).isoformat()
+        loaded = 0
+        for table, segment_from, segment_to in self.archive.tables_for(start.isoformat(), date_to):
+            after = None
+            while True:
+                page = self.supabase.get_attendance_records_page(segment_from, segment_to, after, self.page_size, table) or []
+                for record in page:
+                    row = row_by_email.get(record['student_email'])
+                    day = (date.fromisoformat(str(record['attendance_date'])) - start).days
+                    slot = PERIOD_INDEX.get(int(record['period']))
+                    if row is None or slot is None or not 0 <= day < days:
+                        continue
+                    data[row, day, slot] = STATUS_CODES.get(record['status'], 0)
+                    loaded += 1
+
+                if len(page) < self.page_size:
+                    break
+                last = page[-1]
+                after = (last['attendance_date'], last['period'], last['id'])
+
+        data.flush()
+        with open(self._path(start, f'_{generation}.json'), 'w', encoding='utf-8') as f:
+            json.dump(emails, f)
+
+        previous = self._read_generation(start)
+        current_tmp = self._path(start, f'.current.{generation}')
+        with open(current_tmp, 'w', encoding='utf-8') as f:
+            f.write(generation)
+        os.replace(current_tmp, self._path(start, '.current'))
+
+        # 이전 세대 파일 삭제 (이미 매핑한 워커는 다음 조회 때 새 세대로 교체)
+        if previous:
+            for suffix in ('.npy', '.json'):
+                try:
+                    os.remove(self._path(start, f'_{previous}{suffix}'))
+                except FileNotFoundError:
+                    pass
+
+        logger.info(f"출석 큐브 재구성: {start} 학기, 학생 {len(emails)}명, 기록 {loaded}건")
+
+        cube = AttendanceCube(start, emails, data, generation)
+        with self._lock:
+            self._cube = cube
+        return cube
+
+    def apply_events(self, events: List[Dict[str, Any]]):
+        """출석 이벤트 리스너: 현재 매핑된 큐브의 해당 칸 갱신"""
+        if np is None:
+            return
+
+        with self._lock:
+            cube = self._cube
+            if cube is None:
+                return
+
+            for event in events:
+                row = cube.row_by_email.get(event['student_email'])
+                position = cube.cell(event['attendance_date'], event['period'])
+                if row is None or position is None:
+                    continue
+
+                day, slot = position
+                current = STATUS_NAMES.get(int(cube.data[row, day, slot]), 'present')
+                status = next_status(current, event)
+                if status is not None:
+                    cube.data[row, day, slot] = STATUS_CODES[status]
+
+    def _calendar(self, cube: AttendanceCube):
+        """학기 운영 교시 여부 (날짜, 교시) bool 행렬"""
+        calendar = self._calendars.get(cube.start)
+        if calendar is not None and calendar.shape[0] == cube.days:
+            return calendar
+
+        # 학기 전체 교시 설정을 한 번에 조회
+        calendar = np.zeros((cube.days, len(PERIOD_AXIS)), dtype=bool)
+        scheduled = self.period_service.scheduled_periods_between(
+            cube.start.isoformat(), (cube.start + timedelta(days=cube.days - 1)).isoformat()
+        )
+        for day in range(cube.days):
+            config_date = (cube.start + timedelta(days=day)).isoformat()
+            for period in scheduled.get(config_date, []):
+                if period in PERIOD_INDEX:
+                    calendar[day, PERIOD_INDEX[period]] = True
+
+        self._calendars[cube.start] = calendar
+        return calendar
+
+    def _elapsed(self, cube: AttendanceCube, today: Optional[date]) -> int:
+        """학기 시작부터 오늘까지의 날짜 수"""
+        return max(0, min(cube.days, ((today or date.today()) - cube.start).days + 1))
+
+    def _student_absences(self, cube: AttendanceCube, today: Optional[date] = None):
+        """학생별 (부재 칸 수, 운영 칸 수)"""
+        elapsed = self._elapsed(cube, today)
+        calendar = self._calendar(cube)[:elapsed]
+        window = cube.data[:, :elapsed, :]
+
+        absent = np.isin(window, ABSENCE_CODES) & calendar
+        return absent.sum(axis=(1, 2)), int(calendar.sum())
+
+    def class_absence_rates(self, grade: Optional[int] = None, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """학급별 학기 부재율"""
+        cube = self.get(today)
+        absences, scheduled = self._student_absences(cube, today)
+
+        groups: Dict[tuple, List[int]] = {}
+        for row, email in enumerate(cube.emails):
+            student = self.directory.get(email)
+            if not student or (grade is not None and student['grade'] != grade):
+                continue
+            groups.setdefault((student['grade'], student['class_number']), []).append(row)
+
+        rates = []
+        for (class_grade, class_number), rows in sorted(groups.items()):
+            total = scheduled * len(rows)
+            absent = int(absences[rows].sum())
+            rates.append({
+                'grade': class_grade,
+                'class_number': class_number,
+                'student_count': len(rows),
+                'absence_count': absent,
+                'absence_rate': round(absent * 100 / total, 2) if total else 0
+            })
+        return rates
+
+    def chronic_absentees(self, threshold: float = 0.1, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """운영 교시 중 부재 비율이 threshold 이상인 학생 목록 (부재율 높은 순)"""
+        cube = self.get(today)
+        absences, scheduled = self._student_absences(cube, today)
+        if not scheduled:
+            return []
+
+        rates = absences / scheduled
+        rows = np.nonzero(rates >= threshold)[0]
+
+        students = []
+        for row in rows[np.argsort(-rates[rows])]:
+            student = self.directory.get(cube.emails[row]) or {}
+            students.append({
+                'email': cube.emails[row],
+                'name': student.get('name', '알 수 없음'),
+                'grade': student.get('grade'),
+                'class_number': student.get('class_number'),
+                'absence_count': int(absences[row]),
+                'absence_rate': round(float(rates[row]) * 100, 2)
+            })
+        return students
+
+    def period_heatmap(self, grade: Optional[int] = None, class_number: Optional[int] = None,
+                       today: Optional[date] = None) -> Dict[str, Any]:
+        """요일 x 교시 부재율 (운영 교시만)"""
+        cube = self.get(today)
+        elapsed = self._elapsed(cube, today)
+        calendar = self._calendar(cube)[:elapsed]
+
+        rows = []
+        for row, email in enumerate(cube.emails):
+            student = self.directory.get(email)
+            if not student:
+                continue
+            if grade is not None and student['grade'] != grade:
+                continue
+            if class_number is not None and student['class_number'] != class_number:
+                continue
+            rows.append(row)
+
+        # 날짜 x 교시 부재 학생 수, 운영 칸 수
+        absent = np.isin(cube.data[rows, :elapsed, :], ABSENCE_CODES).sum(axis=0) if rows else np.zeros_like(calendar, dtype=np.int64)
+        weekdays = np.array([(cube.start + timedelta(days=day)).weekday() for day in range(elapsed)], dtype=np.int64)
+
+        absent_by_weekday = np.zeros((7, len(PERIOD_AXIS)), dtype=np.int64)
+        scheduled_by_weekday = np.zeros((7, len(PERIOD_AXIS)), dtype=np.int64)
+        np.add.at(absent_by_weekday, weekdays, absent * calendar)
+        np.add.at(scheduled_by_weekday, weekdays, calendar * max(len(rows), 1))
+
+        columns = np.nonzero(scheduled_by_weekday.sum(axis=0))[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(scheduled_by_weekday > 0, absent_by_weekday * 100 / scheduled_by_weekday, 0)
+
+        return {
+            'periods': [PERIOD_AXIS[column] for column in columns],
+            'weekdays': ['월', '화', '수', '목', '금', '토', '일'],
+            'rates': np.round(rates[:, columns], 2).tolist()
+        }
+
+# 전역 서비스 인스턴스
+attendance_cube = AttendanceCubeService()
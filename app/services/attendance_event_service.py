@@ -0,0 +1,185 @@
+"""
+출석 이벤트 로그 서비스
+Attendance Event Log Service (append-only writes, replay into current state)
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional, Any
+
+from .supabase_service import SupabaseService
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('miss', 'return', 'activity', 'correction')
+
+def next_status(current_status: Optional[str], event: Dict[str, Any]) -> Optional[str]:
+    """
+    이벤트 적용 후 상태 계산 (DB의 apply_attendance_event_row와 같은 규칙)
+
+    Args:
+        current_status: 현재 상태 (기록이 없으면 None)
+        event: 출석 이벤트
+
+    Returns:
+        바뀐 상태, 이벤트가 무시되는 경우 None
+    """
+    event_type = event['event_type']
+
+    if event_type == 'miss':
+        return None if current_status == 'absent' else 'absent'
+    if event_type == 'return':
+        return 'returned' if current_status == 'absent' else None
+    if event_type == 'activity':
+        return 'activity'
+    return event.get('status') or 'present'
+
+def applied_status(event: Dict[str, Any]) -> str:
+    """적용된 이벤트의 결과 상태 (리스너는 실제로 적용된 이벤트만 받으므로 현재 상태 불필요)"""
+    return {'miss': 'absent', 'return': 'returned', 'activity': 'activity'}.get(
+        event['event_type'], event.get('status') or 'present'
+    )
+
+class AttendanceEventService:
+    """출석 이벤트를 추가 전용으로 기록하고 구독자에게 전달하는 서비스 클래스"""
+
+    def __init__(self):
+        self.supabase = SupabaseService()
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+    def subscribe(self, listener: Callable[[List[Dict[str, Any]]], None]):
+        """이벤트 기록 후 호출될 리스너 등록 (메모리 스냅샷/집계 갱신용)"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    @staticmethod
+    def build_event(event_type: str, attendance_date, period: int, student: Dict[str, Any],
+                    actor_id: Optional[str] = None, status: Optional[str] = None,
+                    notes: str = '', activity_type: str = None,
+                    activity_location: str = None, class_id: Optional[str] = None,
+                    expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        이벤트 행 생성
+
+        Args:
+            event_type: 'miss', 'return', 'activity', 'correction'
+            attendance_date: 날짜
+            period: 교시
+            student: 학생 정보 ('uid', 'email' 포함)
+            actor_id: 처리한 교사 ID
+            status: correction 이벤트의 지정 상태
+            class_id: 학급 출석인 경우 학급 ID
+            expected_version: 지정하면 현재 기록 버전이 같을 때만 적용 (출석 = 0)
+
+        Returns:
+            attendance_events 행 데이터
+        """
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f'알 수 없는 이벤트 유형: {event_type}')
+
+        event = {
+            'attendance_date': str(attendance_date),
+            'period': int(period),
+            'student_id': student['uid'],
+            'student_email': student['email'],
+            'event_type': event_type,
+            'status': status,
+            'actor_id': actor_id,
+            'notes': notes,
+            'activity_type': activity_type,
+            'activity_location': activity_location,
+            'class_id': class_id
+        }
+        if expected_version is not None:
+            event['expected_version'] = int(expected_version)
+        return event
+
+    def append_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        이벤트 일괄 기록 (사전 조회 없이 RPC 1회, 상태 전이는 DB에서 원자적으로 적용)
+
+        Args:
+            events: build_event로 만든 이벤트 목록
+
+        Returns:
+            기록 결과 (results: 이벤트별 applied, previous_status, status, version, reason)
+        """
+        if not events:
+            return {'success': True, 'appended_count': 0, 'results': [], 'conflicts': []}
+
+        try:
+            rows = self.supabase.record_attendance_events(events)
+            if not rows:
+                return {'success': False, 'error': '출석 이벤트 기록에 실패했습니다.'}
+
+            results: List[Optional[Dict[str, Any]]] = [None] * len(events)
+            for row in rows:
+                results[row['idx']] = row
+
+            applied = []
+            conflicts = []
+            for event, result in zip(events, results):
+                if result and result['applied']:
+                    applied.append(dict(event, version=result['version'], previous_status=result['previous_status']))
+                elif result and result['reason'] == 'conflict':
+                    conflicts.append(event['student_email'])
+
+            # 실제로 상태가 바뀐 이벤트만 구독자에게 전달
+            self._notify(applied)
+
+            return {
+                'success': True,
+                'appended_count': len(applied),
+                'results': results,
+                'conflicts': conflicts
+            }
+
+        except Exception as e:
+            logger.error(f"출석 이벤트 기록 에러: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def _notify(self, events: List[Dict[str, Any]]):
+        """리스너 호출 (리스너 오류는 쓰기 결과에 영향을 주지 않음)"""
+        if not events:
+            return
+        for listener in self._listeners:
+            try:
+                listener(events)
+            except Exception as e:
+                logger.error(f"출석 이벤트 리스너 에러: {str(e)}")
+
+    def rebuild(self, date_from: str, date_to: str) -> Dict[str, Any]:
+        """
+        기간 내 attendance_records를 이벤트 로그 재생으로 다시 만들기 (복구용, DB 함수 1회)
+
+        이벤트가 있는 (날짜, 교시, 학생) 기록만 지우고 이벤트를 기록 순서대로 다시 적용합니다.
+        다른 프로세스의 메모리 스냅샷/집계에는 반영되지 않으므로 복구 후 웹 워커를 재시작합니다.
+
+        Args:
+            date_from: 시작 날짜
+            date_to: 종료 날짜
+
+        Returns:
+            재구성 결과 (replayed_count: 재생한 이벤트 수)
+        """
+        try:
+            replayed = self.supabase.rebuild_attendance_records(date_from, date_to)
+            if replayed is None:
+                return {'success': False, 'error': '출석 기록 재구성에 실패했습니다.'}
+
+            return {
+                'success': True,
+                'replayed_count': replayed
+            }
+
+        except Exception as e:
+            logger.error(f"출석 기록 재구성 에러: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+# 전역 서비스 인스턴스
+attendance_events = AttendanceEventService()
@@ -0,0 +1,172 @@
+"""
+학생 출석 이력 서비스
+Student Attendance History Service (paged history, cached monthly summaries)
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
+
+from .attendance_store import attendance_store
+from .attendance_event_service import applied_status
+
+logger = logging.getLogger(__name__)
+
+# 최근 결석 목록에 포함하는 상태
+ABSENCE_STATUSES = ('absent', 'late', 'early_leave', 'excused')
+
+class AttendanceHistoryService:
+    """학생별 월간 출석 요약을 메모리에 유지하고 상세 이력은 페이지 단위로 조회하는 서비스 클래스"""
+
+    # 월별로 보관할 최근 결석 건수
+    RECENT_LIMIT = 5
+
+    def __init__(self, ttl_seconds: int = 600, max_students: int = 2000):
+        self.store = attendance_store
+        self.ttl_seconds = ttl_seconds
+        self.max_students = max_students
+
+        self._lock = threading.RLock()
+        self._summaries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+
+    def get_history_page(self, student_email: str, before: Optional[tuple] = None,
+                         limit: int = 30) -> Dict[str, Any]:
+        """
+        출석 상세 이력 한 페이지 조회 (최신순)
+
+        Args:
+            student_email: 학생 이메일
+            before: 이전 페이지의 마지막 커서 (날짜, 교시)
+            limit: 페이지 크기
+
+        Returns:
+            기록 목록과 다음 페이지 커서
+        """
+        records = self.store.student_page(student_email, before, limit)
+
+        next_cursor = None
+        if len(records) == limit:
+            last = records[-1]
+            next_cursor = f"{last['attendance_date']}|{last['period']}"
+
+        return {
+            'records': records,
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def parse_cursor(cursor: Optional[str]) -> Optional[tuple]:
+        """'날짜|교시' 형식의 커서 해석"""
+        if not cursor:
+            return None
+
+        parts = cursor.split('|')
+        if len(parts) != 2:
+            raise ValueError('잘못된 커서입니다.')
+        return (parts[0], int(parts[1]))
+
+    def get_summary(self, student_email: str) -> Dict[str, Dict[str, Any]]:
+        """
+        월별 출석 요약 조회 (캐시에 없으면 상태 컬럼만 한 번 조회해 계산, 예외 상태만 집계)
+
+        Args:
+            student_email: 학생 이메일
+
+        Returns:
+            'YYYY-MM' -> {'counts': 상태별 건수, 'recent_absences': 최근 결석 목록}
+        """
+        with self._lock:
+            entry = self._summaries.get(student_email)
+            if entry and time.monotonic() - entry['loaded_at'] <= self.ttl_seconds:
+                self._summaries.move_to_end(student_email)
+                return entry['months']
+
+        months = self._build_summary(self.store.student_statuses(student_email))
+
+        with self._lock:
+            self._summaries[student_email] = {'months': months, 'loaded_at': time.monotonic()}
+            self._summaries.move_to_end(student_email)
+            while len(self._summaries) > self.max_students:
+                self._summaries.popitem(last=False)
+            return months
+
+    def _build_summary(self, rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """출석 상태 목록을 월별 요약으로 변환"""
+        months: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            self._add(months, str(row['attendance_date']), int(row['period']), row['status'])
+        return months
+
+    def _add(self, months: Dict[str, Dict[str, Any]], attendance_date: str, period: int, status: str):
+        """요약에 기록 한 건 추가"""
+        month = months.setdefault(attendance_date[:7], {'counts': {}, 'recent_absences': []})
+        month['counts'][status] = month['counts'].get(status, 0) + 1
+
+        if status in ABSENCE_STATUSES:
+            recent = month['recent_absences']
+            recent.append({'attendance_date': attendance_date, 'period': period, 'status': status})
+            recent.sort(key=lambda item: (item['attendance_date'], item['period']), reverse=True)
+            del recent[self.RECENT_LIMIT:]
+
+    def _remove(self, months: Dict[str, Dict[str, Any]], attendance_date: str, period: int, status: str):
+        """요약에서 기록 한 건 제거"""
+        month = months.get(attendance_date[:7])
+        if not month:
+            return
+
+        count = month['counts'].get(status, 0) - 1
+        if count > 0:
+            month['counts'][status] = count
+        else:
+            month['counts'].pop(status, None)
+
+        month['recent_absences'] = [
+            item for item in month['recent_absences']
+            if (item['attendance_date'], item['period']) != (attendance_date, period)
+        ]
+
+    def record(self, student_email: str, attendance_date, period: int, status: str,
+               previous_status: Optional[str] = None):
+        """
+        출석 기록 쓰기 후 캐시된 요약 갱신 (캐시에 없는 학생은 다음 조회 때 계산)
+
+        Args:
+            student_email: 학생 이메일
+            attendance_date: 날짜
+            period: 교시
+            status: 새 상태
+            previous_status: 기존 상태 (기록이 없었으면 None 또는 'present')
+        """
+        with self._lock:
+            entry = self._summaries.get(student_email)
+            if not entry:
+                return
+
+            months = entry['months']
+            attendance_date = str(attendance_date)
+            # 출석은 기록하지 않으므로 요약에도 넣지 않음
+            if previous_status and previous_status != 'present':
+                self._remove(months, attendance_date, int(period), previous_status)
+            if status != 'present':
+                self._add(months, attendance_date, int(period), status)
+
+    def apply_events(self, events: List[Dict[str, Any]]):
+        """출석 이벤트 리스너: 적용된 이벤트(좌석 부재/복귀, 학급 출석 정정 모두)로 캐시된 요약 갱신"""
+        for event in events:
+            self.record(
+                event['student_email'], event['attendance_date'], event['period'],
+                applied_status(event), event.get('previous_status')
+            )
+
+    def invalidate(self, student_email: Optional[str] = None):
+        """요약 캐시 무효화 (인자가 없으면 전체)"""
+        with self._lock:
+            if student_email is None:
+                self._summaries.clear()
+            else:
+                self._summaries.pop(student_email, None)
+
+# 전역 서비스 인스턴스
+attendance_history = AttendanceHistoryService()
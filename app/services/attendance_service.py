@@ -8,6 +8,12 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, date
 
 from .supabase_service import SupabaseService
+from .attendance_snapshot_service import attendance_snapshots, SNAPSHOT_STATUSES
+from .attendance_event_service import attendance_events
+from .student_directory_service import student_directory
+from .classroom_roster_service import classroom_rosters
+from .period_service import PeriodService
+from .archive_service import archive_service
 
 logger = logging.getLogger(__name__)
 
@@ -28,19 +34,17 @@ class AttendanceService:
             교시별 부재 학생 목록 (DSHS-Life /selfstudy/missing과 동일)
         """
         try:
-            response = self.supabase.client.table('attendance_records') \
-                .select('period, student_email') \
-                .eq('attendance_date', target_date) \
-                .eq('status', 'absent') \
-                .execute()
-            
-            # 교시별로 부재 학생 그룹화
+            # 그날 운영하는 교시별 스냅샷의 부재 비트셋 (재학생만)
+            active = student_directory.all_mask()
             missings = {}
-            for record in response.data:
-                period = record['period']
-                if period not in missings:
-                    missings[period] = []
-                missings[period].append(record['student_email'])
+            for period in PeriodService().scheduled_periods(str(target_date)):
+                snapshot = attendance_snapshots.get(target_date, period)
+                emails = [
+                    student_directory.get_by_index(index)['email']
+                    for index in snapshot.indexes('absent') if active >> index & 1
+                ]
+                if emails:
+                    missings[period] = emails
             
             return {
                 'success': True,
@@ -55,7 +59,8 @@ class AttendanceService:
             }
     
     def mark_attendance_dshs(self, action: str, target_date: date, period: int, 
-                           student_emails: List[str], teacher_email: str) -> Dict[str, Any]:
+                           student_emails: List[str], teacher_email: str,
+                           expected_versions: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
         """
         부재/복귀 처리 (DSHS-Life 방식)
         
@@ -65,6 +70,7 @@ class AttendanceService:
             period: 교시
             student_emails: 학생 이메일 목록
             teacher_email: 처리하는 교사 이메일
+            expected_versions: 학생별로 화면에서 본 기록 버전 (현재 버전과 다르면 적용하지 않고 충돌로 보고)
             
         Returns:
             처리 결과 (DSHS-Life /selfstudy/missing POST와 동일)
@@ -79,94 +85,65 @@ class AttendanceService:
                 }
             
             # 교사 정보 조회
-            teacher_response = self.supabase.client.table('users') \
-                .select('id, name') \
-                .eq('email', teacher_email) \
-                .eq('role', 'teacher') \
-                .single() \
-                .execute()
+            teacher = self.supabase.get_user_by_email(teacher_email)
             
-            if not teacher_response.data:
+            if not teacher or teacher.get('role') != 'teacher':
                 return {
                     'success': False,
                     'error': '교사 정보를 찾을 수 없습니다.'
                 }
             
-            teacher_id = teacher_response.data['id']
-            processed_students = []
-            
-            for student_email in student_emails:
-                # 학생 정보 조회
-                student_response = self.supabase.client.table('users') \
-                    .select('id, name, student_profiles(parent_phone)') \
-                    .eq('email', student_email) \
-                    .eq('role', 'student') \
-                    .single() \
-                    .execute()
-                
-                if not student_response.data:
+            teacher_id = teacher['id']
+            expected_versions = expected_versions or {}
+            unknown_emails = []
+            events = []
+            event_positions = []
+            
+            # 현재 상태는 조회하지 않음 (부재/복귀 전이 조건은 DB에서 원자적으로 확인)
+            for position, student_email in enumerate(student_emails):
+                # 학생 정보 조회 (학생 디렉터리 캐시)
+                student = student_directory.get(student_email)
+                if not student:
+                    unknown_emails.append(student_email)
                     continue
-                    
-                student = student_response.data
-                student_id = student['id']
                 
-                # 기존 출석 기록 확인
-                existing_response = self.supabase.client.table('attendance_records') \
-                    .select('id, status') \
-                    .eq('attendance_date', target_date) \
-                    .eq('period', period) \
-                    .eq('student_id', student_id) \
-                    .execute()
-                
-                if action == 'miss':
-                    # 부재 처리
-                    if existing_response.data and existing_response.data[0]['status'] == 'absent':
-                        # 이미 부재 처리된 경우 건너뛰기 (DSHS-Life 로직)
-                        continue
-                    
-                    record_data = {
-                        'attendance_date': target_date,
-                        'period': period,
-                        'student_id': student_id,
-                        'student_email': student_email,
-                        'status': 'absent',
-                        'marked_by': teacher_id,
-                        'marked_at': datetime.now().isoformat(),
-                        'notes': f'{self.format_period(period)} 부재 처리'
-                    }
-                    
-                    if existing_response.data:
-                        # 기존 기록 업데이트
-                        self.supabase.client.table('attendance_records') \
-                            .update(record_data) \
-                            .eq('id', existing_response.data[0]['id']) \
-                            .execute()
-                    else:
-                        # 새 기록 삽입
-                        self.supabase.client.table('attendance_records') \
-                            .insert(record_data) \
-                            .execute()
-                    
-                    processed_students.append(student['name'])
+                action_label = '부재' if action == 'miss' else '복귀'
+                events.append(attendance_events.build_event(
+                    action, target_date, period, student,
+                    actor_id=teacher_id, notes=f'{self.format_period(period)} {action_label} 처리',
+                    expected_version=expected_versions.get(student_email)
+                ))
+                event_positions.append(position)
+            
+            # 이벤트 일괄 기록 (RPC 1회, 이미 부재/부재 아님 등으로 바뀌지 않은 항목은 건너뜀)
+            append_result = attendance_events.append_events(events)
+            if not append_result['success']:
+                return append_result
+            
+            processed_students = []
+            processed_emails = []
+            skipped_emails = []
+            conflicts = []
+            versions = {}
+            # 요청 순서대로 RPC의 항목별 결과 (applied, reason, status, version), 모르는 학생은 None
+            outcomes = [None] * len(student_emails)
+            for position, event, result in zip(event_positions, events, append_result['results']):
+                outcomes[position] = result
+                if result and result['reason'] != 'conflict':
+                    # 적용/건너뜀 모두 현재 기록 버전을 돌려줘 화면의 버전을 갱신
+                    versions[event['student_email']] = {'status': result['status'], 'version': result['version']}
                 
-                elif action == 'return':
-                    # 복귀 처리
-                    if not existing_response.data or existing_response.data[0]['status'] != 'absent':
-                        # 부재 상태가 아닌 경우 건너뛰기 (DSHS-Life 로직)
-                        continue
-                    
-                    # 복귀 처리
-                    self.supabase.client.table('attendance_records') \
-                        .update({
-                            'status': 'returned',
-                            'returned_by': teacher_id,
-                            'returned_at': datetime.now().isoformat(),
-                            'notes': f'{self.format_period(period)} 복귀 처리'
-                        }) \
-                        .eq('id', existing_response.data[0]['id']) \
-                        .execute()
-                    
-                    processed_students.append(student['name'])
+                if result and result['applied']:
+                    processed_students.append(student_directory.get(event['student_email'])['name'])
+                    processed_emails.append(event['student_email'])
+                elif result and result['reason'] == 'conflict':
+                    conflicts.append({
+                        'email': event['student_email'],
+                        'status': result['status'],
+                        'version': result['version']
+                    })
+                else:
+                    skipped_emails.append(event['student_email'])
             
             # TODO: SMS 알림 발송 (현재는 이메일로 대체 가능)
             # DSHS-Life에서는 부재 처리 시 SMS 발송
@@ -175,7 +152,13 @@ class AttendanceService:
                 'success': True,
                 'error': None,  # DSHS-Life 응답 형식
                 'processed_count': len(processed_students),
-                'processed_students': processed_students
+                'processed_students': processed_students,
+                'processed_emails': processed_emails,
+                'skipped_emails': skipped_emails,
+                'unknown_emails': unknown_emails,
+                'conflicts': conflicts,
+                'versions': versions,
+                'outcomes': outcomes
             }
             
         except Exception as e:
@@ -225,13 +208,9 @@ class AttendanceService:
         """
         try:
             # 교시 설정 조회
-            response = self.supabase.client.table('period_configs') \
-                .select('is_holiday, regular_periods, study_periods, meal_periods, special_periods') \
-                .eq('config_date', target_date) \
-                .execute()
+            config = self.supabase.get_period_config(str(target_date))
             
-            if response.data:
-                config = response.data[0]
+            if config:
                 is_holiday = config['is_holiday']
                 
                 if is_holiday:
@@ -260,59 +239,56 @@ class AttendanceService:
                 'is_holiday': False
             }
     
-    def get_attendance_records(self, attendance_date: str, period: int, 
-                             classroom: Optional[str] = None) -> Dict[str, Any]:
-        """출석 기록 조회"""
+    def get_period_status(self, attendance_date: str, period: int,
+                          classroom: Optional[str] = None) -> Dict[str, Any]:
+        """
+        교시별 출석/활동 현황 조회 (스냅샷 1회 적재로 상태별 목록과 활동 목록을 함께 반환)
+
+        Args:
+            attendance_date: 날짜
+            period: 교시
+            classroom: 교실 키 (지정하면 그날 자리배치에 있는 학생만)
+
+        Returns:
+            상태별 인원, 상태별 학생 목록, 활동 목록
+        """
         try:
-            query = self.supabase.client.table('attendance_records') \
-                .select('*, users(id, email, name, student_profiles(student_id, grade, class_number))') \
-                .eq('attendance_date', attendance_date) \
-                .eq('period', period)
-            
-            # 교실별 필터링이 필요한 경우 (향후 구현)
             if classroom:
-                # 해당 교실의 학생들만 필터링하는 로직 추가 필요
-                pass
-            
-            response = query.execute()
-            
-            # 상태별로 그룹화
-            attendance_status = {
-                'present': [],
-                'absent': [],
-                'returned': [],
-                'activity': []
-            }
-            
-            for record in response.data:
-                student_info = {
-                    'id': record['student_id'],
-                    'email': record['student_email'],
-                    'name': record['users']['name'] if record['users'] else '알 수 없음',
-                    'number': record['users']['student_profiles'][0]['student_id'] if record['users'] and record['users']['student_profiles'] else '',
-                    'status': record['status'],
-                    'marked_at': record['marked_at'],
-                    'returned_at': record['returned_at'],
-                    'notes': record['notes'],
-                    'activity_type': record['activity_type'],
-                    'activity_location': record['activity_location']
-                }
-                
-                if record['status'] in attendance_status:
-                    attendance_status[record['status']].append(student_info)
-            
+                # 교실 명단 비트마스크로 스냅샷을 걸러냄 (전교생 기록을 내려받지 않음)
+                view = attendance_snapshots.period_view(
+                    attendance_date, period,
+                    mask=classroom_rosters.mask(classroom, attendance_date), scope=classroom
+                )
+            else:
+                view = attendance_snapshots.period_view(attendance_date, period)
+
             return {
                 'success': True,
-                'attendance_status': attendance_status,
-                'total_records': len(response.data)
+                'counts': view['counts'],
+                'attendance_status': view['attendance_status'],
+                'activities': view['activities'],
+                'total_records': view['total_records']
             }
-            
+
         except Exception as e:
-            logger.error(f"출석 기록 조회 에러: {str(e)}")
+            logger.error(f"교시 현황 조회 에러: {str(e)}")
             return {
                 'success': False,
                 'error': str(e)
             }
+
+    def get_attendance_records(self, attendance_date: str, period: int, 
+                             classroom: Optional[str] = None) -> Dict[str, Any]:
+        """출석 기록 조회 (교시 현황의 상태별 목록)"""
+        result = self.get_period_status(attendance_date, period, classroom)
+        if not result['success']:
+            return result
+
+        return {
+            'success': True,
+            'attendance_status': result['attendance_status'],
+            'total_records': result['total_records']
+        }
     
     def mark_attendance_bulk(self, attendance_date: str, period: int, 
                            student_emails: List[str], status: str,
@@ -320,97 +296,36 @@ class AttendanceService:
         """일괄 출석 처리"""
         try:
             # 처리자 ID 조회
-            marker_response = self.supabase.client.table('users') \
-                .select('id') \
-                .eq('email', marked_by_email) \
-                .single() \
-                .execute()
-            
-            marked_by_id = marker_response.data['id']
-            
-            # 학생 ID 조회
-            students_response = self.supabase.client.table('users') \
-                .select('id, email') \
-                .in_('email', student_emails) \
-                .eq('role', 'student') \
-                .execute()
+            marker = self.supabase.get_user_by_email(marked_by_email)
+            if not marker:
+                return {
+                    'success': False,
+                    'error': '처리자를 찾을 수 없습니다.'
+                }
             
-            student_id_map = {student['email']: student['id'] for student in students_response.data}
+            marked_by_id = marker['id']
             
-            processed_count = 0
+            # 학생 정보 조회 (학생 디렉터리 캐시) 후 정정 이벤트로 일괄 기록
+            events = []
             
             for email in student_emails:
-                if email not in student_id_map:
+                student = student_directory.get(email)
+                if not student:
                     logger.warning(f"학생을 찾을 수 없음: {email}")
                     continue
                 
-                student_id = student_id_map[email]
-                current_time = datetime.now().isoformat()
-                
-                # 기존 기록 확인
-                existing_response = self.supabase.client.table('attendance_records') \
-                    .select('id, status') \
-                    .eq('attendance_date', attendance_date) \
-                    .eq('period', period) \
-                    .eq('student_id', student_id) \
-                    .execute()
-                
-                if existing_response.data:
-                    # 기존 기록 업데이트
-                    existing_record = existing_response.data[0]
-                    update_data = {
-                        'status': status,
-                        'notes': notes,
-                        'updated_at': current_time
-                    }
-                    
-                    if status == 'absent':
-                        update_data.update({
-                            'marked_by': marked_by_id,
-                            'marked_at': current_time
-                        })
-                    elif status in ['returned', 'present']:
-                        update_data.update({
-                            'returned_by': marked_by_id,
-                            'returned_at': current_time
-                        })
-                    
-                    self.supabase.client.table('attendance_records') \
-                        .update(update_data) \
-                        .eq('id', existing_record['id']) \
-                        .execute()
-                        
-                else:
-                    # 새 기록 생성
-                    insert_data = {
-                        'attendance_date': attendance_date,
-                        'period': period,
-                        'student_id': student_id,
-                        'student_email': email,
-                        'status': status,
-                        'notes': notes
-                    }
-                    
-                    if status == 'absent':
-                        insert_data.update({
-                            'marked_by': marked_by_id,
-                            'marked_at': current_time
-                        })
-                    elif status in ['returned', 'present']:
-                        insert_data.update({
-                            'returned_by': marked_by_id,
-                            'returned_at': current_time
-                        })
-                    
-                    self.supabase.client.table('attendance_records') \
-                        .insert(insert_data) \
-                        .execute()
-                
-                processed_count += 1
+                events.append(attendance_events.build_event(
+                    'correction', attendance_date, period, student,
+                    actor_id=marked_by_id, status=status, notes=notes
+                ))
+            
+            append_result = attendance_events.append_events(events)
+            if not append_result['success']:
+                return append_result
             
             return {
                 'success': True,
-                'processed_count': processed_count
+                'processed_count': append_result['appended_count']
             }
             
         except Exception as e:
@@ -420,80 +335,77 @@ class AttendanceService:
                 'error': str(e)
             }
     
-    def get_activity_records(self, activity_date: str, period: int) -> Dict[str, Any]:
-        """활동 기록 조회 (분임토의실 등)"""
-        try:
-            response = self.supabase.client.table('attendance_records') \
-                .select('*, users(name, student_profiles(student_id))') \
-                .eq('attendance_date', activity_date) \
-                .eq('period', period) \
-                .eq('status', 'activity') \
-                .execute()
-            
-            activities = []
-            for record in response.data:
-                activities.append({
-                    'student_email': record['student_email'],
-                    'student_name': record['users']['name'] if record['users'] else '알 수 없음',
-                    'student_number': record['users']['student_profiles'][0]['student_id'] if record['users'] and record['users']['student_profiles'] else '',
-                    'activity_type': record['activity_type'],
-                    'activity_location': record['activity_location'],
-                    'notes': record['notes']
-                })
-            
-            return {
-                'success': True,
-                'activities': activities,
-                'total_count': len(activities)
-            }
-            
-        except Exception as e:
-            logger.error(f"활동 기록 조회 에러: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+    def get_activity_records(self, activity_date: str, period: int,
+                             classroom: Optional[str] = None) -> Dict[str, Any]:
+        """활동 기록 조회 (분임토의실 등, 교시 현황의 활동 목록)"""
+        result = self.get_period_status(activity_date, period, classroom)
+        if not result['success']:
+            return result
+
+        return {
+            'success': True,
+            'activities': result['activities'],
+            'total_count': len(result['activities'])
+        }
     
-    def get_attendance_statistics(self, date_from: str, date_to: str) -> Dict[str, Any]:
-        """출석 통계 조회"""
+    def get_attendance_statistics(self, date_from: str, date_to: str, page_size: int = 1000) -> Dict[str, Any]:
+        """
+        출석 통계 조회 (기간 내 기록을 키셋 페이지로 한 번 훑어 집계)
+
+        기록이 없는 학생은 출석이므로 운영하는 교시마다 재학생 전체를 한 건으로 세고,
+        예외 상태 기록 수를 빼서 출석 수를 구합니다. 교시 설정도 기간 전체를 한 번에 읽습니다.
+        """
         try:
-            response = self.supabase.client.table('attendance_records') \
-                .select('attendance_date, period, status, student_email') \
-                .gte('attendance_date', date_from) \
-                .lte('attendance_date', date_to) \
-                .execute()
+            scheduled = PeriodService().scheduled_periods_between(str(date_from), str(date_to))
+            mask = student_directory.all_mask()
+            total = mask.bit_count()
             
-            # 통계 계산
             stats = {
-                'total_records': len(response.data),
+                'total_records': 0,
                 'by_status': {},
                 'by_date': {},
                 'by_period': {}
             }
             
-            for record in response.data:
-                status = record['status']
-                date = record['attendance_date']
-                period = record['period']
-                
-                # 상태별 통계
-                if status not in stats['by_status']:
-                    stats['by_status'][status] = 0
-                stats['by_status'][status] += 1
-                
-                # 날짜별 통계
-                if date not in stats['by_date']:
-                    stats['by_date'][date] = {'total': 0, 'absent': 0, 'present': 0}
-                stats['by_date'][date]['total'] += 1
-                if status in stats['by_date'][date]:
-                    stats['by_date'][date][status] += 1
-                
-                # 교시별 통계
-                if period not in stats['by_period']:
-                    stats['by_period'][period] = {'total': 0, 'absent': 0, 'present': 0}
-                stats['by_period'][period]['total'] += 1
-                if status in stats['by_period'][period]:
-                    stats['by_period'][period][status] += 1
+            # 운영 교시마다 재학생 전체를 출석으로 두고 시작
+            slots = {(day, period) for day, periods in scheduled.items() for period in periods}
+            for day, period in sorted(slots):
+                stats['total_records'] += total
+                for bucket in (stats['by_date'].setdefault(day, {'total': 0, 'absent': 0, 'present': 0}),
+                               stats['by_period'].setdefault(period, {'total': 0, 'absent': 0, 'present': 0})):
+                    bucket['total'] += total
+                    bucket['present'] += total
+            if slots:
+                stats['by_status']['present'] = total * len(slots)
+            
+            # 예외 상태 기록만큼 출석에서 옮김 (보관 테이블 포함, 운영 교시와 재학생만)
+            for table, segment_from, segment_to in archive_service.tables_for(date_from, date_to):
+                after = None
+                while True:
+                    page = self.supabase.get_attendance_records_page(segment_from, segment_to, after,
+                                                                     page_size, table) or []
+                    for record in page:
+                        day, period, status = str(record['attendance_date']), int(record['period']), record['status']
+                        if (day, period) not in slots or status not in SNAPSHOT_STATUSES:
+                            continue
+                        index = student_directory.index_of(record['student_email'])
+                        if index is None or not (mask >> index) & 1:
+                            continue
+                        
+                        stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
+                        stats['by_status']['present'] -= 1
+                        for bucket in (stats['by_date'][day], stats['by_period'][period]):
+                            bucket['present'] -= 1
+                            if status == 'absent':
+                                bucket['absent'] += 1
+                    
+                    if len(page) < page_size:
+                        break
+                    last = page[-1]
+                    after = (last['attendance_date'], last['period'], last['id'])
+            
+            if not stats['by_status'].get('present'):
+                stats['by_status'].pop('present', None)
             
             return {
                 'success': True,
@@ -506,4 +418,4 @@ class AttendanceService:
             return {
                 'success': False,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
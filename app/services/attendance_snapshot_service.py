@@ -0,0 +1,323 @@
+"""
+출석 스냅샷 서비스
+Attendance Snapshot Service (bitset per status for each date/period)
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
+
+from .supabase_service import SupabaseService
+from .student_directory_service import student_directory
+from .attendance_event_service import applied_status
+from .archive_service import archive_service
+
+logger = logging.getLogger(__name__)
+
+# 비트셋으로 관리하는 상태 (기록이 없으면 'present')
+SNAPSHOT_STATUSES = ('absent', 'returned', 'activity', 'late', 'early_leave', 'excused')
+
+class AttendanceSnapshot:
+    """한 날짜/교시의 출석 상태를 상태별 비트셋으로 보관하는 클래스"""
+
+    def __init__(self, attendance_date: str, period: int):
+        self.attendance_date = attendance_date
+        self.period = period
+        self.bits: Dict[str, int] = {status: 0 for status in SNAPSHOT_STATUSES}
+        self.details: Dict[int, Dict[str, Any]] = {}
+        self.version = 0
+        self.loaded_at = time.monotonic()
+
+    def set_status(self, index: int, status: str, details: Optional[Dict[str, Any]] = None):
+        """학생 인덱스의 상태 변경 (해당 비트만 켜고 나머지는 끔)"""
+        bit = 1 << index
+        for name in SNAPSHOT_STATUSES:
+            if name == status:
+                self.bits[name] |= bit
+            else:
+                self.bits[name] &= ~bit
+
+        if status in SNAPSHOT_STATUSES and details:
+            self.details[index] = details
+        else:
+            self.details.pop(index, None)
+
+        self.version += 1
+
+    def status_of(self, index: int) -> str:
+        """학생 인덱스의 현재 상태"""
+        bit = 1 << index
+        for name in SNAPSHOT_STATUSES:
+            if self.bits[name] & bit:
+                return name
+        return 'present'
+
+    def has(self, status: str, index: int) -> bool:
+        """학생이 특정 상태인지 확인"""
+        return bool(self.bits.get(status, 0) >> index & 1)
+
+    def count(self, status: str, mask: Optional[int] = None) -> int:
+        """상태별 학생 수 (mask가 있으면 해당 학생들로 한정)"""
+        bits = self.bits.get(status, 0)
+        if mask is not None:
+            bits &= mask
+        return bits.bit_count()
+
+    def indexes(self, status: str) -> List[int]:
+        """특정 상태인 학생 인덱스 목록"""
+        bits = self.bits.get(status, 0)
+        result = []
+        while bits:
+            low = bits & -bits
+            result.append(low.bit_length() - 1)
+            bits ^= low
+        return result
+
+class AttendanceSnapshotService:
+    """
+    날짜/교시별 출석 스냅샷을 메모리에 유지하는 서비스 클래스
+
+    같은 프로세스의 쓰기는 이벤트 리스너로 즉시 반영됩니다. 다른 워커 프로세스의 쓰기는
+    보이지 않으므로 스냅샷은 ttl_seconds가 지나면 다시 적재합니다.
+    """
+
+    def __init__(self, max_snapshots: int = 64, ttl_seconds: int = 30):
+        self.supabase = SupabaseService()
+        self.directory = student_directory
+        self.archive = archive_service
+        self.max_snapshots = max_snapshots
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.RLock()
+        self._snapshots: 'OrderedDict[tuple, AttendanceSnapshot]' = OrderedDict()
+        # (날짜, 교시, 범위) -> (스냅샷, 버전, 대상 마스크, 조회 결과)
+        self._views: Dict[tuple, tuple] = {}
+
+    @staticmethod
+    def _key(attendance_date, period) -> tuple:
+        return (str(attendance_date), int(period))
+
+    def get(self, attendance_date, period: int) -> AttendanceSnapshot:
+        """
+        스냅샷 조회 (없거나 TTL이 지났으면 attendance_records에서 다시 적재)
+
+        Args:
+            attendance_date: 날짜
+            period: 교시
+
+        Returns:
+            해당 날짜/교시의 스냅샷
+        """
+        key = self._key(attendance_date, period)
+
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and time.monotonic() - snapshot.loaded_at <= self.ttl_seconds:
+                self._snapshots.move_to_end(key)
+                return snapshot
+
+        snapshot = self._load(*key)
+
+        with self._lock:
+            # 적재하는 동안 다른 요청이 먼저 새로 넣었다면 그쪽을 사용
+            existing = self._snapshots.get(key)
+            if existing is not None and existing.loaded_at >= snapshot.loaded_at:
+                return existing
+
+            self._snapshots[key] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                evicted, _ = self._snapshots.popitem(last=False)
+                for view_key in [k for k in self._views if k[:2] == evicted]:
+                    del self._views[view_key]
+            return snapshot
+
+    def _load(self, attendance_date: str, period: int) -> AttendanceSnapshot:
+        """출석 기록에서 스냅샷 생성 (보관된 날짜는 보관 테이블 포함)"""
+        snapshot = AttendanceSnapshot(attendance_date, period)
+        rows = []
+        for table, _, _ in self.archive.tables_for(attendance_date):
+            rows.extend(self.supabase.get_attendance_status_rows(attendance_date, period, table) or [])
+
+        for row in rows:
+            index = self.directory.index_of(row['student_email'])
+            if index is None:
+                continue
+            snapshot.set_status(index, row['status'], self._details(row))
+
+        return snapshot
+
+    @staticmethod
+    def _details(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'notes': row.get('notes', ''),
+            'activity_type': row.get('activity_type', ''),
+            'activity_location': row.get('activity_location', ''),
+            'version': row.get('version', 0)
+        }
+
+    def apply_events(self, events: List[Dict[str, Any]]):
+        """출석 이벤트 리스너: DB에 적용된 결과 상태를 적재된 스냅샷에 반영 (로컬 상태로 다시 계산하지 않음)"""
+        for event in events:
+            key = self._key(event['attendance_date'], event['period'])
+            if key not in self._snapshots:
+                continue
+
+            index = self.directory.index_of(event['student_email'])
+            if index is None:
+                continue
+
+            with self._lock:
+                snapshot = self._snapshots.get(key)
+                if snapshot is None:
+                    continue
+
+                snapshot.set_status(index, applied_status(event), self._details(event))
+
+    def invalidate(self, attendance_date=None, period: Optional[int] = None):
+        """스냅샷 무효화 (인자가 없으면 전체)"""
+        with self._lock:
+            if attendance_date is None:
+                self._snapshots.clear()
+                self._views.clear()
+                return
+
+            for key in list(self._snapshots):
+                if key[0] == str(attendance_date) and (period is None or key[1] == int(period)):
+                    del self._snapshots[key]
+
+            for key in list(self._views):
+                if key[0] == str(attendance_date) and (period is None or key[1] == int(period)):
+                    del self._views[key]
+
+    def status_of(self, attendance_date, period: int, student_email: str) -> str:
+        """학생의 해당 교시 상태 ('present' 기본값)"""
+        index = self.directory.index_of(student_email)
+        if index is None:
+            return 'present'
+        return self.get(attendance_date, period).status_of(index)
+
+    def is_absent(self, attendance_date, period: int, student_email: str) -> bool:
+        """학생이 해당 교시에 부재 상태인지 확인"""
+        index = self.directory.index_of(student_email)
+        if index is None:
+            return False
+        return self.get(attendance_date, period).has('absent', index)
+
+    def count(self, attendance_date, period: int, status: str,
+              grade: Optional[int] = None, class_number: Optional[int] = None) -> int:
+        """상태별 학생 수 (학년/학급 단위 집계 가능, 재학생만)"""
+        if grade is not None and class_number is not None:
+            mask = self.directory.class_mask(grade, class_number)
+        elif grade is not None:
+            mask = self.directory.grade_mask(grade)
+        else:
+            mask = self.directory.all_mask()
+        return self.get(attendance_date, period).count(status, mask)
+
+    def status_counts(self, attendance_date, period: int,
+                      grade: Optional[int] = None, class_number: Optional[int] = None) -> Dict[str, int]:
+        """
+        상태별 학생 수 (기록이 없는 학생은 출석으로 계산)
+
+        예외 상태(부재/복귀/활동)만 저장하므로 출석 인원은 명단에서 예외 인원을 빼서 구합니다.
+        """
+        if grade is not None and class_number is not None:
+            mask = self.directory.class_mask(grade, class_number)
+        elif grade is not None:
+            mask = self.directory.grade_mask(grade)
+        else:
+            mask = self.directory.all_mask()
+
+        snapshot = self.get(attendance_date, period)
+        counts = {status: snapshot.count(status, mask) for status in SNAPSHOT_STATUSES}
+        counts['present'] = mask.bit_count() - sum(counts.values())
+        return counts
+
+    def students_with_status(self, attendance_date, period: int, status: str) -> List[Dict[str, Any]]:
+        """특정 상태인 학생 정보 목록"""
+        snapshot = self.get(attendance_date, period)
+        students = []
+        for index in snapshot.indexes(status):
+            student = self.directory.get_by_index(index)
+            if student:
+                students.append(student)
+        return students
+
+    def period_view(self, attendance_date, period: int, mask: Optional[int] = None,
+                    scope: Optional[str] = None) -> Dict[str, Any]:
+        """
+        교시별 출석/활동 현황 (스냅샷 한 번으로 상태별 목록과 활동 목록을 함께 구성)
+
+        같은 스냅샷 버전이면 이전에 만든 결과를 그대로 돌려주므로, 상태 폴링은
+        스냅샷이 처음 적재될 때 한 번만 원본을 읽습니다.
+
+        Args:
+            attendance_date: 날짜
+            period: 교시
+            mask: 대상 학생 비트마스크 (없으면 전체 학생)
+            scope: 결과 캐시 구분 키 (mask를 쓸 때 지정, 예: 교실명)
+
+        Returns:
+            상태별 인원(counts), 상태별 학생 목록(attendance_status), 활동 목록(activities)
+        """
+        snapshot = self.get(attendance_date, period)
+        key = self._key(attendance_date, period) + (scope,)
+
+        with self._lock:
+            if mask is None:
+                mask = self.directory.all_mask()
+
+            cached = self._views.get(key)
+            if cached and cached[0] is snapshot and cached[1] == snapshot.version and cached[2] == mask:
+                return cached[3]
+
+            attendance_status = {status: [] for status in SNAPSHOT_STATUSES}
+            activities = []
+            for status in SNAPSHOT_STATUSES:
+                for index in snapshot.indexes(status):
+                    if not mask >> index & 1:
+                        continue
+                    student = self.directory.get_by_index(index)
+                    if not student:
+                        continue
+
+                    details = snapshot.details.get(index, {})
+                    attendance_status[status].append({
+                        'id': student['uid'],
+                        'email': student['email'],
+                        'name': student['name'],
+                        'number': student['no'],
+                        'status': status,
+                        'notes': details.get('notes', ''),
+                        'activity_type': details.get('activity_type', ''),
+                        'activity_location': details.get('activity_location', ''),
+                        'version': details.get('version', 0)
+                    })
+
+                    if status == 'activity':
+                        activities.append({
+                            'student_email': student['email'],
+                            'student_name': student['name'],
+                            'student_number': student['no'],
+                            'activity_type': details.get('activity_type', ''),
+                            'activity_location': details.get('activity_location', ''),
+                            'notes': details.get('notes', '')
+                        })
+
+            counts = {status: len(students) for status, students in attendance_status.items()}
+            counts['present'] = mask.bit_count() - sum(counts.values())
+
+            view = {
+                'counts': counts,
+                'attendance_status': attendance_status,
+                'activities': activities,
+                'total_records': sum(counts[status] for status in SNAPSHOT_STATUSES),
+                'version': snapshot.version
+            }
+            self._views[key] = (snapshot, snapshot.version, mask, view)
+            return view
+
+# 전역 서비스 인스턴스
+attendance_snapshots = AttendanceSnapshotService()
@@ -0,0 +1,189 @@
+"""
+통합 출석 저장소
+Unified Attendance Store (attendance_records for both seating and class attendance, dual-read of legacy `attendance`)
+"""
+
+import logging
+from typing import Dict, List, Optional, Any
+
+from .supabase_service import SupabaseService
+from .student_directory_service import student_directory
+from .attendance_event_service import attendance_events
+
+logger = logging.getLogger(__name__)
+
+# 대시보드(학급 출석) 한글 상태 -> 통합 상태 (출석은 기록하지 않음)
+LEGACY_STATUSES = {
+    '출석': 'present',
+    '지각': 'late',
+    '조퇴': 'early_leave',
+    '결석': 'absent',
+    '공결': 'excused'
+}
+
+# 통합 상태 표시 이름
+STATUS_LABELS = {
+    'present': '출석',
+    'late': '지각',
+    'early_leave': '조퇴',
+    'absent': '결석',
+    'excused': '공결',
+    'returned': '복귀',
+    'activity': '활동'
+}
+
+RECORD_COLUMNS = 'id,class_id,attendance_date,period,student_email,status,notes'
+
+class AttendanceStore:
+    """
+    출석 기록의 단일 진입점
+
+    쓰기는 모두 출석 이벤트로 attendance_records에 반영합니다. dual_read를 켜면 옛 attendance
+    테이블의 기록도 함께 읽어 합칩니다 (마이그레이션이 기록을 옮겨 두므로 기본은 끔).
+    """
+
+    def __init__(self, dual_read: bool = False):
+        self.supabase = SupabaseService()
+        self.directory = student_directory
+        self.dual_read = dual_read
+
+    @staticmethod
+    def normalize_status(status: str) -> Optional[str]:
+        """한글/영문 상태를 통합 상태로 변환 (알 수 없으면 None)"""
+        if status in STATUS_LABELS:
+            return status
+        return LEGACY_STATUSES.get(status)
+
+    @staticmethod
+    def _from_legacy(row: Dict[str, Any]) -> Dict[str, Any]:
+        """옛 attendance 행을 통합 형식으로 변환"""
+        return {
+            'id': row['id'],
+            'class_id': row.get('class_id'),
+            'attendance_date': row['attendance_date'],
+            'period': row['period'],
+            'student_email': row['student_email'],
+            'status': LEGACY_STATUSES.get(row['status'], row['status']),
+            'notes': row.get('note')
+        }
+
+    @staticmethod
+    def _with_labels(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for row in rows:
+            row['status_label'] = STATUS_LABELS.get(row['status'], row['status'])
+        return rows
+
+    def _merge(self, rows: List[Dict[str, Any]], legacy_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """통합 기록 우선으로 (날짜, 교시, 학생) 중복 제거 (출석 행은 제외)"""
+        seen = {(str(row['attendance_date']), int(row['period']), row['student_email']) for row in rows}
+        merged = list(rows)
+        for legacy in legacy_rows:
+            row = self._from_legacy(legacy)
+            key = (str(row['attendance_date']), int(row['period']), row['student_email'])
+            if row['status'] == 'present' or key in seen:
+                continue
+            seen.add(key)
+            merged.append(row)
+        return merged
+
+    def record(self, student_email: str, attendance_date, period: int, status: str,
+               class_id: Optional[str] = None, actor_id: Optional[str] = None,
+               notes: str = '', expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        출석 상태 기록 (정정 이벤트 1건, 사전 조회 없이 RPC 1회)
+
+        Args:
+            student_email: 학생 이메일
+            attendance_date: 날짜
+            period: 교시
+            status: 통합 상태 또는 한글 상태
+            class_id: 학급 출석인 경우 학급 ID
+            actor_id: 처리한 사용자 ID
+            notes: 비고
+            expected_version: 지정하면 현재 기록 버전이 같을 때만 기록
+
+        Returns:
+            기록 결과 (이전 상태와 새 버전 포함, 버전이 다르면 conflict)
+        """
+        normalized = self.normalize_status(status)
+        if normalized is None:
+            return {'success': False, 'error': f'알 수 없는 출석 상태: {status}'}
+
+        student = self.directory.get(student_email)
+        if not student:
+            return {'success': False, 'error': '학생 정보를 찾을 수 없습니다.'}
+
+        event = attendance_events.build_event(
+            'correction', attendance_date, period, student,
+            actor_id=actor_id, status=normalized, notes=notes, class_id=class_id,
+            expected_version=expected_version
+        )
+        result = attendance_events.append_events([event])
+        if not result['success']:
+            return result
+
+        outcome = result['results'][0] or {}
+        if outcome.get('reason') == 'conflict':
+            return {
+                'success': False,
+                'conflict': True,
+                'error': '다른 사용자가 먼저 출석 상태를 변경했습니다.',
+                'status': outcome['status'],
+                'version': outcome['version']
+            }
+
+        return {
+            'success': True,
+            'status': normalized,
+            'previous_status': outcome.get('previous_status'),
+            'version': outcome.get('version')
+        }
+
+    def student_page(self, student_email: str, before: Optional[tuple] = None,
+                     limit: int = 30, attendance_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """학생 출석 기록 페이지 (최신순, before = (날짜, 교시), attendance_date를 주면 그날만)"""
+        rows = self.supabase.get_student_attendance_page(student_email, before, limit,
+                                                         attendance_date=attendance_date) or []
+
+        if self.dual_read:
+            legacy = self.supabase.get_student_attendance_page(student_email, before, limit, table='attendance',
+                                                               attendance_date=attendance_date) or []
+            rows = self._merge(rows, legacy)
+            rows.sort(key=lambda row: (str(row['attendance_date']), int(row['period'])), reverse=True)
+            rows = rows[:limit]
+
+        return self._with_labels(rows)
+
+    def student_statuses(self, student_email: str) -> List[Dict[str, Any]]:
+        """학생의 모든 출석 상태 (날짜, 교시, 상태만)"""
+        rows = self.supabase.get_student_attendance_statuses(student_email) or []
+        if self.dual_read:
+            rows = self._merge(
+                [dict(row, student_email=student_email) for row in rows],
+                [dict(row, student_email=student_email, id=None)
+                 for row in self.supabase.get_student_attendance_statuses(student_email, table='attendance') or []]
+            )
+        return rows
+
+    def day_statuses(self, attendance_date: str) -> List[Dict[str, Any]]:
+        """날짜별 학급 출석 상태 (학급 ID, 학생 이메일, 상태)"""
+        rows = self.supabase.get_attendance_day_statuses(attendance_date) or []
+        if self.dual_read:
+            rows = self._merge(
+                [dict(row, attendance_date=attendance_date) for row in rows],
+                [dict(row, attendance_date=attendance_date, id=None)
+                 for row in self.supabase.get_attendance_day_statuses(attendance_date, table='attendance') or []]
+            )
+        return rows
+
+    def class_records(self, class_id: str, attendance_date: Optional[str] = None,
+                      period: Optional[int] = None) -> List[Dict[str, Any]]:
+        """학급 출석 기록 (날짜/교시 지정 가능)"""
+        rows = self.supabase.get_class_attendance(class_id, attendance_date, period) or []
+        if self.dual_read:
+            rows = self._merge(rows, self.supabase.get_class_attendance(class_id, attendance_date, period, table='attendance') or [])
+            rows.sort(key=lambda row: (str(row['attendance_date']), int(row['period'])), reverse=True)
+        return self._with_labels(rows)
+
+# 전역 저장소 인스턴스
+attendance_store = AttendanceStore()
@@ -0,0 +1,243 @@
+"""
+자동 자리배치 서비스
+Auto Seating Service (greedy band placement + local-search swaps over a compiled seat grid)
+"""
+
+import logging
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Any
+
+from .seat_grid_service import SeatGrid, ROWS_PER_LINE, seat_grids
+
+logger = logging.getLogger(__name__)
+
+# 떨어뜨려야 할 두 학생이 이웃한 경우의 비용 (반 경계 한 칸 = 1)
+SEPARATION_WEIGHT = 50
+
+class AutoSeatingService:
+    """
+    교실 레이아웃에 학생들을 자동으로 배치하는 서비스 클래스
+
+    1. 고정 좌석을 먼저 채움
+    2. 나머지 학생을 (학년, 반, 학번) 순서로 뱀 모양 슬롯 순서(열마다 위아래를 번갈아)에
+       채움 - 같은 반이 한 덩어리로 이어짐
+    3. 비용(반 경계 수 + 떨어뜨릴 쌍이 이웃한 수 * SEPARATION_WEIGHT)을 줄이는 교환만
+       받아들이는 지역 탐색. 같은 반끼리 교환은 반 경계를 바꾸지 않으므로 먼저 시도합니다.
+
+    이웃: 반 경계는 상하좌우, 떨어뜨릴 쌍은 대각선까지 포함합니다. 휴식 구간(break) 섹션은
+    한 칸 띄운 것으로 봅니다.
+    """
+
+    def __init__(self, max_iterations: int = 20000, max_stall: int = 2000):
+        self.max_iterations = max_iterations
+        self.max_stall = max_stall
+
+    @staticmethod
+    def _geometry(grid: SeatGrid):
+        """슬롯별 (x, y) 좌표와 상하좌우/대각선 이웃 목록, 뱀 모양 채움 순서"""
+        line_x = []
+        x = 0
+        for section in grid.sections:
+            if section['type'] == 'break':
+                x += 1
+                continue
+            for _ in section['cols']:
+                line_x.append(x)
+                x += 1
+
+        coordinates = {}
+        for slot in range(grid.slot_count):
+            coordinates[(line_x[slot // ROWS_PER_LINE], slot % ROWS_PER_LINE)] = slot
+
+        near: List[List[int]] = [[] for _ in range(grid.slot_count)]
+        around: List[List[int]] = [[] for _ in range(grid.slot_count)]
+        for (sx, sy), slot in coordinates.items():
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    other = coordinates.get((sx + dx, sy + dy))
+                    if other is None or other == slot:
+                        continue
+                    around[slot].append(other)
+                    if dx == 0 or dy == 0:
+                        near[slot].append(other)
+
+        order = []
+        for line in range(len(grid.line_keys)):
+            rows = range(ROWS_PER_LINE) if line % 2 == 0 else range(ROWS_PER_LINE - 1, -1, -1)
+            order.extend(line * ROWS_PER_LINE + row for row in rows)
+
+        return near, around, order
+
+    def arrange(self, layout: Dict[str, Any], students: List[Dict[str, Any]],
+                fixed: Optional[List[Dict[str, Any]]] = None,
+                separate: Optional[Iterable[Iterable[str]]] = None,
+                keep_classes: bool = True, seed: int = 0) -> Dict[str, Any]:
+        """
+        자동 자리배치
+
+        Args:
+            layout: classroom_layouts 행 (layout_config 포함)
+            students: 학생 목록 ('email', 'grade', 'class_number', 'no')
+            fixed: 고정 좌석 [{'email', 'position_key', 'row'}] (row는 SeatGrid 기준, 0 = 열의 마지막 학생)
+            separate: 이웃하면 안 되는 학생 이메일 쌍 목록
+            keep_classes: 같은 반을 이어 앉힐지 여부 (False면 반 경계 비용 없음)
+            seed: 교환 후보 선택 난수 시드 (같은 입력 = 같은 결과)
+
+        Returns:
+            arrangements (position_key -> 학생 이메일 목록, 저장 API 형식), 배치/미배치 수,
+            남은 위반 쌍, 비용, 소요 시간
+        """
+        started = time.perf_counter()
+        grid = seat_grids.get(layout)
+        near, around, order = self._geometry(grid)
+
+        by_email = {student['email']: student for student in students}
+        group = {
+            email: (student.get('grade') or 0, student.get('class_number') or 0) if keep_classes else None
+            for email, student in by_email.items()
+        }
+        partners: Dict[str, set] = {}
+        for pair in separate or []:
+            first, second = list(pair)[:2]
+            partners.setdefault(first, set()).add(second)
+            partners.setdefault(second, set()).add(first)
+
+        seats: List[Optional[str]] = [None] * grid.slot_count
+        locked = [False] * grid.slot_count
+        errors = []
+
+        # 1. 고정 좌석
+        for item in fixed or []:
+            line = grid.line_index.get(item.get('position_key'))
+            row = int(item.get('row', 0))
+            email = item.get('email')
+            if line is None or not 0 <= row < ROWS_PER_LINE or email not in by_email:
+                errors.append({'email': email, 'error': '고정 좌석을 찾을 수 없습니다.'})
+                continue
+            slot = line * ROWS_PER_LINE + row
+            if seats[slot] is not None:
+                errors.append({'email': email, 'error': '이미 고정된 좌석입니다.'})
+                continue
+            seats[slot] = email
+            locked[slot] = True
+
+        placed = set(seat for seat in seats if seat)
+
+        # 2. 반 순서대로 뱀 모양 채움
+        queue = sorted(
+            (student for email, student in by_email.items() if email not in placed),
+            key=lambda student: (student.get('grade') or 0, student.get('class_number') or 0,
+                                 str(student.get('no') or ''), student['email'])
+        )
+        free_slots = [slot for slot in order if seats[slot] is None]
+        for slot, student in zip(free_slots, queue):
+            seats[slot] = student['email']
+        unplaced = [student['email'] for student in queue[len(free_slots):]]
+
+        # 3. 지역 탐색
+        def local_cost(slot: int) -> int:
+            email = seats[slot]
+            if email is None:
+                return 0
+            cost = 0
+            mine = group[email]
+            if mine is not None:
+                for other in near[slot]:
+                    other_email = seats[other]
+                    if other_email is not None and group[other_email] != mine:
+                        cost += 1
+            mates = partners.get(email)
+            if mates:
+                for other in around[slot]:
+                    if seats[other] in mates:
+                        cost += SEPARATION_WEIGHT
+            return cost
+
+        def swap_delta(a: int, b: int) -> int:
+            before = local_cost(a) + local_cost(b)
+            seats[a], seats[b] = seats[b], seats[a]
+            after = local_cost(a) + local_cost(b)
+            seats[a], seats[b] = seats[b], seats[a]
+            return after - before
+
+        def violations() -> List[int]:
+            return [slot for slot, email in enumerate(seats)
+                    if email in partners and any(seats[other] in partners[email] for other in around[slot])]
+
+        rng = random.Random(seed)
+        movable = [slot for slot in range(grid.slot_count) if not locked[slot]]
+        same_group: Dict[Any, List[int]] = {}
+        for slot in movable:
+            if seats[slot] is not None:
+                same_group.setdefault(group[seats[slot]], []).append(slot)
+
+        iterations = 0
+        while iterations < self.max_iterations and movable:
+            pending = [slot for slot in violations() if not locked[slot]]
+            if not pending:
+                break
+
+            improved = False
+            for slot in pending:
+                if seats[slot] is None or not any(seats[o] in partners.get(seats[slot], ()) for o in around[slot]):
+                    continue
+                # 같은 반(경계 비용 불변) 후보 먼저, 그다음 아무 좌석이나
+                candidates = same_group.get(group[seats[slot]], [])
+                for pool in (candidates, movable):
+                    for other in rng.sample(pool, min(len(pool), 64)):
+                        iterations += 1
+                        if other != slot and swap_delta(slot, other) < 0:
+                            seats[slot], seats[other] = seats[other], seats[slot]
+                            improved = True
+                            break
+                    else:
+                        continue
+                    break
+            if not improved:
+                break
+
+        # 반 경계 다듬기 (무작위 교환 중 비용이 줄어드는 것만, 연속 실패가 쌓이면 중단)
+        stalled = 0
+        while iterations < self.max_iterations and keep_classes and len(movable) > 1 and stalled < self.max_stall:
+            iterations += 1
+            stalled += 1
+            a, b = rng.sample(movable, 2)
+            if seats[a] != seats[b] and swap_delta(a, b) < 0:
+                seats[a], seats[b] = seats[b], seats[a]
+                stalled = 0
+
+        total_cost = sum(local_cost(slot) for slot in range(grid.slot_count)) // 2
+        remaining = sorted({
+            tuple(sorted((seats[slot], seats[other])))
+            for slot in violations() for other in around[slot]
+            if seats[other] in partners.get(seats[slot], ())
+        })
+
+        return {
+            'success': True,
+            'arrangements': self.to_arrangements(grid, seats),
+            'placed': grid.slot_count - seats.count(None),
+            'unplaced': unplaced,
+            'errors': errors,
+            'violations': [list(pair) for pair in remaining],
+            'cost': total_cost,
+            'iterations': iterations,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    @staticmethod
+    def to_arrangements(grid: SeatGrid, seats: List[Optional[str]]) -> Dict[str, List[str]]:
+        """슬롯 배치를 저장 API 형식으로 변환 (열의 학생 목록은 뒤에서부터 행 0, 빈 행은 '')"""
+        arrangements = {}
+        for line, position_key in enumerate(grid.line_keys):
+            rows = seats[line * ROWS_PER_LINE:(line + 1) * ROWS_PER_LINE]
+            emails = [email or '' for email in reversed(rows)]
+            while emails and not emails[0]:
+                emails.pop(0)
+            if emails:
+                arrangements[position_key] = emails
+        return arrangements
+
+# 전역 서비스 인스턴스
+auto_seating = AutoSeatingService()
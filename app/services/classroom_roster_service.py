@@ -0,0 +1,75 @@
+"""
+교실 명단 서비스
+Classroom Roster Service (classroom -> seated students from the seat arrangement version in force)
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, FrozenSet, Optional, Any
+
+from .student_directory_service import student_directory
+from .seat_version_service import seat_versions
+
+logger = logging.getLogger(__name__)
+
+class ClassroomRosterService:
+    """날짜별 자리배치에서 교실 소속 학생을 미리 계산해 보관하는 서비스 클래스"""
+
+    def __init__(self, ttl_seconds: int = 600, max_entries: int = 256):
+        self.directory = student_directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.RLock()
+        # (교실, 날짜) -> {'emails', 'mask', 'loaded_at'}
+        self._rosters: Dict[tuple, Dict[str, Any]] = {}
+
+    def _entry(self, classroom: str, arrangement_date) -> Dict[str, Any]:
+        """교실 명단 캐시 항목 (없거나 만료되면 그날 유효한 자리배치 버전에서 계산)"""
+        key = (classroom, str(arrangement_date))
+
+        with self._lock:
+            entry = self._rosters.get(key)
+            if entry and time.monotonic() - entry['loaded_at'] <= self.ttl_seconds:
+                return entry
+
+        seats = seat_versions.arrangement(classroom, arrangement_date)
+        emails = frozenset(email for student_emails in seats.values() for email in student_emails if email)
+
+        mask = 0
+        for email in emails:
+            index = self.directory.index_of(email)
+            if index is not None:
+                mask |= 1 << index
+
+        entry = {'emails': emails, 'mask': mask, 'loaded_at': time.monotonic()}
+
+        with self._lock:
+            self._rosters[key] = entry
+            if len(self._rosters) > self.max_entries:
+                oldest = min(self._rosters, key=lambda k: self._rosters[k]['loaded_at'])
+                del self._rosters[oldest]
+            return entry
+
+    def members(self, classroom: str, arrangement_date) -> FrozenSet[str]:
+        """교실에 배치된 학생 이메일 집합"""
+        return self._entry(classroom, arrangement_date)['emails']
+
+    def mask(self, classroom: str, arrangement_date) -> int:
+        """교실에 배치된 학생들의 비트 마스크 (학생 디렉터리 인덱스 기준)"""
+        return self._entry(classroom, arrangement_date)['mask']
+
+    def invalidate(self, classroom: Optional[str] = None, arrangement_date=None):
+        """자리배치 저장 후 명단 무효화 (인자가 없으면 전체)"""
+        with self._lock:
+            if classroom is None:
+                self._rosters.clear()
+                return
+
+            for key in list(self._rosters):
+                if key[0] == classroom and (arrangement_date is None or key[1] == str(arrangement_date)):
+                    del self._rosters[key]
+
+# 전역 서비스 인스턴스
+classroom_rosters = ClassroomRosterService()
@@ -0,0 +1,261 @@
+"""
+출석 내보내기 서비스
+Attendance Export Service (streaming CSV / XLSX)
+"""
+
+import csv
+import heapq
+import io
+import logging
+import re
+import zipfile
+from itertools import groupby
+from typing import Dict, List, Iterator, Any
+from xml.sax.saxutils import escape
+
+from .supabase_service import SupabaseService
+from .student_directory_service import student_directory
+from .archive_service import archive_service
+from .period_service import PeriodService
+
+logger = logging.getLogger(__name__)
+
+# 내보내기 컬럼 (키, 헤더)
+EXPORT_COLUMNS = [
+    ('attendance_date', '날짜'),
+    ('period', '교시'),
+    ('student_no', '학번'),
+    ('student_name', '이름'),
+    ('grade', '학년'),
+    ('class_number', '반'),
+    ('student_email', '이메일'),
+    ('status', '상태'),
+    ('marked_at', '부재 처리 시각'),
+    ('returned_at', '복귀 처리 시각'),
+    ('activity_type', '활동 유형'),
+    ('activity_location', '활동 장소'),
+    ('notes', '비고')
+]
+
+# XML에서 허용되지 않는 제어 문자
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+class _StreamBuffer:
+    """zipfile이 쓰는 바이트를 모아두었다가 조금씩 내보내는 쓰기 전용 버퍼"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class ExportService:
+    """출석 기록을 일정한 메모리로 스트리밍 내보내기 하는 서비스 클래스"""
+
+    def __init__(self, page_size: int = 1000, flush_rows: int = 500):
+        self.supabase = SupabaseService()
+        self.directory = student_directory
+        self.archive = archive_service
+        self.page_size = page_size
+        self.flush_rows = flush_rows
+
+    def iter_attendance_rows(self, date_from: str, date_to: str,
+                             include_present: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        기간 내 출석 기록을 한 페이지씩 읽어 행 단위로 반환
+
+        예외 상태만 저장하므로 출석 행은 운영하는 교시마다 재학생 명단에서 기록이 있는 학생을
+        빼서 만듭니다. 테이블별 기록을 (날짜, 교시, id) 순서로 합치므로 교시 하나 분량의 이메일만 기억합니다.
+
+        Args:
+            date_from: 시작 날짜 (YYYY-MM-DD)
+            date_to: 종료 날짜 (YYYY-MM-DD)
+            include_present: False면 저장된 예외 상태 행만 반환
+
+        Yields:
+            학생 정보가 붙은 출석 기록 행 (날짜, 교시 순서)
+        """
+        # 보관 테이블과 현재 테이블(보관 후 정정된 기록)은 기간이 겹치므로 정렬 순서대로 합침
+        records = heapq.merge(
+            *(self._iter_table_records(table, segment_from, segment_to)
+              for table, segment_from, segment_to in self.archive.tables_for(date_from, date_to)),
+            key=lambda record: (str(record['attendance_date']), int(record['period']), record['id'])
+        )
+        if not include_present:
+            for record in records:
+                yield self._row(record, self.directory.get(record['student_email']) or {})
+            return
+
+        roster = self.directory.students_in(self.directory.all_mask())
+        groups = groupby(records, key=lambda record: (str(record['attendance_date']), int(record['period'])))
+        group = next(groups, None)
+
+        for slot in self._scheduled_slots(date_from, date_to):
+            # 운영하지 않는 교시의 기록은 그대로 내보냄
+            while group is not None and group[0] < slot:
+                for record in group[1]:
+                    yield self._row(record, self.directory.get(record['student_email']) or {})
+                group = next(groups, None)
+
+            recorded = set()
+            if group is not None and group[0] == slot:
+                for record in group[1]:
+                    recorded.add(record['student_email'])
+                    yield self._row(record, self.directory.get(record['student_email']) or {})
+                group = next(groups, None)
+
+            for student in roster:
+                if student['email'] not in recorded:
+                    yield self._row({'attendance_date': slot[0], 'period': slot[1],
+                                     'student_email': student['email'], 'status': 'present'}, student)
+
+        while group is not None:
+            for record in group[1]:
+                yield self._row(record, self.directory.get(record['student_email']) or {})
+            group = next(groups, None)
+
+    def _scheduled_slots(self, date_from: str, date_to: str) -> Iterator[tuple]:
+        """기간 내 운영 교시 (날짜, 교시) 순서대로 (교시 설정 1회 조회, 없는 날은 기본 설정)"""
+        for key, periods in PeriodService().scheduled_periods_between(date_from, date_to).items():
+            for period in periods:
+                yield (key, int(period))
+
+    @staticmethod
+    def _row(record: Dict[str, Any], student: Dict[str, Any]) -> Dict[str, Any]:
+        """출석 기록에 학생 정보를 붙인 내보내기 행"""
+        return {
+            'attendance_date': record['attendance_date'],
+            'period': record['period'],
+            'student_no': student.get('no', ''),
+            'student_name': student.get('name', '알 수 없음'),
+            'grade': student.get('grade', ''),
+            'class_number': student.get('class_number', ''),
+            'student_email': record['student_email'],
+            'status': record['status'],
+            'marked_at': record.get('marked_at') or '',
+            'returned_at': record.get('returned_at') or '',
+            'activity_type': record.get('activity_type') or '',
+            'activity_location': record.get('activity_location') or '',
+            'notes': record.get('notes') or ''
+        }
+
+    def _iter_table_records(self, table: str, date_from: str, date_to: str) -> Iterator[Dict[str, Any]]:
+        """한 테이블의 기간 내 기록을 키셋 페이지 단위로 읽기"""
+        after = None
+
+        while True:
+            page = self.supabase.get_attendance_records_page(date_from, date_to, after, self.page_size, table) or []
+            yield from page
+
+            if len(page) < self.page_size:
+                break
+
+            last = page[-1]
+            after = (last['attendance_date'], last['period'], last['id'])
+
+    def iter_csv(self, date_from: str, date_to: str, include_present: bool = True) -> Iterator[bytes]:
+        """CSV 스트림 (엑셀 호환을 위해 UTF-8 BOM 포함)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([header for _, header in EXPORT_COLUMNS])
+        yield ('﻿' + buffer.getvalue()).encode('utf-8')
+
+        pending = 0
+        for row in self.iter_attendance_rows(date_from, date_to, include_present):
+            if pending == 0:
+                buffer.seek(0)
+                buffer.truncate()
+            writer.writerow([row[key] for key, _ in EXPORT_COLUMNS])
+            pending += 1
+
+            if pending >= self.flush_rows:
+                yield buffer.getvalue().encode('utf-8')
+                pending = 0
+
+        if pending:
+            yield buffer.getvalue().encode('utf-8')
+
+    def iter_xlsx(self, date_from: str, date_to: str, include_present: bool = True) -> Iterator[bytes]:
+        """XLSX 스트림 (시트 XML을 압축하면서 바로 내보냄)"""
+        out = _StreamBuffer()
+
+        with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, content in self._xlsx_parts().items():
+                archive.writestr(name, content)
+            yield out.drain()
+
+            with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+                sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                            b'<sheetData>')
+                sheet.write(self._xlsx_row([header for _, header in EXPORT_COLUMNS]))
+
+                pending = 0
+                for row in self.iter_attendance_rows(date_from, date_to, include_present):
+                    sheet.write(self._xlsx_row([row[key] for key, _ in EXPORT_COLUMNS]))
+                    pending += 1
+
+                    if pending >= self.flush_rows:
+                        data = out.drain()
+                        if data:
+                            yield data
+                        pending = 0
+
+                sheet.write(b'</sheetData></worksheet>')
+
+        yield out.drain()
+
+    @staticmethod
+    def _xlsx_row(values: List[Any]) -> bytes:
+        """한 행을 인라인 문자열/숫자 셀 XML로 변환"""
+        cells = []
+        for value in values:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c><v>{value}</v></c>')
+            else:
+                text = escape(_XML_ILLEGAL.sub('', str(value)))
+                cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        return ('<row>' + ''.join(cells) + '</row>').encode('utf-8')
+
+    @staticmethod
+    def _xlsx_parts() -> Dict[str, str]:
+        """시트 외 XLSX 필수 구성 파일"""
+        return {
+            '[Content_Types].xml': (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                '</Types>'
+            ),
+            '_rels/.rels': (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+                '</Relationships>'
+            ),
+            'xl/workbook.xml': (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                '<sheets><sheet name="출석" sheetId="1" r:id="rId1"/></sheets>'
+                '</workbook>'
+            ),
+            'xl/_rels/workbook.xml.rels': (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+                '</Relationships>'
+            )
+        }
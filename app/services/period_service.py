@@ -5,12 +5,30 @@ Period Management Service
 
 import logging
 from typing import Dict, List, Optional, Any
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 from .supabase_service import SupabaseService
 
 logger = logging.getLogger(__name__)
 
+# 학기 시작 월 (1학기 3월, 2학기 8월)
+TERM_START_MONTHS = (3, 8)
+
+def term_start(day: date) -> date:
+    """날짜가 속한 학기의 시작일 (1~2월은 전년도 2학기)"""
+    months = [month for month in TERM_START_MONTHS if month <= day.month]
+    if months:
+        return date(day.year, max(months), 1)
+    return date(day.year - 1, max(TERM_START_MONTHS), 1)
+
+def next_term_start(day: date) -> date:
+    """날짜가 속한 학기 다음 학기의 시작일"""
+    start = term_start(day)
+    later = [month for month in TERM_START_MONTHS if month > start.month]
+    if later:
+        return date(start.year, min(later), 1)
+    return date(start.year + 1, min(TERM_START_MONTHS), 1)
+
 class PeriodService:
     """교시 관리 서비스 클래스"""
     
@@ -20,16 +38,12 @@ class PeriodService:
     def get_period_config(self, config_date: str) -> Dict[str, Any]:
         """특정 날짜의 교시 설정 조회"""
         try:
-            response = self.supabase.client.table('period_configs') \
-                .select('*') \
-                .eq('config_date', config_date) \
-                .single() \
-                .execute()
+            config = self.supabase.get_period_config(config_date)
             
-            if response.data:
+            if config:
                 return {
                     'success': True,
-                    'config': response.data
+                    'config': config
                 }
             else:
                 # 해당 날짜의 설정이 없으면 기본 설정 반환
@@ -130,6 +144,39 @@ class PeriodService:
                 'error': str(e)
             }
     
+    def scheduled_periods(self, config_date: str) -> List[int]:
+        """해당 날짜에 운영하는 교시 목록 (교시 설정 기준)"""
+        result = self.get_period_config(config_date)
+        if not result.get('success'):
+            return []
+
+        return self.periods_of(result['config'])
+
+    def scheduled_periods_between(self, date_from: str, date_to: str) -> Dict[str, List[int]]:
+        """기간 내 날짜별 운영 교시 (교시 설정 1회 조회, 설정이 없는 날은 기본 설정)"""
+        configs = {
+            str(row['config_date']): row
+            for row in self.supabase.get_period_configs(date_from, date_to) or []
+        }
+
+        periods = {}
+        day = date.fromisoformat(str(date_from))
+        end = date.fromisoformat(str(date_to))
+        while day <= end:
+            key = day.isoformat()
+            config = configs.get(key) or self.get_default_period_config(key).get('config', {})
+            periods[key] = self.periods_of(config)
+            day += timedelta(days=1)
+        return periods
+
+    @staticmethod
+    def periods_of(config: Dict[str, Any]) -> List[int]:
+        """교시 설정 행에서 운영하는 교시 목록"""
+        periods = set()
+        for key in ('regular_periods', 'study_periods', 'meal_periods', 'special_periods'):
+            periods.update(config.get(key) or [])
+        return sorted(periods)
+    
     def format_period(self, period: int) -> str:
         """교시 번호를 포맷된 문자열로 변환"""
         period_formats = {
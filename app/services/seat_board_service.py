@@ -0,0 +1,163 @@
+"""
+좌석 현황 보드 캐시 서비스
+Seat Board Cache Service (pre-rendered JSON/HTML per classroom, date, period and attendance version)
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Any
+
+from .supabase_service import SupabaseService
+from .seating_service import SeatingService
+from .seat_version_service import seat_versions
+from .attendance_snapshot_service import attendance_snapshots
+from app.utils.seat_payload import encode_board
+
+logger = logging.getLogger(__name__)
+
+class SeatBoardService:
+    """
+    교실/날짜/교시별로 완성된 보드(JSON 문자열, HTML 조각)를 보관하는 서비스 클래스
+
+    캐시 항목은 만들 때 사용한 출석 스냅샷(객체와 version), 좌석 배치 버전(seat_versions.revision),
+    레이아웃 버전(updated_at)을 함께 기억합니다. 출석이나 자리배치가 바뀐 뒤 처음 읽을 때만
+    다시 만들며, 같은 보드를 동시에 여는 교사들은 키별 잠금으로 한 번의 생성 결과를 공유합니다.
+    """
+
+    def __init__(self, max_boards: int = 128, layout_ttl_seconds: int = 300):
+        self.supabase = SupabaseService()
+        self.seating = SeatingService()
+        self.max_boards = max_boards
+        self.layout_ttl_seconds = layout_ttl_seconds
+
+        self._lock = threading.Lock()
+        # (교실, 날짜, 교시) -> 보드 항목
+        self._boards: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        # (교실, 날짜, 교시) -> 생성 잠금 (single-flight)
+        self._building: Dict[tuple, threading.Lock] = {}
+        # 교실 -> (레이아웃, 적재 시각)
+        self._layouts: Dict[str, tuple] = {}
+
+    def _layout(self, classroom: str) -> Optional[Dict[str, Any]]:
+        """교실 레이아웃 (TTL 동안 재사용)"""
+        with self._lock:
+            cached = self._layouts.get(classroom)
+            if cached and time.monotonic() - cached[1] <= self.layout_ttl_seconds:
+                return cached[0]
+
+        layout = self.supabase.get_classroom_layout(classroom)
+        if layout:
+            with self._lock:
+                self._layouts[classroom] = (layout, time.monotonic())
+        return layout
+
+    @staticmethod
+    def _fresh(entry: Optional[Dict[str, Any]], snapshot, seats_version, layout) -> bool:
+        return (entry is not None and entry['snapshot'] is snapshot
+                and entry['attendance_version'] == snapshot.version
+                and entry['seats_version'] == seats_version
+                and entry['layout_version'] == layout.get('updated_at'))
+
+    def get(self, classroom: str, target_date, period: int) -> Optional[Dict[str, Any]]:
+        """
+        보드 캐시 항목 (필요할 때만 다시 생성)
+
+        Args:
+            classroom: 교실 키
+            target_date: 날짜
+            period: 교시
+
+        Returns:
+            {'json': 직렬화된 보드, 'etag', 'board', ...}, 레이아웃이 없으면 None
+        """
+        layout = self._layout(classroom)
+        if not layout:
+            return None
+
+        key = (classroom, str(target_date), int(period))
+        snapshot = attendance_snapshots.get(target_date, period)
+        seats_version = seat_versions.revision(classroom, target_date)
+
+        with self._lock:
+            entry = self._boards.get(key)
+            if self._fresh(entry, snapshot, seats_version, layout):
+                self._boards.move_to_end(key)
+                return entry
+            building = self._building.setdefault(key, threading.Lock())
+
+        with building:
+            try:
+                return self._build(key, layout, target_date, period)
+            finally:
+                # 생성이 끝나면 잠금을 치움 (기다리던 요청은 이미 같은 잠금 객체를 가지고 있음)
+                with self._lock:
+                    if self._building.get(key) is building:
+                        del self._building[key]
+
+    def _build(self, key: tuple, layout: Dict[str, Any], target_date, period: int) -> Dict[str, Any]:
+        """보드 생성 (키별 잠금 안에서 호출)"""
+        # 기다리는 동안 다른 요청이 같은 버전으로 만들었으면 그대로 사용
+        snapshot = attendance_snapshots.get(target_date, period)
+        seats_version = seat_versions.revision(key[0], target_date)
+        with self._lock:
+            entry = self._boards.get(key)
+            if self._fresh(entry, snapshot, seats_version, layout):
+                return entry
+
+        # 버전 키를 먼저 읽었으므로 그 사이 저장이 있어도 오래된 좌석이 새 버전 키로 남지 않음
+        seats = seat_versions.arrangement(key[0], target_date)
+        attendance_version = snapshot.version
+        board = self.seating.render_board(layout, target_date, period, seats, snapshot)
+        payload = json.dumps(board, ensure_ascii=False, separators=(',', ':'), default=str)
+        entry = {
+            'snapshot': snapshot,
+            'attendance_version': attendance_version,
+            # 버전이 있는데 좌석이 비었으면 조회 실패일 수 있으므로 다음 요청에서 다시 생성
+            'seats_version': seats_version if seats or seats_version[1] is None else None,
+            'layout_version': layout.get('updated_at'),
+            'board': board,
+            'json': payload,
+            'etag': hashlib.sha1(payload.encode('utf-8')).hexdigest()[:20],
+            'html': None,
+            'compact': None
+        }
+
+        with self._lock:
+            self._boards[key] = entry
+            self._boards.move_to_end(key)
+            while len(self._boards) > self.max_boards:
+                self._boards.popitem(last=False)
+        return entry
+
+    def html(self, entry: Dict[str, Any]) -> str:
+        """보드 HTML 조각 (항목마다 처음 요청될 때 한 번만 렌더링, 요청 컨텍스트 안에서 호출)"""
+        if entry['html'] is None:
+            from flask import render_template
+            entry['html'] = render_template('seating/_board.html', board=entry['board'])
+        return entry['html']
+
+    def compact(self, entry: Dict[str, Any]) -> str:
+        """보드의 배열 기반 압축 JSON (항목마다 처음 요청될 때 한 번만 변환)"""
+        if entry['compact'] is None:
+            entry['compact'] = json.dumps(encode_board(entry['board']), ensure_ascii=False,
+                                          separators=(',', ':'), default=str)
+        return entry['compact']
+
+    def invalidate(self, classroom: Optional[str] = None):
+        """보드/레이아웃 캐시 무효화 (레이아웃 변경 시, 인자가 없으면 전체)"""
+        with self._lock:
+            if classroom is None:
+                self._boards.clear()
+                self._layouts.clear()
+                return
+
+            self._layouts.pop(classroom, None)
+            for key in [key for key in self._boards if key[0] == classroom]:
+                del self._boards[key]
+
+# 전역 서비스 인스턴스
+seat_board = SeatBoardService()
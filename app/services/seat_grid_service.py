@@ -0,0 +1,164 @@
+"""
+좌석 격자 서비스
+Seat Grid Service (layout_config compiled once into a flat seat-slot table)
+"""
+
+import logging
+import threading
+from array import array
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# 좌석 열 하나의 행 수 (DSHS-Life seatLine과 동일)
+ROWS_PER_LINE = 7
+
+class SeatGrid:
+    """
+    교실 레이아웃 하나를 평평한 좌석 슬롯 표로 컴파일한 결과
+
+    슬롯 i는 (섹션, 열, 행)에 대응하며 배열로 보관합니다. 좌석 열(position_key)마다
+    첫 슬롯 위치를 기록해 두므로, 보드를 그릴 때 섹션 설정을 다시 해석하지 않고
+    슬롯 순서대로 한 번만 훑으면 됩니다.
+    """
+
+    def __init__(self, layout: Dict[str, Any]):
+        self.classroom_key = layout.get('classroom_key')
+        self.version = layout.get('updated_at')
+
+        self.sections: List[Dict[str, Any]] = []
+        self.line_keys: List[str] = []
+        self.line_index: Dict[str, int] = {}
+
+        # 슬롯별 섹션/열/행 (슬롯 인덱스 = 좌석 열 순서 * ROWS_PER_LINE + 행)
+        self.slot_section = array('H')
+        self.slot_column = array('H')
+        self.slot_row = array('B')
+
+        for section_index, section in enumerate(layout['layout_config']['sections']):
+            self.sections.append({
+                'name': section['name'],
+                'type': section.get('type', 'single'),
+                'cols': section['cols'],
+                'stick': section.get('stick', False)
+            })
+            if section.get('type') == 'break':
+                continue
+
+            for column_index, column in enumerate(section['cols']):
+                position_key = f"{section['name']}-{column['col']}"
+                self.line_index[position_key] = len(self.line_keys)
+                self.line_keys.append(position_key)
+                for row in range(ROWS_PER_LINE):
+                    self.slot_section.append(section_index)
+                    self.slot_column.append(column_index)
+                    self.slot_row.append(row)
+
+    @property
+    def slot_count(self) -> int:
+        """전체 좌석 슬롯 수"""
+        return len(self.slot_row)
+
+    def slot_index(self, section_index: int, column_index: int, row: int) -> Optional[int]:
+        """(섹션, 열, 행)의 슬롯 인덱스 (좌석이 없는 위치면 None)"""
+        if not 0 <= row < ROWS_PER_LINE:
+            return None
+        section = self.sections[section_index] if 0 <= section_index < len(self.sections) else None
+        if not section or section['type'] == 'break' or not 0 <= column_index < len(section['cols']):
+            return None
+        position_key = f"{section['name']}-{section['cols'][column_index]['col']}"
+        return self.line_index[position_key] * ROWS_PER_LINE + row
+
+    def slot_emails(self, seats: Dict[str, List[str]]) -> List[Optional[str]]:
+        """
+        좌석 배치를 슬롯 순서의 학생 이메일 목록으로 펼침
+
+        좌석 열의 학생 목록은 뒤에서부터 행 0, 1, ...에 놓입니다 (DSHS-Life와 동일한 역순).
+        레이아웃에 없는 position_key는 무시합니다.
+        """
+        emails: List[Optional[str]] = [None] * self.slot_count
+        for position_key, student_emails in seats.items():
+            line = self.line_index.get(position_key)
+            if line is None or not student_emails:
+                continue
+            base = line * ROWS_PER_LINE
+            for row, email in enumerate(reversed(student_emails[-ROWS_PER_LINE:])):
+                emails[base + row] = email or None
+        return emails
+
+    def render(self, seats: Dict[str, List[str]], students: Dict[str, Dict[str, Any]],
+               statuses: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        슬롯 표를 학생 정보/출석 상태와 한 번에 결합해 보드 생성
+
+        Args:
+            seats: position_key -> 학생 이메일 목록
+            students: 이메일 -> 학생 정보
+            statuses: 이메일 -> 출석 상태 (없으면 출석, 'status'와 'version' 포함)
+
+        Returns:
+            슬롯 순서의 좌석 목록 ({'user', 'items'}, 출석이 아니면 'status', 'version' 추가)
+        """
+        return [
+            self._seat(students.get(email) if email else None, statuses.get(email) if email else None)
+            for email in self.slot_emails(seats)
+        ]
+
+    @staticmethod
+    def _seat(student: Optional[Dict[str, Any]], attendance: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not student:
+            return {'user': None, 'items': []}
+
+        items = []
+        if attendance and attendance.get('status') == 'activity':
+            items.append({
+                'type': attendance.get('activity_type', ''),
+                'place': attendance.get('activity_location', '')
+            })
+        seat = {'user': student, 'items': items}
+        if attendance:
+            # 출석이 아닌 좌석만 상태/기록 버전 포함
+            seat['status'] = attendance.get('status')
+            seat['version'] = attendance.get('version', 0)
+        return seat
+
+    def lines(self, board: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """보드를 좌석 열(position_key)별 7행 목록으로 나눔"""
+        return {
+            position_key: board[line * ROWS_PER_LINE:(line + 1) * ROWS_PER_LINE]
+            for line, position_key in enumerate(self.line_keys)
+        }
+
+class SeatGridService:
+    """레이아웃 버전(updated_at)별로 컴파일한 좌석 격자를 보관하는 서비스 클래스"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._grids: Dict[str, SeatGrid] = {}
+
+    def get(self, layout: Dict[str, Any]) -> SeatGrid:
+        """레이아웃의 좌석 격자 (처음 보거나 버전이 바뀐 경우에만 컴파일)"""
+        key = layout.get('classroom_key')
+        version = layout.get('updated_at')
+
+        with self._lock:
+            grid = self._grids.get(key)
+            if grid is not None and grid.version == version:
+                return grid
+
+        grid = SeatGrid(layout)
+
+        with self._lock:
+            self._grids[key] = grid
+        return grid
+
+    def invalidate(self, classroom_key: Optional[str] = None):
+        """컴파일된 격자 무효화 (인자가 없으면 전체)"""
+        with self._lock:
+            if classroom_key is None:
+                self._grids.clear()
+            else:
+                self._grids.pop(classroom_key, None)
+
+# 전역 서비스 인스턴스
+seat_grids = SeatGridService()
@@ -0,0 +1,171 @@
+"""
+좌석 현황 실시간 스트림 서비스
+Seat Stream Service (Server-Sent Events deltas per classroom/date/period)
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Any
+
+from .attendance_event_service import applied_status
+from .seat_version_service import seat_versions
+
+logger = logging.getLogger(__name__)
+
+class SeatStreamService:
+    """
+    적용된 출석 이벤트를 (날짜, 교시) 채널에 쌓아 두고 SSE 구독자에게 변경분만 보내는 서비스 클래스
+
+    이벤트 ID는 '프로세스 epoch-순번' 형식입니다. 재연결 시 Last-Event-ID 이후의 변경분을
+    채널 버퍼에서 다시 보내고, 버퍼에서 밀려났거나 다른 프로세스(재시작 포함)의 ID이면
+    'reset' 이벤트로 보드를 다시 불러오게 합니다. 교실 필터는 그날 유효한 자리배치로 합니다.
+
+    프로세스 메모리에서 전달하므로 같은 프로세스에서 기록된 변경만 보입니다 (gunicorn 워커 1개, 스레드 워커 기준).
+    연결 하나가 워커 스레드 하나를 연결 유지 시간 동안 점유하므로, 동시 연결 수는 스레드 수보다 작게
+    제한해 일반 요청을 처리할 스레드를 남겨 둡니다.
+    """
+
+    def __init__(self, buffer_size: int = 500, keepalive_seconds: int = 15, max_seconds: int = 120,
+                 max_channels: int = 64, max_streams: int = 24):
+        self.configure(buffer_size, keepalive_seconds, max_seconds, max_streams)
+        self.max_channels = max_channels
+        self.epoch = uuid.uuid4().hex[:8]
+
+        self._condition = threading.Condition()
+        self._sequence = 0
+        self._active_streams = 0
+        # (날짜, 교시) -> {'deltas': deque[(순번, 학생 이메일, 변경분)], 'dropped': 밀려난 마지막 순번}
+        self._channels: Dict[tuple, Dict[str, Any]] = {}
+
+    def configure(self, buffer_size: int, keepalive_seconds: int, max_seconds: int, max_streams: int = 24):
+        """채널 버퍼 크기, keepalive 주기, 연결 유지 시간, 프로세스당 동시 연결 수 설정"""
+        self.buffer_size = buffer_size
+        self.keepalive_seconds = keepalive_seconds
+        self.max_seconds = max_seconds
+        self.max_streams = max_streams
+
+    def acquire(self) -> bool:
+        """스트림 연결 자리 확보 (상한에 도달했으면 False, 확보했으면 응답이 닫힐 때 release 호출)"""
+        with self._condition:
+            if self._active_streams >= self.max_streams:
+                return False
+            self._active_streams += 1
+            return True
+
+    def release(self):
+        """스트림 연결 자리 반납"""
+        with self._condition:
+            self._active_streams = max(0, self._active_streams - 1)
+
+    def apply_events(self, events: List[Dict[str, Any]]):
+        """출석 이벤트 리스너: 적용된 이벤트를 채널 버퍼에 추가하고 대기 중인 구독자를 깨움"""
+        with self._condition:
+            for event in events:
+                key = (str(event['attendance_date']), int(event['period']))
+                channel = self._channels.setdefault(key, {'deltas': deque(), 'dropped': 0})
+
+                status = applied_status(event)
+                delta = {
+                    'email': event['student_email'],
+                    'status': status,
+                    'version': event.get('version')
+                }
+                if status == 'activity':
+                    delta['activity'] = {
+                        'type': event.get('activity_type') or '',
+                        'place': event.get('activity_location') or ''
+                    }
+
+                self._sequence += 1
+                channel['deltas'].append((self._sequence, event['student_email'], delta))
+                if len(channel['deltas']) > self.buffer_size:
+                    channel['dropped'] = channel['deltas'].popleft()[0]
+
+            # 지난 날짜의 채널부터 정리
+            while len(self._channels) > self.max_channels:
+                del self._channels[min(self._channels)]
+
+            self._condition.notify_all()
+
+    def _parse_event_id(self, last_event_id: Optional[str]) -> Optional[int]:
+        """이 프로세스가 보낸 이벤트 ID의 순번 (다른 epoch이거나 형식이 틀리면 None)"""
+        if not last_event_id:
+            return None
+        epoch, _, sequence = last_event_id.partition('-')
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def _pending(self, key: tuple, after: int) -> tuple:
+        """채널에서 순번 after 이후 변경분 (잠금 안에서 호출), (밀려난 것이 있는지, 목록)"""
+        channel = self._channels.get(key)
+        if channel is None:
+            return False, []
+        if after < channel['dropped']:
+            return True, []
+        return False, [entry for entry in channel['deltas'] if entry[0] > after]
+
+    def _message(self, sequence: int, event: str, data: Any) -> str:
+        return f"id: {self.epoch}-{sequence}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+    def stream(self, classroom: str, target_date, period: int,
+               last_event_id: Optional[str] = None) -> Iterator[str]:
+        """
+        교실/날짜/교시 구독 (text/event-stream 메시지 생성기)
+
+        Args:
+            classroom: 교실 키
+            target_date: 날짜
+            period: 교시
+            last_event_id: 재연결 시 마지막으로 받은 이벤트 ID
+
+        Yields:
+            'seat' 이벤트 (data: [{seat, row, email, status, version, activity?}, ...]),
+            'reset' 이벤트 (이어 받을 수 없으니 보드를 다시 불러옴), keepalive 주석
+        """
+        key = (str(target_date), int(period))
+        deadline = time.monotonic() + self.max_seconds
+
+        after = self._parse_event_id(last_event_id)
+        with self._condition:
+            current = self._sequence
+        if after is None or after > current:
+            if last_event_id:
+                yield self._message(current, 'reset', {'reason': 'unknown_event_id'})
+            after = current
+
+        yield f"retry: {self.keepalive_seconds * 1000}\n\n"
+
+        while time.monotonic() < deadline:
+            with self._condition:
+                dropped, entries = self._pending(key, after)
+                if not dropped and not entries:
+                    self._condition.wait(timeout=self.keepalive_seconds)
+                    dropped, entries = self._pending(key, after)
+                current = self._sequence
+
+            if dropped:
+                yield self._message(current, 'reset', {'reason': 'buffer_overflow'})
+                after = current
+                continue
+
+            if not entries:
+                yield ": keepalive\n\n"
+                continue
+
+            after = entries[-1][0]
+            deltas = []
+            for _, email, delta in entries:
+                seat = seat_versions.seat_of(classroom, target_date, email)
+                if seat is not None:
+                    deltas.append(dict(delta, seat=seat[0], row=seat[1]))
+
+            if deltas:
+                yield self._message(after, 'seat', deltas)
+
+# 전역 서비스 인스턴스
+seat_stream = SeatStreamService()
@@ -0,0 +1,216 @@
+"""
+자리배치 버전 서비스
+Seat Arrangement Version Service (effective_from / effective_to ranges per classroom)
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional, Any
+
+from .supabase_service import SupabaseService
+from .seat_grid_service import ROWS_PER_LINE
+
+logger = logging.getLogger(__name__)
+
+class SeatVersionService:
+    """
+    교실별 자리배치 버전 구간과 버전별 좌석을 메모리에 보관하는 서비스 클래스
+
+    자리배치는 바뀐 날짜에만 새 버전(effective_from)으로 저장되고, 다음 버전이 시작되기
+    전까지(effective_to, 배타적) 유효합니다. 날짜 D의 배치는 구간 목록에서 이진 탐색으로
+    버전을 찾고, 버전별 좌석은 한 번 읽은 뒤 저장될 때까지 재사용합니다.
+    """
+
+    def __init__(self, ttl_seconds: int = 600, max_buildings: int = 8, empty_ttl_seconds: int = 15):
+        self.supabase = SupabaseService()
+        self.ttl_seconds = ttl_seconds
+        # 빈 결과는 조회 실패일 수 있으므로 (SupabaseService는 오류 시 빈 목록 반환) 짧게만 보관
+        self.empty_ttl_seconds = empty_ttl_seconds
+        self.max_buildings = max_buildings
+
+        self._lock = threading.RLock()
+        # 교실 -> {'starts': [시작일...], 'ends': [종료일 또는 None...], 'loaded_at'}
+        self._versions: Dict[str, Dict[str, Any]] = {}
+        # (교실, 시작일) -> position_key -> 학생 이메일 목록
+        self._seats: Dict[tuple, Dict[str, List[str]]] = {}
+        # (교실, 시작일) -> 학생 이메일 -> (position_key, 행)
+        self._positions: Dict[tuple, Dict[str, tuple]] = {}
+        # 날짜 -> {'seats': 교실 -> position_key -> 학생 이메일 목록,
+        #         'positions': 학생 이메일 -> [(교실, position_key, 행)], 'loaded_at'} (건물 전체 스냅샷)
+        self._buildings: Dict[str, Dict[str, Any]] = {}
+        # 저장 세대 (무효화할 때마다 증가, 파생 캐시의 신선도 확인용)
+        self._generation = 0
+
+    def _ranges(self, classroom: str) -> Dict[str, Any]:
+        """교실의 버전 구간 목록 (없거나 만료되면 한 번 조회)"""
+        with self._lock:
+            entry = self._versions.get(classroom)
+            if entry and time.monotonic() - entry['loaded_at'] <= entry['ttl']:
+                return entry
+
+        rows = self.supabase.get_seat_arrangement_versions(classroom) or []
+        entry = {
+            'starts': [str(row['effective_from']) for row in rows],
+            'ends': [str(row['effective_to']) if row.get('effective_to') else None for row in rows],
+            'loaded_at': time.monotonic(),
+            'ttl': self.ttl_seconds if rows else self.empty_ttl_seconds
+        }
+
+        with self._lock:
+            self._versions[classroom] = entry
+            return entry
+
+    def version_on(self, classroom: str, target_date) -> Optional[str]:
+        """
+        날짜에 유효한 버전의 시작일
+
+        Args:
+            classroom: 교실 키
+            target_date: 날짜
+
+        Returns:
+            버전 시작일 (해당 날짜에 배치가 없으면 None)
+        """
+        target_date = str(target_date)
+        entry = self._ranges(classroom)
+
+        position = bisect_right(entry['starts'], target_date) - 1
+        if position < 0:
+            return None
+
+        end = entry['ends'][position]
+        if end is not None and target_date >= end:
+            return None
+        return entry['starts'][position]
+
+    def revision(self, classroom: str, target_date) -> tuple:
+        """날짜에 유효한 배치의 버전 키 (저장 세대, 버전 시작일) - 같으면 좌석도 같음, 배치가 없어도 안정적"""
+        with self._lock:
+            generation = self._generation
+        return (generation, self.version_on(classroom, target_date))
+
+    def arrangement(self, classroom: str, target_date) -> Dict[str, List[str]]:
+        """날짜에 유효한 자리배치 (position_key -> 학생 이메일 목록, 버전별 캐시)"""
+        effective_from = self.version_on(classroom, target_date)
+        if effective_from is None:
+            return {}
+
+        key = (classroom, effective_from)
+        with self._lock:
+            seats = self._seats.get(key)
+            if seats is not None:
+                return seats
+
+        rows = self.supabase.get_seat_positions(classroom, effective_from) or []
+        seats = {row['position_key']: row['student_emails'] or [] for row in rows}
+        if not seats:
+            # 버전은 있는데 좌석이 없으면 조회 실패로 보고 보관하지 않음
+            return seats
+
+        with self._lock:
+            self._seats[key] = seats
+            return seats
+
+    def seat_of(self, classroom: str, target_date, student_email: str) -> Optional[tuple]:
+        """
+        날짜에 유효한 배치에서 학생의 좌석
+
+        Returns:
+            (position_key, 행) - 행은 SeatGrid와 같은 역순 기준, 배치되지 않았으면 None
+        """
+        effective_from = self.version_on(classroom, target_date)
+        if effective_from is None:
+            return None
+
+        key = (classroom, effective_from)
+        with self._lock:
+            positions = self._positions.get(key)
+
+        if positions is None:
+            positions = {}
+            for position_key, student_emails in self.arrangement(classroom, target_date).items():
+                for row, email in enumerate(reversed(student_emails[-ROWS_PER_LINE:])):
+                    if email:
+                        positions[email] = (position_key, row)
+            if positions:
+                with self._lock:
+                    self._positions[key] = positions
+
+        return positions.get(student_email)
+
+    def building(self, target_date) -> Dict[str, Dict[str, List[str]]]:
+        """
+        날짜에 유효한 모든 교실의 자리배치 (건물 전체 스냅샷, 한 번의 조회)
+
+        Returns:
+            교실 -> position_key -> 학생 이메일 목록 (배치가 없는 교실은 빠짐)
+        """
+        return self._building(target_date)['seats']
+
+    def locate(self, student_email: str, target_date) -> List[Dict[str, Any]]:
+        """
+        날짜에 유효한 배치에서 학생이 앉는 자리 (모든 교실, 건물 스냅샷의 역색인)
+
+        Returns:
+            [{'classroom', 'position_key', 'row'}] - 배치되지 않았으면 빈 목록
+        """
+        return [
+            {'classroom': classroom, 'position_key': position_key, 'row': row}
+            for classroom, position_key, row in self._building(target_date)['positions'].get(student_email, ())
+        ]
+
+    def _building(self, target_date) -> Dict[str, Any]:
+        """건물 스냅샷 항목 (없거나 만료되면 RPC 한 번으로 적재하고 역색인도 함께 구성)"""
+        target_date = str(target_date)
+        with self._lock:
+            entry = self._buildings.get(target_date)
+            if entry and time.monotonic() - entry['loaded_at'] <= entry['ttl']:
+                return entry
+
+        rows = self.supabase.get_building_seats(target_date) or []
+
+        seats: Dict[str, Dict[str, List[str]]] = {}
+        positions: Dict[str, List[tuple]] = {}
+        versions: Dict[str, str] = {}
+        for row in rows:
+            student_emails = row['student_emails'] or []
+            seats.setdefault(row['classroom'], {})[row['position_key']] = student_emails
+            versions[row['classroom']] = str(row['effective_from'])
+            for seat_row, email in enumerate(reversed(student_emails[-ROWS_PER_LINE:])):
+                if email:
+                    positions.setdefault(email, []).append((row['classroom'], row['position_key'], seat_row))
+
+        entry = {'seats': seats, 'positions': positions, 'loaded_at': time.monotonic(),
+                 'ttl': self.ttl_seconds if rows else self.empty_ttl_seconds}
+        with self._lock:
+            self._buildings[target_date] = entry
+            if len(self._buildings) > self.max_buildings:
+                oldest = min(self._buildings, key=lambda k: self._buildings[k]['loaded_at'])
+                del self._buildings[oldest]
+            # 교실별 버전 좌석 캐시도 함께 채움
+            for classroom, effective_from in versions.items():
+                self._seats.setdefault((classroom, effective_from), seats[classroom])
+            return entry
+
+    def invalidate(self, classroom: Optional[str] = None):
+        """자리배치 저장 후 버전 구간/좌석 캐시 무효화 (인자가 없으면 전체)"""
+        with self._lock:
+            self._generation += 1
+            if classroom is None:
+                self._versions.clear()
+                self._seats.clear()
+                self._positions.clear()
+                self._buildings.clear()
+                return
+
+            self._versions.pop(classroom, None)
+            # 건물 스냅샷은 교실 하나만 바뀌어도 다시 조회
+            self._buildings.clear()
+            for cache in (self._seats, self._positions):
+                for key in [key for key in cache if key[0] == classroom]:
+                    del cache[key]
+
+# 전역 서비스 인스턴스
+seat_versions = SeatVersionService()
@@ -9,6 +9,11 @@ from datetime import datetime, date, time
 import json
 
 from .supabase_service import SupabaseService
+from .attendance_snapshot_service import attendance_snapshots
+from .classroom_roster_service import classroom_rosters
+from .student_directory_service import student_directory
+from .seat_grid_service import seat_grids
+from .seat_version_service import seat_versions
 
 logger = logging.getLogger(__name__)
 
@@ -38,132 +43,102 @@ class SeatingService:
                 
             layout = layout_result['layout']
 
-            # 2. 좌석 배치 조회
-            seat_response = self.supabase.client.table('seat_arrangements').select('*').eq('classroom', classroom).eq('arrangement_date', target_date).execute()
+            # 2. 좌석 배치 조회 (그날 유효한 버전, 버전별 캐시)
+            seats_dict = seat_versions.arrangement(classroom, target_date)
             
-            # 3. 출석 상태 조회
-            attendance_response = self.supabase.client.table('attendance_records').select('student_email, status, notes, activity_type, activity_location').eq('attendance_date', target_date).eq('period', period).execute()
+            # 3. 출석 상태 조회 (메모리 스냅샷, 최초 1회만 DB 조회)
+            snapshot = attendance_snapshots.get(target_date, period)
             
-            # 4. 사용자 정보 조회 (학생 정보)
-            users_response = self.supabase.client.table('users').select('id, email, name, student_profiles(student_id, grade, class_number)').eq('role', 'student').execute()
-            users_dict = {}
-            for user in users_response.data:
-                profile = user['student_profiles'][0] if user['student_profiles'] else {}
-                users_dict[user['email']] = {
-                    'uid': user['id'],
-                    'email': user['email'],
-                    'name': user['name'],
-                    'no': profile.get('student_id', ''),
-                    'grade': profile.get('grade', 0),
-                    'class_number': profile.get('class_number', 0)
-                }
-            
-            # 5. 출석 상태를 딕셔너리로 변환
-            attendance_dict = {}
-            for record in attendance_response.data:
-                attendance_dict[record['student_email']] = {
-                    'status': record['status'],
-                    'notes': record.get('notes', ''),
-                    'activity_type': record.get('activity_type', ''),
-                    'activity_location': record.get('activity_location', '')
-                }
+            return self.render_board(layout, target_date, period, seats_dict, snapshot)
 
-            # 6. 좌석 배치를 딕셔너리로 변환
-            seats_dict = {}
-            for seat in seat_response.data:
-                seats_dict[seat['position_key']] = seat['student_emails'] or []
+        except Exception as e:
+            logger.error(f"Error fetching seat arrangement with status: {e}")
+            return {'success': False, 'error': str(e)}
 
-            # 7. DSHS-Life 방식으로 섹션 데이터 구성
-            sections = []
-            for section in layout['layout_config']['sections']:
-                section_data = {
-                    'name': section['name'],
-                    'type': section.get('type', 'single'),
-                    'cols': section['cols'],
-                    'stick': section.get('stick', False)
-                }
+    def render_board(self, layout: Dict[str, Any], target_date, period: int,
+                     seats_dict: Dict[str, List[str]], snapshot) -> Dict[str, Any]:
+        """
+        레이아웃/좌석 배치/출석 스냅샷을 결합해 좌석 현황 보드 생성
 
-                sections.append(section_data)
+        Args:
+            layout: classroom_layouts 행
+            target_date: 조회 날짜
+            period: 교시
+            seats_dict: position_key -> 학생 이메일 목록
+            snapshot: 해당 날짜/교시의 출석 스냅샷
 
-            # 8. 좌석 라인 데이터 구성 (DSHS-Life seatLine 함수와 동일)
-            def get_seat_line(prefix: str, lr: str):
-                position_key = f"{prefix}-{lr}"
-                student_emails = seats_dict.get(position_key, [])
-                
-                # 7행의 좌석 데이터 생성 (역순으로 - DSHS-Life와 동일)
-                seat_items = []
-                for row in range(7):
-                    if row < len(student_emails) and student_emails[-(row+1)]:  # 역순
-                        student_email = student_emails[-(row+1)]
-                        student = users_dict.get(student_email)
-                        if student:
-                            attendance = attendance_dict.get(student_email, {'status': 'present'})
-                            
-                            # 활동 정보 구성
-                            items = []
-                            if attendance['status'] == 'activity':
-                                activity_type = attendance.get('activity_type', '')
-                                activity_location = attendance.get('activity_location', '')
-                                
-                                if activity_type == '분임토의실':
-                                    items.append({
-                                        'type': '분임토의실',
-                                        'place': activity_location
-                                    })
-                                else:
-                                    items.append({
-                                        'type': activity_type,
-                                        'place': activity_location
-                                    })
-                            
-                            seat_items.append({
-                                'user': student,
-                                'items': items
-                            })
-                        else:
-                            seat_items.append({'user': None, 'items': []})
-                    else:
-                        # 빈 자리 또는 존재하지 않는 자리
-                        seat_items.append({'user': None, 'items': []})
-                
-                return seat_items
+        Returns:
+            좌석 배치 및 출석 상태 정보
+        """
+        # 배치된 학생 정보만 조회 (공유 학생 디렉터리, 없는 학생만 DB 조회)
+        seated_emails = {
+            email for student_emails in seats_dict.values() for email in student_emails if email
+        }
+        users_dict = self.get_students_by_email(seated_emails)
+        
+        # 배치된 학생의 출석 상태 (스냅샷 비트셋, 출석은 생략)
+        statuses = {}
+        for email in seated_emails:
+            index = student_directory.index_of(email)
+            if index is None:
+                continue
+            status = snapshot.status_of(index)
+            if status != 'present':
+                statuses[email] = dict(snapshot.details.get(index, {}), status=status)
 
-            return {
-                'success': True,
-                'classroom': layout,
-                'sections': sections,
-                'seat_line_func': get_seat_line,
-                'seats': seats_dict,
-                'date': str(target_date),
-                'period': period,
-                'grade_seats': [{
-                    'name': layout['classroom_name'],
-                    'bottom_left': layout['bottom_left_info'],
-                    'seats': sections
-                }]
-            }
+        # 레이아웃 버전별로 컴파일된 좌석 슬롯 표와 결합 (DSHS-Life seatLine과 같은 7행 역순 배치)
+        grid = seat_grids.get(layout)
+        board = grid.render(seats_dict, users_dict, statuses)
 
-        except Exception as e:
-            logger.error(f"Error fetching seat arrangement with status: {e}")
-            return {'success': False, 'error': str(e)}
+        return {
+            'success': True,
+            'classroom': layout,
+            'sections': grid.sections,
+            'seat_lines': grid.lines(board),
+            'seats': dict(seats_dict),
+            'date': str(target_date),
+            'period': period
+        }
 
+    def get_students_by_email(self, emails) -> Dict[str, Dict[str, Any]]:
+        """
+        이메일별 학생 정보 (학생 디렉터리 캐시 우선, 디렉터리에 없는 학생만 한 번에 조회)
+        
+        Args:
+            emails: 학생 이메일 목록
+            
+        Returns:
+            이메일 -> 학생 정보 (uid, email, name, no, grade, class_number)
+        """
+        students = {}
+        missing = []
+        for email in emails:
+            student = student_directory.get(email)
+            if student:
+                students[email] = student
+            else:
+                missing.append(email)
+        
+        for user in self.supabase.get_students_by_emails(missing):
+            profile = user['student_profiles'][0] if user['student_profiles'] else {}
+            students[user['email']] = {
+                'uid': user['id'],
+                'email': user['email'],
+                'name': user['name'],
+                'no': profile.get('student_id', ''),
+                'grade': profile.get('grade', 0),
+                'class_number': profile.get('class_number', 0)
+            }
+        
+        return students
+    
     def get_seat_arrangements(self, classroom: str, arrangement_date: str) -> Dict[str, Any]:
-        """특정 교실과 날짜의 자리배치 정보 조회"""
+        """특정 교실과 날짜의 자리배치 정보 조회 (그날 유효한 버전, 버전별 캐시)"""
         try:
-            response = self.supabase.client.table('seat_arrangements') \
-                .select('*') \
-                .eq('classroom', classroom) \
-                .eq('arrangement_date', arrangement_date) \
-                .eq('is_active', True) \
-                .execute()
-            
-            arrangements = {}
-            for row in response.data:
-                arrangements[row['position_key']] = row['student_emails']
-            
             return {
                 'success': True,
-                'arrangements': arrangements
+                'arrangements': dict(seat_versions.arrangement(classroom, arrangement_date)),
+                'effective_from': seat_versions.version_on(classroom, arrangement_date)
             }
             
         except Exception as e:
@@ -188,27 +163,18 @@ class SeatingService:
             for emails in arrangements.values():
                 all_student_emails.extend(emails)
             
-            # 학생 정보 조회
-            if all_student_emails:
-                student_response = self.supabase.client.table('users') \
-                    .select('id, email, name, role, student_profiles(student_id, grade, class_number)') \
-                    .in_('email', all_student_emails) \
-                    .eq('role', 'student') \
-                    .execute()
-                
-                # 학생 정보를 이메일로 매핑
-                student_map = {}
-                for student in student_response.data:
-                    student_map[student['email']] = {
-                        'id': student['id'],
-                        'email': student['email'],
-                        'name': student['name'],
-                        'number': student['student_profiles'][0]['student_id'] if student['student_profiles'] else '',
-                        'grade': student['student_profiles'][0]['grade'] if student['student_profiles'] else None,
-                        'class_number': student['student_profiles'][0]['class_number'] if student['student_profiles'] else None
-                    }
-            else:
-                student_map = {}
+            # 학생 정보 조회 (학생 디렉터리 우선, 없는 학생만 한 번에 조회)
+            student_map = {
+                email: {
+                    'id': student['uid'],
+                    'email': email,
+                    'name': student['name'],
+                    'number': student['no'],
+                    'grade': student['grade'],
+                    'class_number': student['class_number']
+                }
+                for email, student in self.get_students_by_email({email for email in all_student_emails if email}).items()
+            }
             
             # 자리배치 데이터에 학생 정보 추가
             seat_data = {}
@@ -236,96 +202,58 @@ class SeatingService:
     
     def save_seat_arrangements(self, classroom: str, arrangement_date: str, 
                              arrangements: Dict[str, List[str]], created_by_email: str) -> Dict[str, Any]:
-        """자리배치 정보 저장"""
-        try:
-            # 생성자 ID 조회
-            user_response = self.supabase.client.table('users') \
-                .select('id') \
-                .eq('email', created_by_email) \
-                .single() \
-                .execute()
-            
-            created_by_id = user_response.data['id']
-            
-            # 기존 배치 비활성화
-            self.supabase.client.table('seat_arrangements') \
-                .update({'is_active': False}) \
-                .eq('classroom', classroom) \
-                .eq('arrangement_date', arrangement_date) \
-                .execute()
-            
-            # 새 배치 저장
-            insert_data = []
-            for position_key, student_emails in arrangements.items():
-                if student_emails:  # 빈 자리가 아닌 경우에만 저장
-                    insert_data.append({
-                        'classroom': classroom,
-                        'position_key': position_key,
-                        'student_emails': student_emails,
-                        'arrangement_date': arrangement_date,
-                        'created_by': created_by_id,
-                        'is_active': True
-                    })
-            
-            if insert_data:
-                self.supabase.client.table('seat_arrangements') \
-                    .insert(insert_data) \
-                    .execute()
-            
-            return {
-                'success': True,
-                'saved_positions': len(insert_data)
-            }
+        """
+        자리배치 정보 저장 (그날 유효한 버전과 비교해 바뀐 위치만 반영)
+        
+        Args:
+            classroom: 교실 키
+            arrangement_date: 새 배치가 적용되는 날짜
+            arrangements: position_key -> 학생 이메일 목록
+            created_by_email: 저장하는 사용자 이메일
             
-        except Exception as e:
-            logger.error(f"자리배치 저장 에러: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        Returns:
+            저장 결과 (upserted, deleted, unchanged, touched_rows)
+        """
+        result = self.supabase.save_seat_arrangements(classroom, arrangement_date, arrangements, created_by_email)
+        
+        # 자리배치 버전/교실 명단 캐시 무효화 (버전이 유효한 이후 날짜 전체에 영향)
+        if result['success'] and result.get('touched_rows'):
+            seat_versions.invalidate(classroom)
+            classroom_rosters.invalidate(classroom)
+        elif not result['success']:
+            logger.error(f"자리배치 저장 에러: {result.get('error')}")
+        
+        return result
     
     def get_classroom_layout(self, classroom_key: str) -> Dict[str, Any]:
         """교실 레이아웃 조회"""
-        try:
-            response = self.supabase.client.table('classroom_layouts') \
-                .select('*') \
-                .eq('classroom_key', classroom_key) \
-                .eq('is_active', True) \
-                .single() \
-                .execute()
-            
-            return {
-                'success': True,
-                'layout': response.data
-            }
-            
-        except Exception as e:
-            logger.error(f"교실 레이아웃 조회 에러: {str(e)}")
+        layout = self.supabase.get_classroom_layout(classroom_key)
+        if not layout:
+            logger.error(f"교실 레이아웃 조회 에러: {classroom_key}")
             return {
                 'success': False,
-                'error': str(e)
+                'error': 'Classroom layout not found'
             }
+        
+        return {
+            'success': True,
+            'layout': layout
+        }
     
     def get_classroom_layouts(self) -> Dict[str, Any]:
         """모든 교실 레이아웃 조회"""
-        try:
-            response = self.supabase.client.table('classroom_layouts') \
-                .select('*') \
-                .eq('is_active', True) \
-                .order('classroom_key') \
-                .execute()
-            
-            return {
-                'success': True,
-                'layouts': response.data
-            }
-            
-        except Exception as e:
-            logger.error(f"교실 레이아웃 목록 조회 에러: {str(e)}")
+        layouts = self.supabase.get_classroom_layouts()
+        if not layouts:
+            logger.error("교실 레이아웃 목록 조회 에러")
             return {
                 'success': False,
-                'error': str(e)
+                'error': 'Classroom layouts not found'
             }
+        
+        return {
+            'success': True,
+            'layouts': layouts
+        }
     
     def get_current_period(self, is_holiday: bool = False) -> int:
         """
@@ -382,10 +310,9 @@ class SeatingService:
             교시 정보 딕셔너리
         """
         try:
-            response = self.supabase.client.table('period_configs').select('*').eq('config_date', target_date).execute()
+            config = self.supabase.get_period_config(str(target_date))
             
-            if response.data:
-                config = response.data[0]
+            if config:
                 is_holiday = config['is_holiday']
                 
                 if is_holiday:
@@ -0,0 +1,217 @@
+"""
+대시보드 통계 서비스
+Dashboard Stats Service (maintained counters per teacher / class / day)
+"""
+
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Any
+
+from .supabase_service import SupabaseService
+from .attendance_store import attendance_store
+from .attendance_history_service import attendance_history
+from .period_service import PeriodService, term_start, next_term_start
+from .attendance_event_service import applied_status
+
+logger = logging.getLogger(__name__)
+
+# 출석하지 않은 것으로 보는 상태
+ABSENT_STATUSES = ('absent', 'excused')
+
+class StatsService:
+    """홈 화면 통계를 미리 집계한 카운터로 제공하는 서비스 클래스"""
+
+    def __init__(self, ttl_seconds: int = 600, max_days: int = 7):
+        self.supabase = SupabaseService()
+        self.store = attendance_store
+        self.history = attendance_history
+        self.period_service = PeriodService()
+        self.ttl_seconds = ttl_seconds
+        self.max_days = max_days
+
+        self._lock = threading.RLock()
+        # 교사 이메일 -> {'class_ids', 'my_classes', 'my_students', 'loaded_at'}
+        self._teachers: Dict[str, Dict[str, Any]] = {}
+        # 날짜 -> 학급 ID -> 학생 이메일 -> 결석 교시 수
+        self._days: Dict[str, Dict[str, Dict[str, int]]] = {}
+        # 학기 시작일 -> {'prefix': 학기 첫날부터 누적 운영 교시 수, 'loaded_at'}
+        self._terms: Dict[date, Dict[str, Any]] = {}
+        self._terms_lock = threading.Lock()
+
+    def _teacher_counters(self, teacher_email: str) -> Dict[str, Any]:
+        """교사 담당 학급/학생 수 (캐시에 없으면 2회 조회로 적재)"""
+        with self._lock:
+            entry = self._teachers.get(teacher_email)
+            if entry and time.monotonic() - entry['loaded_at'] <= self.ttl_seconds:
+                return entry
+
+        classes = self.supabase.get_classes_by_teacher(teacher_email) or []
+        class_ids = [cls['id'] for cls in classes]
+        enrollments = self.supabase.get_class_enrollments(class_ids) or []
+
+        entry = {
+            'class_ids': class_ids,
+            'my_classes': len(class_ids),
+            'my_students': len({row['student_email'] for row in enrollments}),
+            'loaded_at': time.monotonic()
+        }
+
+        with self._lock:
+            self._teachers[teacher_email] = entry
+        return entry
+
+    def _day_counts(self, attendance_date: str) -> Dict[str, Dict[str, int]]:
+        """날짜별 학급 결석 카운터 (캐시에 없으면 상태 컬럼만 한 번 조회)"""
+        with self._lock:
+            counts = self._days.get(attendance_date)
+            if counts is not None:
+                return counts
+
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in self.store.day_statuses(attendance_date):
+            if row['status'] in ABSENT_STATUSES:
+                class_counts = counts.setdefault(row['class_id'], {})
+                class_counts[row['student_email']] = class_counts.get(row['student_email'], 0) + 1
+
+        with self._lock:
+            existing = self._days.get(attendance_date)
+            if existing is not None:
+                return existing
+
+            self._days[attendance_date] = counts
+            for stale in sorted(self._days)[:-self.max_days]:
+                del self._days[stale]
+            return counts
+
+    def _term_calendar(self, start: date) -> List[int]:
+        """
+        학기 운영 교시 누적 합 (학기마다 교시 설정 1회 조회로 한 번만 계산, TTL 후 재계산)
+
+        prefix[n] = 학기 첫날부터 n일 동안의 운영 교시 수. 설정이 없는 날은 기본 설정을 사용합니다.
+        """
+        with self._terms_lock:
+            entry = self._terms.get(start)
+            if entry and time.monotonic() - entry['loaded_at'] <= self.ttl_seconds:
+                return entry['prefix']
+
+            end = next_term_start(start) - timedelta(days=1)
+            configs = {
+                str(row['config_date']): row
+                for row in self.supabase.get_period_configs(start.isoformat(), end.isoformat()) or []
+            }
+
+            prefix = [0]
+            day = start
+            while day <= end:
+                key = day.isoformat()
+                config = configs.get(key) or self.period_service.get_default_period_config(key).get('config', {})
+                prefix.append(prefix[-1] + len(self.period_service.periods_of(config)))
+                day += timedelta(days=1)
+
+            self._terms[start] = {'prefix': prefix, 'loaded_at': time.monotonic()}
+            return prefix
+
+    def _scheduled_count(self, start: date, end: date) -> int:
+        """학기 시작일(start)부터 end까지 운영 교시 수 (학기 누적 합에서 한 번에 조회)"""
+        prefix = self._term_calendar(start)
+        days = min(max((end - start).days + 1, 0), len(prefix) - 1)
+        return prefix[days]
+
+    def teacher_stats(self, teacher_email: str, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        교사 홈 통계
+
+        Args:
+            teacher_email: 교사 이메일
+            today: 기준 날짜 (기본값 오늘)
+
+        Returns:
+            담당 학급 수, 담당 학생 수, 오늘 출석/결석 학생 수
+        """
+        today = today or date.today()
+        teacher = self._teacher_counters(teacher_email)
+        day_counts = self._day_counts(today.isoformat())
+
+        absent_students = set()
+        for class_id in teacher['class_ids']:
+            absent_students.update(day_counts.get(class_id, {}))
+
+        return {
+            'my_classes': teacher['my_classes'],
+            'my_students': teacher['my_students'],
+            'today_attendance': max(teacher['my_students'] - len(absent_students), 0),
+            'today_absent': len(absent_students)
+        }
+
+    def student_stats(self, student_email: str, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        학생 홈 통계 (이번 학기 운영 교시 대비 결석 교시로 출석률 계산)
+
+        Args:
+            student_email: 학생 이메일
+            today: 기준 날짜 (기본값 오늘)
+
+        Returns:
+            이번 학기 출석률과 운영/결석 교시 수
+        """
+        today = today or date.today()
+        start = term_start(today)
+        start_month = start.isoformat()[:7]
+        end_month = today.isoformat()[:7]
+
+        absent = 0
+        for month, summary in self.history.get_summary(student_email).items():
+            if start_month <= month <= end_month:
+                absent += sum(summary['counts'].get(status, 0) for status in ABSENT_STATUSES)
+
+        scheduled = self._scheduled_count(start, today)
+
+        return {
+            'my_attendance_rate': round(max(scheduled - absent, 0) * 100 / scheduled, 1) if scheduled else 100,
+            'term_periods': scheduled,
+            'term_absences': absent
+        }
+
+    def record_attendance(self, attendance_date, class_id: str, student_email: str, status: str,
+                          previous_status: Optional[str] = None):
+        """출석 기록 쓰기 후 적재된 일일 카운터 갱신"""
+        was_absent = previous_status in ABSENT_STATUSES
+        is_absent = status in ABSENT_STATUSES
+        if was_absent == is_absent:
+            return
+
+        with self._lock:
+            counts = self._days.get(str(attendance_date))
+            if counts is None:
+                return
+
+            class_counts = counts.setdefault(class_id, {})
+            count = class_counts.get(student_email, 0) + (1 if is_absent else -1)
+            if count > 0:
+                class_counts[student_email] = count
+            else:
+                class_counts.pop(student_email, None)
+
+    def apply_events(self, events: List[Dict[str, Any]]):
+        """출석 이벤트 리스너: 학급 출석 이벤트(class_id 있음)로 적재된 일일 카운터 갱신"""
+        for event in events:
+            if event.get('class_id'):
+                self.record_attendance(
+                    event['attendance_date'], event['class_id'], event['student_email'],
+                    applied_status(event), event.get('previous_status')
+                )
+
+    def invalidate_schedule(self):
+        """교시 설정 변경 시 학기 운영 교시 누적 합 무효화"""
+        with self._terms_lock:
+            self._terms.clear()
+
+    def invalidate_teachers(self):
+        """학급/재학 정보 변경 시 교사 카운터 무효화"""
+        with self._lock:
+            self._teachers.clear()
+
+# 전역 서비스 인스턴스
+stats_service = StatsService()
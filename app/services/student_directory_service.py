@@ -0,0 +1,179 @@
+"""
+학생 디렉터리 서비스
+Student Directory Service (email <-> dense index mapping)
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Any
+
+from .supabase_service import SupabaseService
+
+logger = logging.getLogger(__name__)
+
+class StudentDirectoryService:
+    """학생 목록을 메모리에 보관하고 이메일마다 조밀한 정수 인덱스를 부여하는 서비스 클래스"""
+
+    # 없는 이메일 조회 시 재갱신 최소 간격 (초)
+    MISS_REFRESH_SECONDS = 30
+    # 갱신 실패 후 다시 시도하기까지 기다리는 시간 (초)
+    RETRY_SECONDS = 10
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.supabase = SupabaseService()
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.RLock()
+        self._index_by_email: Dict[str, int] = {}
+        self._students: List[Dict[str, Any]] = []
+        self._grade_masks: Dict[int, int] = {}
+        self._class_masks: Dict[tuple, int] = {}
+        self._active_mask = 0
+        self._loaded_at = 0.0
+        # 마지막 갱신 시도 시각 (성공/실패 무관, DB 장애 시 매 호출 재시도 방지)
+        self._attempted_at = 0.0
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        학생 목록 다시 불러오기
+
+        한 번 부여된 인덱스는 바뀌지 않습니다. 새 학생은 뒤에 추가되고,
+        기존 학생은 같은 인덱스에서 정보만 갱신됩니다. 목록에서 빠졌거나 비활성화된
+        학생은 인덱스를 유지한 채 'active': False로 표시하고 모든 마스크에서 제외합니다.
+
+        Returns:
+            갱신 결과
+        """
+        self._attempted_at = time.monotonic()
+        try:
+            students = self.supabase.get_all_students()
+            if not students:
+                # _make_request는 오류 시 빈 결과를 돌려주므로 기존 명단을 비우지 않음
+                raise RuntimeError('학생 목록을 불러오지 못했습니다.')
+
+            with self._lock:
+                seen = set()
+                for student in students:
+                    profile = student['student_profiles'][0] if student.get('student_profiles') else {}
+                    info = {
+                        'uid': student['id'],
+                        'email': student['email'],
+                        'name': student['name'],
+                        'no': profile.get('student_id', ''),
+                        'grade': profile.get('grade', 0),
+                        'class_number': profile.get('class_number', 0),
+                        'active': student.get('is_active', True) is not False
+                    }
+                    seen.add(student['email'])
+
+                    index = self._index_by_email.get(student['email'])
+                    if index is None:
+                        index = len(self._students)
+                        self._index_by_email[student['email']] = index
+                        self._students.append(info)
+                    else:
+                        self._students[index] = info
+
+                # 목록에서 빠진 학생 (전출/삭제)
+                for index, info in enumerate(self._students):
+                    if info['email'] not in seen and info.get('active', True):
+                        self._students[index] = dict(info, active=False)
+
+                self._rebuild_masks()
+                self._loaded_at = time.monotonic()
+
+            return {
+                'success': True,
+                'student_count': len(self._students)
+            }
+
+        except Exception as e:
+            logger.error(f"학생 디렉터리 갱신 에러: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def _rebuild_masks(self):
+        """학년/반별/전체 비트 마스크 재구성 (비활성 학생 제외)"""
+        grade_masks = {}
+        class_masks = {}
+        active_mask = 0
+
+        for index, info in enumerate(self._students):
+            if not info.get('active', True):
+                continue
+            bit = 1 << index
+            active_mask |= bit
+            grade = info.get('grade') or 0
+            class_key = (grade, info.get('class_number') or 0)
+            grade_masks[grade] = grade_masks.get(grade, 0) | bit
+            class_masks[class_key] = class_masks.get(class_key, 0) | bit
+
+        self._grade_masks = grade_masks
+        self._class_masks = class_masks
+        self._active_mask = active_mask
+
+    def _ensure_loaded(self):
+        """TTL이 지났거나 아직 불러오지 않았다면 갱신 (실패 직후에는 RETRY_SECONDS 동안 기존 명단 사용)"""
+        now = time.monotonic()
+        if self._attempted_at and now - self._attempted_at <= self.RETRY_SECONDS:
+            return
+        if not self._students or now - self._loaded_at > self.ttl_seconds:
+            self.refresh()
+
+    def index_of(self, email: str) -> Optional[int]:
+        """이메일에 해당하는 학생 인덱스 조회"""
+        self._ensure_loaded()
+        index = self._index_by_email.get(email)
+        if index is None and time.monotonic() - self._attempted_at > self.MISS_REFRESH_SECONDS:
+            # 디렉터리에 없는 학생은 새로 등록되었을 수 있으므로 한 번 더 갱신
+            self.refresh()
+            index = self._index_by_email.get(email)
+        return index
+
+    def get(self, email: str) -> Optional[Dict[str, Any]]:
+        """이메일로 학생 정보 조회"""
+        index = self.index_of(email)
+        return self._students[index] if index is not None else None
+
+    def get_by_index(self, index: int) -> Optional[Dict[str, Any]]:
+        """인덱스로 학생 정보 조회"""
+        self._ensure_loaded()
+        return self._students[index] if 0 <= index < len(self._students) else None
+
+    def students_in(self, mask: int) -> List[Dict[str, Any]]:
+        """비트 마스크에 해당하는 학생 정보 목록 (인덱스 순서)"""
+        self._ensure_loaded()
+        students = []
+        while mask:
+            low = mask & -mask
+            index = low.bit_length() - 1
+            if index < len(self._students):
+                students.append(self._students[index])
+            mask ^= low
+        return students
+
+    def grade_mask(self, grade: int) -> int:
+        """특정 학년 학생들의 비트 마스크"""
+        self._ensure_loaded()
+        return self._grade_masks.get(grade, 0)
+
+    def class_mask(self, grade: int, class_number: int) -> int:
+        """특정 학급 학생들의 비트 마스크"""
+        self._ensure_loaded()
+        return self._class_masks.get((grade, class_number), 0)
+
+    def all_mask(self) -> int:
+        """전체 재학생 비트 마스크 (비활성 학생 제외)"""
+        self._ensure_loaded()
+        return self._active_mask
+
+    def size(self) -> int:
+        """등록된 학생 수"""
+        self._ensure_loaded()
+        return len(self._students)
+
+# 전역 서비스 인스턴스
+student_directory = StudentDirectoryService()
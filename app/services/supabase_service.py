@@ -4,6 +4,8 @@ from typing import Optional, Dict, Any, List
 import requests
 import json
 
+from app.utils.seat_diff import diff_arrangements
+
 class SupabaseService:
     """Supabase 데이터베이스 서비스"""
     
@@ -26,9 +28,12 @@ class SupabaseService:
             'Prefer': 'return=representation'
         }
     
-    def _make_request(self, method: str, endpoint: str, data: Dict = None, use_service_role: bool = False) -> Dict:
-        """Supabase API 요청"""
+    def _make_request(self, method: str, endpoint: str, data: Dict = None, use_service_role: bool = False,
+                      prefer: str = None) -> Dict:
+        """Supabase API 요청 (prefer: Prefer 헤더를 바꿔야 하는 경우, 예: UPSERT)"""
         headers = self.service_headers if use_service_role else self.headers
+        if prefer:
+            headers = dict(headers, Prefer=prefer)
         url = f"{self.url}/rest/v1/{endpoint}"
         
         try:
@@ -61,6 +66,14 @@ class SupabaseService:
         result = self._make_request('GET', endpoint)
         return result[0] if result else None
     
+    def get_students_by_emails(self, emails: List[str]) -> List[Dict]:
+        """이메일 목록의 학생 조회 (프로필 포함, 한 번의 요청)"""
+        if not emails:
+            return []
+        email_list = ','.join(f'"{email}"' for email in emails)
+        endpoint = f"users?email=in.({email_list})&role=eq.student&select=id,email,name,student_profiles(student_id,grade,class_number)"
+        return self._make_request('GET', endpoint, use_service_role=True) or []
+    
     def create_user(self, user_data: Dict) -> Optional[Dict]:
         """사용자 생성"""
         endpoint = "users"
@@ -230,6 +243,13 @@ class SupabaseService:
         result = self._make_request('DELETE', endpoint, use_service_role=True)
         return result is not None
     
+    def get_class_enrollments(self, class_ids: List[str]) -> List[Dict]:
+        """여러 학급의 재학 학생 목록 조회 (학급 ID, 이메일만)"""
+        if not class_ids:
+            return []
+        endpoint = f"student_classes?class_id=in.({','.join(class_ids)})&is_active=eq.true&select=class_id,student_email"
+        return self._make_request('GET', endpoint, use_service_role=True)
+    
     # 출석 관리
     def get_student_attendance(self, student_email: str, start_date: str = None, end_date: str = None) -> List[Dict]:
         """특정 학생의 출석 기록 조회"""
@@ -239,7 +259,51 @@ class SupabaseService:
             endpoint += f"&attendance_date=gte.{start_date}&attendance_date=lte.{end_date}"
         
         return self._make_request('GET', endpoint, use_service_role=True)
-    
+
+    @staticmethod
+    def _attendance_columns(table: str) -> str:
+        """출석 행 조회 컬럼 (옛 attendance 테이블은 비고 컬럼이 note)"""
+        notes = 'note' if table == 'attendance' else 'notes'
+        return f"id,class_id,attendance_date,period,student_email,status,{notes}"
+
+    def get_student_attendance_page(self, student_email: str, before: tuple = None, limit: int = 30,
+                                    table: str = 'attendance_records', attendance_date: str = None) -> List[Dict]:
+        """학생 출석 기록 페이지 조회 (최신순 키셋 페이지네이션, before = (날짜, 교시), 날짜 지정 가능)"""
+        endpoint = (f"{table}?student_email=eq.{student_email}"
+                    f"&select={self._attendance_columns(table)}"
+                    f"&order=attendance_date.desc,period.desc&limit={limit}")
+        if attendance_date:
+            endpoint += f"&attendance_date=eq.{attendance_date}"
+
+        if before:
+            last_date, last_period = before
+            endpoint += (f"&or=(attendance_date.lt.{last_date},"
+                         f"and(attendance_date.eq.{last_date},period.lt.{last_period}))")
+
+        return self._make_request('GET', endpoint, use_service_role=True)
+
+    def get_student_attendance_statuses(self, student_email: str, table: str = 'attendance_records') -> List[Dict]:
+        """학생 출석 상태 목록 조회 (월별 요약 계산용, 필요한 컬럼만)"""
+        endpoint = (f"{table}?student_email=eq.{student_email}"
+                    f"&select=attendance_date,period,status&order=attendance_date.desc,period.desc")
+        return self._make_request('GET', endpoint, use_service_role=True)
+
+    def get_attendance_day_statuses(self, attendance_date: str, table: str = 'attendance_records') -> List[Dict]:
+        """특정 날짜의 학급별 출석 상태 목록 조회 (일일 집계용)"""
+        endpoint = f"{table}?attendance_date=eq.{attendance_date}&class_id=not.is.null&select=class_id,student_email,status,period"
+        return self._make_request('GET', endpoint, use_service_role=True)
+
+    def get_class_attendance(self, class_id: str, attendance_date: str = None, period: int = None,
+                             table: str = 'attendance_records') -> List[Dict]:
+        """학급 출석 기록 조회 (날짜/교시 지정 가능)"""
+        endpoint = (f"{table}?class_id=eq.{class_id}&select={self._attendance_columns(table)}"
+                    f"&order=attendance_date.desc,period")
+        if attendance_date:
+            endpoint += f"&attendance_date=eq.{attendance_date}"
+        if period:
+            endpoint += f"&period=eq.{period}"
+        return self._make_request('GET', endpoint, use_service_role=True)
+
     def get_attendance_records(self, class_id: str = None, date: str = None) -> List[Dict]:
         """출석 기록 조회 (학급별, 날짜별)"""
         endpoint = "attendance?select=*,classes(class_name,schools(name))&order=attendance_date.desc,period"
@@ -272,10 +336,51 @@ class SupabaseService:
     # =============================================================================
     
     def get_seat_arrangements(self, classroom: str, arrangement_date: str) -> List[Dict]:
-        """자리배치 조회"""
-        endpoint = f"seat_arrangements?classroom=eq.{classroom}&arrangement_date=eq.{arrangement_date}&is_active=eq.true&select=*&order=position_key"
+        """자리배치 조회 (해당 날짜에 유효한 버전의 좌석)"""
+        version = self.get_seat_arrangement_version_on(classroom, arrangement_date)
+        if not version:
+            return []
+        endpoint = f"seat_arrangements?classroom=eq.{classroom}&arrangement_date=eq.{version['effective_from']}&is_active=eq.true&select=*&order=position_key"
+        return self._make_request('GET', endpoint, use_service_role=True)
+    
+    def get_seat_positions(self, classroom: str, effective_from: str) -> List[Dict]:
+        """자리배치 버전 하나의 좌석 (position_key, 학생 이메일만)"""
+        endpoint = f"seat_arrangements?classroom=eq.{classroom}&arrangement_date=eq.{effective_from}&is_active=eq.true&select=position_key,student_emails"
+        return self._make_request('GET', endpoint, use_service_role=True)
+    
+    def get_seat_arrangement_versions(self, classroom: str) -> List[Dict]:
+        """교실의 자리배치 버전 구간 목록 (시작일 순서)"""
+        endpoint = f"seat_arrangement_versions?classroom=eq.{classroom}&select=effective_from,effective_to&order=effective_from"
+        return self._make_request('GET', endpoint, use_service_role=True)
+    
+    def get_seat_arrangement_version_on(self, classroom: str, arrangement_date: str) -> Optional[Dict]:
+        """날짜에 유효한 자리배치 버전"""
+        endpoint = (f"seat_arrangement_versions?classroom=eq.{classroom}&effective_from=lte.{arrangement_date}"
+                    f"&or=(effective_to.is.null,effective_to.gt.{arrangement_date})"
+                    f"&select=effective_from,effective_to&order=effective_from.desc&limit=1")
+        result = self._make_request('GET', endpoint, use_service_role=True)
+        return result[0] if result else None
+    
+    def get_student_seat_history(self, student_email: str) -> List[Dict]:
+        """학생이 포함된 자리배치 행 (버전 시작일 역순, student_emails GIN 인덱스 사용)"""
+        endpoint = (f'seat_arrangements?student_emails=cs.{{"{student_email}"}}&is_active=eq.true'
+                    f'&select=classroom,position_key,arrangement_date,student_emails&order=arrangement_date.desc')
         return self._make_request('GET', endpoint, use_service_role=True)
     
+    def get_building_seats(self, arrangement_date: str) -> List[Dict]:
+        """날짜에 유효한 모든 교실의 좌석 (교실, 버전 시작일, position_key, 학생 이메일) - RPC 1회"""
+        endpoint = "rpc/get_building_seats"
+        return self._make_request('POST', endpoint, {'p_date': arrangement_date}, use_service_role=True)
+    
+    def open_seat_arrangement_version(self, classroom: str, arrangement_date: str, created_by_id: str) -> Optional[Dict]:
+        """날짜에 시작하는 자리배치 버전 열기 (이전 버전 좌석 복사, 이미 있으면 그대로)"""
+        endpoint = "rpc/open_seat_arrangement_version"
+        return self._make_request('POST', endpoint, {
+            'p_classroom': classroom,
+            'p_date': arrangement_date,
+            'p_created_by': created_by_id
+        }, use_service_role=True)
+    
     def get_seat_data_with_students(self, classroom: str, arrangement_date: str) -> Dict:
         """학생 정보와 함께 자리배치 데이터 조회"""
         # 자리배치 조회
@@ -292,8 +397,7 @@ class SupabaseService:
         
         if all_student_emails:
             # 학생 정보 조회 
-            students_endpoint = f"users?email=in.({','.join(all_student_emails)})&role=eq.student&select=id,email,name,student_profiles(student_id,grade,class_number)"
-            students = self._make_request('GET', students_endpoint, use_service_role=True)
+            students = self.get_students_by_emails(all_student_emails)
             
             # 학생 정보를 이메일로 매핑
             for student in students:
@@ -332,30 +436,47 @@ class SupabaseService:
             
             created_by_id = user['id']
             
-            # 기존 배치 비활성화
-            endpoint = f"seat_arrangements?classroom=eq.{classroom}&arrangement_date=eq.{arrangement_date}"
-            deactivate_data = {'is_active': False}
-            self._make_request('PATCH', endpoint, deactivate_data, use_service_role=True)
+            # 그날 유효한 버전과 비교해 바뀐 위치만 반영
+            version = self.get_seat_arrangement_version_on(classroom, arrangement_date)
+            current_rows = []
+            if version:
+                endpoint = f"seat_arrangements?classroom=eq.{classroom}&arrangement_date=eq.{version['effective_from']}&select=position_key,student_emails,is_active"
+                current_rows = self._make_request('GET', endpoint, use_service_role=True) or []
+            diff = diff_arrangements(current_rows, arrangements)
             
-            # 새 배치 저장
-            insert_data = []
-            for position_key, student_emails in arrangements.items():
-                if student_emails:  # 빈 자리가 아닌 경우에만 저장
-                    insert_data.append({
-                        'classroom': classroom,
-                        'position_key': position_key,
-                        'student_emails': student_emails,
-                        'arrangement_date': arrangement_date,
-                        'created_by': created_by_id,
-                        'is_active': True
-                    })
+            # 바뀐 것이 있을 때만 그날 시작하는 버전을 엶 (이전 버전 좌석이 복사됨)
+            if (diff['upserts'] or diff['deletes']) and (not version or str(version['effective_from']) != str(arrangement_date)):
+                if not self.open_seat_arrangement_version(classroom, arrangement_date, created_by_id):
+                    return {'success': False, 'error': '자리배치 버전을 만들지 못했습니다.'}
             
-            if insert_data:
-                endpoint = "seat_arrangements"
-                result = self._make_request('POST', endpoint, insert_data, use_service_role=True)
-                return {'success': True, 'saved_positions': len(insert_data)}
+            if diff['upserts']:
+                upsert_data = [{
+                    'classroom': classroom,
+                    'position_key': position_key,
+                    'student_emails': student_emails,
+                    'arrangement_date': arrangement_date,
+                    'created_by': created_by_id,
+                    'is_active': True
+                } for position_key, student_emails in diff['upserts'].items()]
+                
+                endpoint = "seat_arrangements?on_conflict=classroom,position_key,arrangement_date"
+                self._make_request('POST', endpoint, upsert_data, use_service_role=True,
+                                   prefer='resolution=merge-duplicates,return=minimal')
             
-            return {'success': True, 'saved_positions': 0}
+            if diff['deletes']:
+                position_keys = ','.join(f'"{position_key}"' for position_key in diff['deletes'])
+                endpoint = (f"seat_arrangements?classroom=eq.{classroom}&arrangement_date=eq.{arrangement_date}"
+                            f"&position_key=in.({position_keys})")
+                self._make_request('DELETE', endpoint, use_service_role=True)
+            
+            return {
+                'success': True,
+                'saved_positions': len(diff['upserts']) + diff['unchanged'],
+                'upserted': len(diff['upserts']),
+                'deleted': len(diff['deletes']),
+                'unchanged': diff['unchanged'],
+                'touched_rows': len(diff['upserts']) + len(diff['deletes'])
+            }
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -377,94 +498,73 @@ class SupabaseService:
         result = self._make_request('GET', endpoint, use_service_role=True)
         return result[0] if result else None
     
+    def get_period_configs(self, date_from: str, date_to: str) -> List[Dict]:
+        """기간 내 교시 설정 목록 (설정이 있는 날짜만)"""
+        endpoint = (f"period_configs?config_date=gte.{date_from}&config_date=lte.{date_to}"
+                    f"&select=config_date,is_holiday,regular_periods,study_periods,meal_periods,special_periods")
+        return self._make_request('GET', endpoint, use_service_role=True)
+    
     def get_attendance_records_by_period(self, attendance_date: str, period: int, classroom: str = None) -> List[Dict]:
         """교시별 출석 기록 조회"""
         endpoint = f"attendance_records?attendance_date=eq.{attendance_date}&period=eq.{period}&select=*,users(name,student_profiles(student_id,grade,class_number))&order=student_email"
         return self._make_request('GET', endpoint, use_service_role=True)
     
+    def get_attendance_status_rows(self, attendance_date: str, period: int, table: str = 'attendance_records') -> List[Dict]:
+        """교시별 출석 상태만 조회 (스냅샷 적재용, 사용자 정보 미포함)"""
+        endpoint = f"{table}?attendance_date=eq.{attendance_date}&period=eq.{period}&select=student_email,status,notes,activity_type,activity_location,version"
+        return self._make_request('GET', endpoint, use_service_role=True)
+    
+    def get_attendance_records_page(self, date_from: str, date_to: str, after: tuple = None, limit: int = 1000,
+                                    table: str = 'attendance_records') -> List[Dict]:
+        """기간별 출석 기록 페이지 조회 (키셋 페이지네이션, after = (날짜, 교시, id))"""
+        endpoint = (f"{table}?attendance_date=gte.{date_from}&attendance_date=lte.{date_to}"
+                    f"&select=id,attendance_date,period,student_email,status,marked_at,returned_at,notes,activity_type,activity_location"
+                    f"&order=attendance_date,period,id&limit={limit}")
+        
+        if after:
+            last_date, last_period, last_id = after
+            endpoint += (f"&or=(attendance_date.gt.{last_date},"
+                         f"and(attendance_date.eq.{last_date},period.gt.{last_period}),"
+                         f"and(attendance_date.eq.{last_date},period.eq.{last_period},id.gt.{last_id}))")
+        
+        return self._make_request('GET', endpoint, use_service_role=True)
+    
+    def get_absence_cells(self, date_from: str, date_to: str, periods, statuses,
+                          table: str = 'attendance_records') -> List[Dict]:
+        """기간 내 지정 교시의 부재 기록 (학생, 날짜, 교시만 - 부재 이상 탐지 적재용)"""
+        endpoint = (f"{table}?attendance_date=gte.{date_from}&attendance_date=lte.{date_to}"
+                    f"&period=in.({','.join(str(period) for period in periods)})"
+                    f"&status=in.({','.join(statuses)})"
+                    f"&select=student_email,attendance_date,period")
+        return self._make_request('GET', endpoint, use_service_role=True)
+    
+    def get_attendance_archive_cutoff(self) -> Optional[str]:
+        """보관 경계 날짜 조회 (이 날짜 이전 기록은 보관 테이블에 있음)"""
+        endpoint = "attendance_archive_state?id=eq.1&select=archived_before"
+        result = self._make_request('GET', endpoint, use_service_role=True)
+        return result[0]['archived_before'] if result else None
+    
+    def archive_attendance_records(self, before: str, batch_size: int = 5000) -> int:
+        """종료된 학기 출석 기록을 보관 테이블로 한 묶음 이동 (이동한 행 수 반환)"""
+        endpoint = "rpc/archive_attendance_records"
+        result = self._make_request('POST', endpoint, {'p_before': before, 'p_batch_size': batch_size}, use_service_role=True)
+        return result if isinstance(result, int) else 0
+    
     def get_activity_records(self, activity_date: str, period: int) -> List[Dict]:
         """활동 기록 조회 (분임토의실 등)"""
         endpoint = f"attendance_records?attendance_date=eq.{activity_date}&period=eq.{period}&status=eq.activity&select=*,users(name,student_profiles(student_id))&order=student_email"
         return self._make_request('GET', endpoint, use_service_role=True)
     
-    def mark_attendance_bulk(self, attendance_date: str, period: int, student_emails: List[str], 
-                           status: str, marked_by_email: str, notes: str = '') -> Dict:
-        """일괄 출석 처리"""
-        try:
-            # 처리자 정보 조회
-            marker = self.get_user_by_email(marked_by_email)
-            if not marker:
-                return {'success': False, 'error': '처리자를 찾을 수 없습니다.'}
-            
-            marked_by_id = marker['id']
-            current_time = datetime.utcnow().isoformat()
-            processed_count = 0
-            
-            for email in student_emails:
-                # 학생 정보 조회
-                student = self.get_user_by_email(email)
-                if not student or student['role'] != 'student':
-                    continue
-                
-                student_id = student['id']
-                
-                # 기존 기록 확인
-                existing_endpoint = f"attendance_records?attendance_date=eq.{attendance_date}&period=eq.{period}&student_id=eq.{student_id}&select=id,status"
-                existing_records = self._make_request('GET', existing_endpoint, use_service_role=True)
-                
-                if existing_records:
-                    # 기존 기록 업데이트
-                    existing_id = existing_records[0]['id']
-                    update_data = {
-                        'status': status,
-                        'notes': notes,
-                        'updated_at': current_time
-                    }
-                    
-                    if status == 'absent':
-                        update_data.update({
-                            'marked_by': marked_by_id,
-                            'marked_at': current_time
-                        })
-                    elif status in ['returned', 'present']:
-                        update_data.update({
-                            'returned_by': marked_by_id,
-                            'returned_at': current_time
-                        })
-                    
-                    update_endpoint = f"attendance_records?id=eq.{existing_id}"
-                    self._make_request('PATCH', update_endpoint, update_data, use_service_role=True)
-                else:
-                    # 새 기록 생성
-                    insert_data = {
-                        'attendance_date': attendance_date,
-                        'period': period,
-                        'student_id': student_id,
-                        'student_email': email,
-                        'status': status,
-                        'notes': notes
-                    }
-                    
-                    if status == 'absent':
-                        insert_data.update({
-                            'marked_by': marked_by_id,
-                            'marked_at': current_time
-                        })
-                    elif status in ['returned', 'present']:
-                        insert_data.update({
-                            'returned_by': marked_by_id,
-                            'returned_at': current_time
-                        })
-                    
-                    endpoint = "attendance_records"
-                    self._make_request('POST', endpoint, insert_data, use_service_role=True)
-                
-                processed_count += 1
-            
-            return {'success': True, 'processed_count': processed_count}
-            
-        except Exception as e:
-            return {'success': False, 'error': str(e)}
+    def record_attendance_events(self, events: List[Dict]) -> List[Dict]:
+        """출석 이벤트 기록 + 상태 전이를 RPC 1회로 적용 (항목별 적용/무시/충돌 결과)"""
+        endpoint = "rpc/record_attendance_events"
+        return self._make_request('POST', endpoint, {'p_events': events}, use_service_role=True)
+    
+    def rebuild_attendance_records(self, date_from: str, date_to: str) -> Optional[int]:
+        """기간 내 현재 상태를 이벤트 재생으로 다시 만들기 (재생한 이벤트 수 반환, 실패 시 None)"""
+        endpoint = "rpc/rebuild_attendance_records"
+        result = self._make_request('POST', endpoint, {'p_from': date_from, 'p_to': date_to}, use_service_role=True)
+        return result if isinstance(result, int) else None
     
     def get_supervisor_schedules(self, schedule_date: str) -> List[Dict]:
         """감독교사 스케줄 조회"""
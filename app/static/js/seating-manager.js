@@ -3,6 +3,255 @@
  * 자리배치표 관리 JavaScript (DSHS-Life 스타일)
  */
 
+// /seating/api/seat-arrangement 압축 형식 버전 (app/utils/seat_payload.py의 SCHEMA_VERSION)
+const SEAT_PAYLOAD_SCHEMA = 1;
+
+/**
+ * 압축 형식 보드를 화면용 구조로 풀기
+ * 학생 목록은 한 번만 오고, 좌석은 학생이 앉은 슬롯만 평행 배열(slot/student/status/version)로 온다.
+ */
+function decodeSeatPayload(payload) {
+    if (payload.schema !== SEAT_PAYLOAD_SCHEMA) {
+        throw new Error(`지원하지 않는 자리배치 형식입니다 (schema ${payload.schema})`);
+    }
+    
+    const rowsPerLine = payload.rows_per_line;
+    const fields = payload.student_fields;
+    const students = payload.students.map(row => Object.fromEntries(fields.map((field, i) => [field, row[i]])));
+    
+    // 슬롯 표 (빈 좌석 = user null)
+    const slots = Array.from({ length: payload.lines.length * rowsPerLine }, () => ({ user: null, items: [], status: 'present' }));
+    const { slot, student, status, version } = payload.seats;
+    for (let i = 0; i < slot.length; i++) {
+        slots[slot[i]] = {
+            user: students[student[i]],
+            items: [],
+            status: payload.status_codes[status[i]],
+            version: version[i]
+        };
+    }
+    payload.activities.forEach(([seatIndex, type, place]) => {
+        slots[slot[seatIndex]].items.push({ type, place });
+    });
+    
+    // 섹션별 좌석 열 (lines는 레이아웃 순서, break 섹션은 열 없음)
+    let line = 0;
+    const sections = payload.sections.map(([name, type, cols, stick]) => {
+        const lines = [];
+        for (let c = 0; c < cols; c++, line++) {
+            lines.push({
+                key: payload.lines[line],
+                seats: slots.slice(line * rowsPerLine, (line + 1) * rowsPerLine)
+            });
+        }
+        return { name, type, stick, lines };
+    });
+    
+    return {
+        name: payload.name,
+        bottom_left: payload.bottom_left,
+        sections: sections,
+        seats: slots.filter(seat => seat.user)
+    };
+}
+
+/**
+ * 출석 처리 쓰기 버퍼
+ * 짧은 시간 동안 들어온 탭을 모아 한 번의 요청으로 보내고, 항목별 응답을 돌려준다.
+ * 네트워크/서버 오류 시 항목별로 지수 백오프 재시도한다.
+ * 같은 학생/날짜/교시의 반대 탭은 보내기 전에 상쇄하고, 앞선 요청이 끝나지 않은 학생의
+ * 탭은 그 응답의 버전을 받아 이어서 보낸다.
+ */
+class AttendanceWriteBuffer {
+    constructor(options = {}) {
+        this.endpoint = options.endpoint || '/seating/api/missing/batch';
+        this.flushDelay = options.flushDelay || 400;   // 탭을 모으는 시간 (ms)
+        this.maxBatchSize = options.maxBatchSize || 200;
+        this.maxRetries = options.maxRetries || 3;
+        
+        this.queue = [];
+        this.timer = null;
+        this.inFlight = false;
+        this.sequence = 0;
+        this.sending = new Set();  // 응답을 기다리는 항목 키 (재시도 중 포함)
+    }
+    
+    keyOf(item) {
+        return `${item.uid}|${item.date}|${item.period}`;
+    }
+    
+    /**
+     * 항목 추가 (처리 결과로 resolve/reject 되는 Promise 반환)
+     */
+    enqueue(item) {
+        const key = this.keyOf(item);
+        
+        // 아직 보내지 않은 반대 탭이 있으면 둘 다 서버에 보내지 않고 상쇄
+        const pending = this.queue.findIndex(entry => entry.key === key && entry.item.action !== item.action);
+        if (pending !== -1) {
+            const [previous] = this.queue.splice(pending, 1);
+            const result = { ok: true, applied: false, status: null, version: previous.item.version, error: null };
+            previous.resolve({ ...result, id: previous.item.id });
+            return Promise.resolve(result);
+        }
+        
+        return new Promise((resolve, reject) => {
+            this.queue.push({
+                key,
+                item: { ...item, id: `${Date.now()}-${this.sequence++}` },
+                resolve,
+                reject
+            });
+            
+            if (this.queue.length >= this.maxBatchSize) {
+                this.flush();
+            } else {
+                this.scheduleFlush(this.flushDelay);
+            }
+        });
+    }
+    
+    /**
+     * 보낸 항목의 결과 전달 후 같은 키로 기다리던 탭 정리
+     * 성공하면 서버 버전을 이어받고, 실패하면 화면이 되돌아가므로 반대 탭은 상쇄한다.
+     */
+    settle(entry, result, error) {
+        this.sending.delete(entry.key);
+        
+        this.queue = this.queue.filter(waiting => {
+            if (waiting.key !== entry.key) return true;
+            if (result) {
+                if (result.version !== null && result.version !== undefined) {
+                    waiting.item.version = result.version;
+                }
+                return true;
+            }
+            if (waiting.item.action === entry.item.action) return true;
+            waiting.resolve({ id: waiting.item.id, ok: true, applied: false, status: null,
+                              version: waiting.item.version, error: null });
+            return false;
+        });
+        
+        if (error) {
+            entry.reject(error);
+        } else {
+            entry.resolve(result);
+        }
+        
+        if (this.queue.length > 0 && !this.inFlight) {
+            this.scheduleFlush(this.flushDelay);
+        }
+    }
+    
+    scheduleFlush(delay) {
+        if (this.timer) return;
+        this.timer = setTimeout(() => {
+            this.timer = null;
+            this.flush();
+        }, delay);
+    }
+    
+    async flush() {
+        if (this.timer) {
+            clearTimeout(this.timer);
+            this.timer = null;
+        }
+        
+        // 이전 요청이 끝나면 남은 항목을 이어서 전송
+        if (this.inFlight || this.queue.length === 0) return;
+        
+        // 앞선 요청의 응답을 기다리는 학생의 탭은 남겨 두었다가 버전을 받아 다음 배치로 전송
+        const entries = [];
+        const waiting = [];
+        this.queue.forEach(entry => {
+            const ready = entries.length < this.maxBatchSize && !this.sending.has(entry.key);
+            (ready ? entries : waiting).push(entry);
+        });
+        if (entries.length === 0) return;
+        
+        this.queue = waiting;
+        entries.forEach(entry => this.sending.add(entry.key));
+        
+        // 재시도 시에도 같은 내용과 같은 Idempotency-Key로 보내 중복 처리를 막음
+        const batch = {
+            key: this.createKey(),
+            entries,
+            attempts: 0
+        };
+        this.inFlight = true;
+        
+        try {
+            await this.send(batch);
+        } finally {
+            this.inFlight = false;
+            if (this.queue.length > 0) {
+                this.scheduleFlush(this.flushDelay);
+            }
+        }
+    }
+    
+    async send(batch) {
+        try {
+            const response = await fetch(this.endpoint, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': batch.key
+                },
+                body: JSON.stringify({ items: batch.entries.map(entry => entry.item) })
+            });
+            
+            // 서버 오류와 처리 중(409) 응답은 같은 키로 재시도
+            if (response.status >= 500 || response.status === 409) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            
+            const data = await response.json();
+            
+            if (!response.ok || !Array.isArray(data.results)) {
+                // 요청 자체가 거부된 경우 재시도하지 않음
+                batch.entries.forEach(entry => this.settle(entry, null, new Error(data.error || `HTTP ${response.status}`)));
+            } else {
+                const resultsById = new Map(data.results.map(result => [result.id, result]));
+                batch.entries.forEach(entry => {
+                    const result = resultsById.get(entry.item.id);
+                    if (result && result.ok) {
+                        this.settle(entry, result, null);
+                    } else {
+                        // 버전 충돌이면 서버의 현재 상태/버전을 함께 전달
+                        const error = new Error(result?.error || '처리 실패');
+                        if (result?.conflict) {
+                            Object.assign(error, { conflict: true, status: result.status, version: result.version });
+                        }
+                        this.settle(entry, null, error);
+                    }
+                });
+            }
+        } catch (error) {
+            this.retry(batch, error);
+        }
+    }
+    
+    retry(batch, error) {
+        batch.attempts += 1;
+        
+        if (batch.attempts > this.maxRetries) {
+            batch.entries.forEach(entry => this.settle(entry, null, error));
+            return;
+        }
+        
+        // 지수 백오프 (0.8초, 1.6초, 3.2초 ...)
+        setTimeout(() => this.send(batch), this.flushDelay * 2 ** batch.attempts);
+    }
+    
+    createKey() {
+        if (window.crypto && window.crypto.randomUUID) {
+            return window.crypto.randomUUID();
+        }
+        return `${Date.now()}-${Math.random().toString(36).slice(2)}-${this.sequence++}`;
+    }
+}
+
 class SeatingManager {
     constructor(config) {
         this.isTeacher = config.isTeacher || false;
@@ -17,6 +266,12 @@ class SeatingManager {
         this.gradeSeats = [];
         this.selectedStudents = new Set();
         this.selectionMode = false;
+        this.quickMode = false;
+        this.absentStudents = new Set();
+        this.versions = new Map();  // 학생 이메일 -> 출석 기록 버전 (스트림 변경분으로 갱신)
+        this.writeBuffer = new AttendanceWriteBuffer();
+        this.stream = null;
+        this.streamRetry = null;
         
         // DOM 요소들
         this.elements = {};
@@ -42,6 +297,7 @@ class SeatingManager {
             seatGrid: document.getElementById('seat-grid'),
             loadingIndicator: document.getElementById('loading-indicator'),
             selectionMode: document.getElementById('selection-mode'),
+            quickMode: document.getElementById('quick-mode'),
             selectedCount: document.getElementById('selected-count'),
             markAbsent: document.getElementById('mark-absent'),
             markPresent: document.getElementById('mark-present'),
@@ -86,6 +342,11 @@ class SeatingManager {
             this.updateSelectionUI();
         });
         
+        // 빠른 처리 모드 토글 (탭하면 바로 부재/복귀)
+        this.elements.quickMode?.addEventListener('change', (e) => {
+            this.quickMode = e.target.checked;
+        });
+        
         // 부재/복귀 버튼
         this.elements.markAbsent?.addEventListener('click', () => this.markAttendance('absent'));
         this.elements.markPresent?.addEventListener('click', () => this.markAttendance('present'));
@@ -177,6 +438,85 @@ class SeatingManager {
         this.clearSelection();
     }
     
+    /**
+     * 보드를 한 번 불러온 뒤 실시간 변경분 구독 (이후 새로고침 없이 좌석 단위로 갱신)
+     */
+    async loadSeatingData() {
+        await this.loadSeatArrangement();
+        this.openStream();
+    }
+    
+    /**
+     * 교실/날짜/교시 변경분 스트림 연결 (SSE)
+     * 끊기면 브라우저가 Last-Event-ID로 자동 재연결하고 서버가 놓친 변경분을 다시 보낸다.
+     */
+    openStream() {
+        clearTimeout(this.streamRetry);
+        if (this.stream) {
+            this.stream.close();
+            this.stream = null;
+        }
+        if (!window.EventSource || !this.currentDate) return;
+        
+        const params = new URLSearchParams({
+            classroom: `grade_${this.currentGrade}`,
+            date: this.currentDate,
+            period: this.currentPeriod
+        });
+        this.stream = new EventSource(`/seating/api/stream?${params}`);
+        
+        this.stream.addEventListener('seat', (e) => {
+            JSON.parse(e.data).forEach(delta => this.applyDelta(delta));
+        });
+        
+        // 놓친 변경분을 이어 받을 수 없는 경우에만 보드를 다시 불러옴
+        this.stream.addEventListener('reset', () => this.loadSeatArrangement());
+        
+        // 서버가 연결 수 상한으로 거절(503)하면 브라우저가 재연결하지 않으므로 잠시 뒤 보드부터 다시 연결
+        const source = this.stream;
+        source.addEventListener('error', () => {
+            if (source !== this.stream || source.readyState !== EventSource.CLOSED) return;
+            this.stream = null;
+            this.streamRetry = setTimeout(() => this.loadSeatingData(), 15000 + Math.random() * 15000);
+        });
+    }
+    
+    /**
+     * 변경분 하나를 해당 좌석에 반영 (보드 전체를 다시 그리지 않음)
+     */
+    applyDelta(delta) {
+        if (delta.version !== null && delta.version !== undefined) {
+            this.versions.set(delta.email, delta.version);
+        }
+        
+        const seatEl = this.seatElement(delta.email);
+        if (!seatEl) return;
+        
+        this.setSeatAbsent(delta.email, seatEl, delta.status === 'absent');
+        
+        const isActivity = delta.status === 'activity';
+        seatEl.classList.toggle('seat-activity', isActivity);
+        seatEl.classList.toggle('bg-blue-100', isActivity);
+        seatEl.classList.toggle('seat-present', !isActivity);
+        
+        let activityEl = seatEl.querySelector('.seat-activity-text');
+        if (isActivity) {
+            if (!activityEl) {
+                activityEl = document.createElement('div');
+                activityEl.className = 'seat-activity-text text-xs text-blue-600 text-center';
+                seatEl.appendChild(activityEl);
+            }
+            activityEl.textContent = delta.activity?.place || delta.activity?.type || '';
+        } else if (activityEl) {
+            activityEl.remove();
+        }
+    }
+    
+    seatElement(userEmail) {
+        if (!this.elements.seatGrid || !userEmail) return null;
+        return this.elements.seatGrid.querySelector(`.seat-item[data-user-email="${CSS.escape(userEmail)}"]`);
+    }
+    
     /**
      * 자리배치 데이터 로드
      */
@@ -204,8 +544,18 @@ class SeatingManager {
             
             const data = await response.json();
             
-            if (data.success) {
-                this.gradeSeats = data.grade_seats || [];
+            if (data.schema !== undefined) {
+                const board = decodeSeatPayload(data);
+                this.gradeSeats = [board];
+                
+                // 화면 상태(부재/기록 버전)를 받은 보드로 맞춤
+                this.absentStudents.clear();
+                this.versions.clear();
+                board.seats.forEach(seat => {
+                    if (seat.status === 'absent') this.absentStudents.add(seat.user.email);
+                    this.versions.set(seat.user.email, seat.version);
+                });
+                
                 this.renderSeatingChart();
             } else {
                 this.showNotification('자리배치 데이터 로드 실패: ' + (data.error || '알 수 없는 오류'), 'error');
@@ -222,7 +572,7 @@ class SeatingManager {
         if (!this.elements.seatGrid) return;
         
         const gridHtml = this.gradeSeats.map(grade => {
-            const sectionsHtml = grade.seats.map(section => this.createSection(section)).join('');
+            const sectionsHtml = grade.sections.map(section => this.createSection(section)).join('');
             
             return `
                 <div class="grade-container">
@@ -246,74 +596,29 @@ class SeatingManager {
     }
     
     createSection(section) {
-        const seatItems = this.createSeatItems(section);
+        if (section.type === 'break') {
+            return '<div class="seat-break w-4"></div>';
+        }
+        
         const borderClass = section.stick ? 'border-l-4 border-gray-800' : '';
+        const linesHtml = section.lines.map(line => `
+            <div class="seat-line" data-line="${line.key}">
+                ${line.seats.map((seat, row) => this.createSeatElement(seat, `${line.key}:${row}`)).join('')}
+            </div>
+        `).join('');
         
         return `
             <div class="seat-section ${borderClass}">
                 <div class="section-header text-center text-sm font-medium text-gray-700 mb-1">
                     ${section.name}
                 </div>
-                <div class="seat-columns flex">
-                    ${section.cols > 1 ? this.createDoubleColumn(seatItems) : this.createSingleColumn(seatItems)}
+                <div class="seat-columns flex gap-1">
+                    ${linesHtml}
                 </div>
             </div>
         `;
     }
     
-    createSeatItems(section) {
-        // DSHS-Life의 seatLine 함수 구현
-        const items = [];
-        
-        if (section.type === 'single') {
-            // 단일 열 좌석 (7개)
-            for (let i = 0; i < 7; i++) {
-                items.push(this.createEmptySeat());
-            }
-        } else {
-            // 이중 열 좌석 (좌우 각 7개)
-            const leftSeats = [];
-            const rightSeats = [];
-            
-            for (let i = 0; i < 7; i++) {
-                leftSeats.push(this.createEmptySeat());
-                rightSeats.push(this.createEmptySeat());
-            }
-            
-            items.push({ left: leftSeats, right: rightSeats });
-        }
-        
-        return items;
-    }
-    
-    createEmptySeat() {
-        return {
-            user: null,
-            items: []
-        };
-    }
-    
-    createSingleColumn(seatItems) {
-        const seatsHtml = seatItems.map((seat, index) => this.createSeatElement(seat, index)).join('');
-        return `<div class="single-column">${seatsHtml}</div>`;
-    }
-    
-    createDoubleColumn(seatItems) {
-        if (seatItems.length > 0 && seatItems[0].left) {
-            const leftHtml = seatItems[0].left.map((seat, index) => this.createSeatElement(seat, `L${index}`)).join('');
-            const rightHtml = seatItems[0].right.map((seat, index) => this.createSeatElement(seat, `R${index}`)).join('');
-            
-            return `
-                <div class="double-column flex gap-1">
-                    <div class="left-seats">${leftHtml}</div>
-                    <div class="right-seats">${rightHtml}</div>
-                </div>
-            `;
-        }
-        
-        return '<div class="double-column"></div>';
-    }
-    
     createSeatElement(seat, position) {
         const isEmpty = !seat.user;
         const user = seat.user;
@@ -326,6 +631,9 @@ class SeatingManager {
             if (activities.length > 0) {
                 statusClass = 'seat-activity';
                 bgColor = 'bg-blue-100';
+            } else if (seat.status === 'absent') {
+                statusClass = 'seat-present seat-absent';
+                bgColor = 'bg-red-100';
             } else {
                 statusClass = 'seat-present';
                 bgColor = 'bg-white';
@@ -348,7 +656,7 @@ class SeatingManager {
                 ${!isEmpty ? `
                     <div class="text-xs text-gray-600">${user.no}</div>
                     <div class="font-medium text-center leading-tight">${user.name}</div>
-                    ${activityText ? `<div class="text-xs text-blue-600 text-center">${activityText}</div>` : ''}
+                    ${activityText ? `<div class="seat-activity-text text-xs text-blue-600 text-center">${activityText}</div>` : ''}
                 ` : ''}
             </div>
         `;
@@ -375,7 +683,10 @@ class SeatingManager {
         
         if (!userEmail) return; // 빈 자리
         
-        if (this.selectionMode && this.isTeacher) {
+        if (this.quickMode && this.isTeacher) {
+            // 빠른 처리 모드: 탭 즉시 버퍼에 넣고 모아서 전송
+            this.quickToggle(userEmail, userName, seatEl);
+        } else if (this.selectionMode && this.isTeacher) {
             // 선택 모드: 학생 선택/해제
             this.toggleStudentSelection(userEmail, seatEl);
         } else {
@@ -384,6 +695,40 @@ class SeatingManager {
         }
     }
     
+    quickToggle(userEmail, userName, seatEl) {
+        const action = this.absentStudents.has(userEmail) ? 'return' : 'miss';
+        
+        // 응답을 기다리지 않고 먼저 화면에 반영
+        this.setSeatAbsent(userEmail, seatEl, action === 'miss');
+        
+        this.writeBuffer.enqueue({
+            action: action,
+            date: this.currentDate,
+            period: this.currentPeriod,
+            uid: userEmail,
+            version: this.versions.get(userEmail)
+        }).then(result => {
+            // 스트림 에코를 기다리지 않고 서버가 돌려준 버전으로 바로 갱신
+            if (result.version !== null && result.version !== undefined) {
+                this.versions.set(userEmail, result.version);
+            }
+        }).catch(error => {
+            // 최종 실패 시 화면 상태 되돌리기
+            this.setSeatAbsent(userEmail, seatEl, action !== 'miss');
+            this.showNotification(`${userName} 처리 실패: ${error.message}`, 'error');
+        });
+    }
+    
+    setSeatAbsent(userEmail, seatEl, absent) {
+        if (absent) {
+            this.absentStudents.add(userEmail);
+        } else {
+            this.absentStudents.delete(userEmail);
+        }
+        seatEl.classList.toggle('seat-absent', absent);
+        seatEl.classList.toggle('bg-red-100', absent);
+    }
+    
     toggleStudentSelection(userEmail, seatEl) {
         if (this.selectedStudents.has(userEmail)) {
             this.selectedStudents.delete(userEmail);
@@ -450,33 +795,39 @@ class SeatingManager {
             return;
         }
         
-        try {
-            const response = await fetch('/seating/api/mark-attendance', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    date: this.currentDate,
-                    period: this.currentPeriod,
-                    student_emails: studentEmails,
-                    status: status
-                })
-            });
-            
-            const data = await response.json();
-            
-            if (data.success) {
-                this.showNotification(`${data.affected_count}명의 학생을 ${statusText} 처리했습니다.`, 'success');
-                this.clearSelection();
-                this.loadSeatingData(); // 새로고침
-            } else {
-                this.showNotification('출석 처리 실패: ' + (data.error || '알 수 없는 오류'), 'error');
+        // 쓰기 버퍼를 통해 한 번의 일괄 요청으로 전송 (항목별 응답)
+        const action = status === 'absent' ? 'miss' : 'return';
+        const results = await Promise.allSettled(studentEmails.map(email => this.writeBuffer.enqueue({
+            action: action,
+            date: this.currentDate,
+            period: this.currentPeriod,
+            uid: email
+        })));
+        
+        const failedCount = results.filter(result => result.status === 'rejected').length;
+        const processedCount = results.length - failedCount;
+        
+        results.forEach((result, index) => {
+            if (result.status === 'fulfilled') {
+                const seatEl = this.seatElement(studentEmails[index]);
+                if (seatEl) {
+                    this.setSeatAbsent(studentEmails[index], seatEl, action === 'miss');
+                } else if (action === 'miss') {
+                    this.absentStudents.add(studentEmails[index]);
+                } else {
+                    this.absentStudents.delete(studentEmails[index]);
+                }
             }
-        } catch (error) {
-            console.error('출석 처리 실패:', error);
-            this.showNotification('서버 연결 실패', 'error');
+        });
+        
+        if (failedCount === 0) {
+            this.showNotification(`${processedCount}명의 학생을 ${statusText} 처리했습니다.`, 'success');
+        } else {
+            this.showNotification(`${processedCount}명 ${statusText} 처리, ${failedCount}명 실패`, 'error');
         }
+        
+        // 다른 교사의 화면에는 스트림 변경분으로 반영되므로 보드를 다시 불러오지 않음
+        this.clearSelection();
     }
     
     showStudentModal(userEmail, userName, userNo) {
@@ -1,9 +1,16 @@
+import hashlib
 from functools import wraps
-from flask import abort, redirect, url_for, request, flash
+from flask import abort, redirect, url_for, request, flash, jsonify, make_response
 from flask_login import current_user
 
+from .idempotency import idempotency_store
+
 def role_required(*roles):
     """특정 역할이 필요한 라우트를 보호하는 데코레이터"""
+    # role_required(['teacher', 'admin']) 처럼 리스트로 넘긴 경우도 허용
+    if len(roles) == 1 and isinstance(roles[0], (list, tuple, set)):
+        roles = tuple(roles[0])
+    
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -53,4 +60,52 @@ def ajax_required(func):
         if not request.is_json:
             abort(400)
         return func(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+def idempotent(ttl_seconds=600):
+    """
+    Idempotency-Key 헤더가 있는 요청의 응답을 잠시 보관했다가
+    같은 키로 재시도되면 다시 처리하지 않고 저장된 응답을 반환하는 데코레이터
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            idempotency_key = request.headers.get('Idempotency-Key')
+            if not idempotency_key:
+                return func(*args, **kwargs)
+
+            # 사용자/엔드포인트 단위로 키 구분
+            user_key = current_user.get_id() if current_user.is_authenticated else request.remote_addr
+            key = f"{user_key}:{request.method}:{request.path}:{idempotency_key}"
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+
+            state, stored = idempotency_store.begin(key, fingerprint, ttl_seconds)
+
+            if state == 'replay':
+                body, status_code, mimetype = stored
+                response = make_response(body, status_code)
+                response.mimetype = mimetype
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response
+
+            if state == 'pending':
+                return jsonify({'error': '같은 요청을 처리하고 있습니다. 잠시 후 다시 시도해주세요.'}), 409
+
+            if state == 'mismatch':
+                return jsonify({'error': '같은 Idempotency-Key로 다른 요청을 보낼 수 없습니다.'}), 422
+
+            try:
+                response = make_response(func(*args, **kwargs))
+            except Exception:
+                idempotency_store.abort(key)
+                raise
+
+            # 서버 오류는 저장하지 않아 재시도 시 다시 처리되도록 함
+            if response.status_code >= 500:
+                idempotency_store.abort(key)
+            else:
+                idempotency_store.complete(key, (response.get_data(), response.status_code, response.mimetype))
+
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,87 @@
+"""
+멱등성 키 저장소
+Short-lived store for replaying responses of retried mutation requests
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple, Any
+
+class IdempotencyStore:
+    """
+    Idempotency-Key별 처리 상태와 응답을 잠시 보관하는 메모리 저장소
+
+    프로세스 메모리에 보관하므로 gunicorn 워커마다 별도입니다.
+    같은 워커로 재시도되는 요청(keep-alive 연결)에서 가장 효과가 큽니다.
+    """
+
+    PENDING = 'pending'
+    DONE = 'done'
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def begin(self, key: str, fingerprint: str, ttl_seconds: int) -> Tuple[str, Optional[Any]]:
+        """
+        요청 처리 시작
+
+        Returns:
+            ('new', None): 처음 들어온 요청 - 처리 후 complete 호출 필요
+            ('replay', response): 이미 처리된 요청 - 저장된 응답 반환
+            ('pending', None): 같은 키의 요청이 처리 중
+            ('mismatch', None): 같은 키로 다른 내용의 요청
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['expires_at'] <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry:
+                if entry['fingerprint'] != fingerprint:
+                    return 'mismatch', None
+                if entry['state'] == self.PENDING:
+                    return 'pending', None
+                return 'replay', entry['response']
+
+            if len(self._entries) >= self.max_entries:
+                self._purge(now)
+
+            self._entries[key] = {
+                'state': self.PENDING,
+                'fingerprint': fingerprint,
+                'response': None,
+                'expires_at': now + ttl_seconds
+            }
+            return 'new', None
+
+    def complete(self, key: str, response: Any):
+        """처리 완료된 응답 저장"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry['state'] = self.DONE
+                entry['response'] = response
+
+    def abort(self, key: str):
+        """처리 실패 시 키 해제 (재시도 허용)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _purge(self, now: float):
+        """만료된 항목 정리, 그래도 가득 차면 오래된 항목부터 제거"""
+        expired = [key for key, entry in self._entries.items() if entry['expires_at'] <= now]
+        for key in expired:
+            del self._entries[key]
+
+        overflow = len(self._entries) - self.max_entries + 1
+        if overflow > 0:
+            for key in sorted(self._entries, key=lambda k: self._entries[k]['expires_at'])[:overflow]:
+                del self._entries[key]
+
+# 전역 저장소 인스턴스
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,40 @@
+"""
+자리배치 변경분 계산
+Diff between stored seat_arrangements rows and a submitted arrangement
+"""
+
+from typing import Dict, List, Any
+
+def diff_arrangements(current_rows: List[Dict[str, Any]],
+                      arrangements: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    저장된 자리배치 행과 새 배치를 비교해 바뀐 위치만 골라냄
+
+    Args:
+        current_rows: 해당 교실/날짜의 seat_arrangements 행 (position_key, student_emails, is_active)
+        arrangements: position_key -> 학생 이메일 목록 (빈 목록은 빈 자리)
+
+    Returns:
+        upserts: 새로 쓰거나 바꿀 {position_key: 학생 이메일 목록}
+        deletes: 비워진 (또는 이전 저장 방식에서 남은 비활성) position_key 목록
+        unchanged: 그대로인 위치 수
+    """
+    current = {row['position_key']: row for row in current_rows}
+    occupied = {key: list(emails) for key, emails in arrangements.items() if emails}
+
+    upserts = {}
+    unchanged = 0
+    for position_key, emails in occupied.items():
+        row = current.get(position_key)
+        if row and row.get('is_active', True) and list(row.get('student_emails') or []) == emails:
+            unchanged += 1
+        else:
+            upserts[position_key] = emails
+
+    deletes = [position_key for position_key in current if position_key not in occupied]
+
+    return {
+        'upserts': upserts,
+        'deletes': deletes,
+        'unchanged': unchanged
+    }
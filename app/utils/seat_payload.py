@@ -0,0 +1,95 @@
+"""
+좌석 현황 압축 전송 형식
+Compact array encoding of a rendered seat board (schema-versioned)
+"""
+
+from typing import Dict, List, Any
+
+from app.services.seat_grid_service import ROWS_PER_LINE
+
+# 형식이 바뀌면 올림 (seating-manager.js의 SEAT_PAYLOAD_SCHEMA와 같아야 함)
+SCHEMA_VERSION = 1
+
+# 상태 코드 = 목록 인덱스 (출석 = 0)
+STATUS_CODES = ['present', 'absent', 'returned', 'activity', 'late', 'early_leave', 'excused']
+
+STUDENT_FIELDS = ['email', 'name', 'no']
+
+def encode_board(board: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    render_board 결과를 배열 기반 압축 형식으로 변환
+
+    학생 정보는 한 번만 보내고, 좌석은 학생이 앉은 슬롯만 평행 배열로 보냅니다.
+    슬롯 인덱스 = 좌석 열(lines) 순서 * ROWS_PER_LINE + 행.
+
+    Args:
+        board: SeatingService.render_board 결과
+
+    Returns:
+        {
+            'schema': 형식 버전,
+            'date', 'period', 'classroom', 'rows_per_line', 'name', 'bottom_left',
+            'sections': [[이름, 유형, 좌석 열 수, stick], ...] (break는 열 수 0),
+            'lines': [position_key, ...],
+            'status_codes': 상태 코드표,
+            'student_fields': 학생 필드 이름,
+            'students': [[email, name, no], ...],
+            'seats': {'slot': [...], 'student': [...], 'status': [...], 'version': [...]},
+            'activities': [[seats 내 위치, 유형, 장소], ...]
+        }
+    """
+    layout = board.get('classroom') or {}
+    status_index = {status: code for code, status in enumerate(STATUS_CODES)}
+
+    students: List[List[Any]] = []
+    student_index: Dict[str, int] = {}
+    slots, student_refs, statuses, versions = [], [], [], []
+    activities = []
+
+    lines = list(board['seat_lines'].keys())
+    for line, position_key in enumerate(lines):
+        for row, seat in enumerate(board['seat_lines'][position_key]):
+            user = seat.get('user')
+            if not user:
+                continue
+
+            reference = student_index.get(user['email'])
+            if reference is None:
+                reference = student_index[user['email']] = len(students)
+                students.append([user.get(field, '') for field in STUDENT_FIELDS])
+
+            status = seat.get('status') or ('activity' if seat.get('items') else 'present')
+            if seat.get('items'):
+                item = seat['items'][0]
+                activities.append([len(slots), item.get('type', ''), item.get('place', '')])
+
+            slots.append(line * ROWS_PER_LINE + row)
+            student_refs.append(reference)
+            statuses.append(status_index.get(status, 0))
+            versions.append(seat.get('version', 0))
+
+    return {
+        'schema': SCHEMA_VERSION,
+        'date': board.get('date'),
+        'period': board.get('period'),
+        'classroom': layout.get('classroom_key'),
+        'rows_per_line': ROWS_PER_LINE,
+        'name': layout.get('classroom_name'),
+        'bottom_left': layout.get('bottom_left_info'),
+        'sections': [
+            [section['name'], section['type'], 0 if section['type'] == 'break' else len(section['cols']),
+             bool(section.get('stick'))]
+            for section in board['sections']
+        ],
+        'lines': lines,
+        'status_codes': STATUS_CODES,
+        'student_fields': STUDENT_FIELDS,
+        'students': students,
+        'seats': {
+            'slot': slots,
+            'student': student_refs,
+            'status': statuses,
+            'version': versions
+        },
+        'activities': activities
+    }
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+출석 저장 방식 비교 벤치마크
+Full roll-call rows vs exception-only rows (absent / returned / activity)
+
+한 학기 동안의 부재/복귀/활동 처리를 모의로 만들고, 두 저장 방식의
+attendance_records 행 수와 PostgREST로 보내는 쓰기 바이트를 비교합니다.
+
+    python benchmarks/attendance_storage_bench.py --students 600 --days 90
+"""
+
+import argparse
+import json
+import random
+import uuid
+from datetime import date, timedelta
+
+# 평일 운영 교시 (PeriodService 기본 설정과 동일)
+WEEKDAY_PERIODS = [1, 2, 3, 4, 22, 5, 6, 7, 11, 23, 12, 13, 25]
+
+def school_days(start: date, count: int):
+    """주말을 제외한 날짜 count개"""
+    day = start
+    while count:
+        if day.weekday() < 5:
+            yield day
+            count -= 1
+        day += timedelta(days=1)
+
+def row_payload(attendance_date: date, period: int, student_id: str, email: str, status: str) -> bytes:
+    """attendance_records 쓰기 요청 본문 1행"""
+    return json.dumps({
+        'attendance_date': attendance_date.isoformat(),
+        'period': period,
+        'student_id': student_id,
+        'student_email': email,
+        'status': status,
+        'notes': '',
+        'activity_type': None,
+        'activity_location': None
+    }).encode('utf-8')
+
+def simulate(students: int, days: int, absent_rate: float, return_rate: float,
+             activity_rate: float, seed: int):
+    rng = random.Random(seed)
+    roster = [(str(uuid.UUID(int=rng.getrandbits(128))), f'student{i}@school.com') for i in range(students)]
+
+    full = {'rows': 0, 'writes': 0, 'bytes': 0}
+    exception = {'rows': 0, 'writes': 0, 'bytes': 0}
+
+    for day in school_days(date(2026, 3, 2), days):
+        for period in WEEKDAY_PERIODS:
+            for student_id, email in roster:
+                roll = rng.random()
+                if roll < activity_rate:
+                    transitions = ['activity']
+                elif roll < activity_rate + absent_rate:
+                    transitions = ['absent']
+                    if rng.random() < return_rate:
+                        transitions.append('returned')
+                else:
+                    transitions = []
+
+                # 전체 기록: 교시마다 출석 행을 만들고 예외는 같은 행을 갱신
+                full['rows'] += 1
+                full['writes'] += 1 + len(transitions)
+                full['bytes'] += len(row_payload(day, period, student_id, email, 'present'))
+                for status in transitions:
+                    full['bytes'] += len(row_payload(day, period, student_id, email, status))
+
+                # 예외만 기록: 예외가 있을 때만 행 생성/갱신
+                if transitions:
+                    exception['rows'] += 1
+                    exception['writes'] += len(transitions)
+                    for status in transitions:
+                        exception['bytes'] += len(row_payload(day, period, student_id, email, status))
+
+    return full, exception
+
+def main():
+    parser = argparse.ArgumentParser(description='출석 저장 방식 비교 (전체 기록 vs 예외만 기록)')
+    parser.add_argument('--students', type=int, default=600)
+    parser.add_argument('--days', type=int, default=90, help='학기 중 수업일 수')
+    parser.add_argument('--absent-rate', type=float, default=0.03)
+    parser.add_argument('--return-rate', type=float, default=0.6, help='부재 중 복귀 처리 비율')
+    parser.add_argument('--activity-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    full, exception = simulate(args.students, args.days, args.absent_rate,
+                               args.return_rate, args.activity_rate, args.seed)
+
+    print(f"학생 {args.students}명 x 교시 {len(WEEKDAY_PERIODS)}개 x {args.days}일")
+    print(f"{'':12}{'전체 기록':>16}{'예외만 기록':>16}{'감소율':>10}")
+    for key, label in (('rows', '행 수'), ('writes', '쓰기 횟수'), ('bytes', '쓰기 바이트')):
+        reduction = 1 - exception[key] / full[key] if full[key] else 0
+        print(f"{label:12}{full[key]:>16,}{exception[key]:>16,}{reduction:>10.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+자동 자리배치 벤치마크
+Auto-seating engine on synthetic schools (time, class-boundary cost, separation violations)
+
+학년 하나(반 여러 개)를 합성 교실 레이아웃에 자동 배치하고 소요 시간과 결과 품질을 봅니다.
+반 경계 비용은 상하좌우로 다른 반 학생과 맞닿은 변의 수이고, 위반은 떨어뜨려야 할 쌍이
+대각선 포함 이웃한 수입니다.
+
+    python benchmarks/auto_seating_bench.py --students 600 --pairs 60 --fixed 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.auto_seating_service import AutoSeatingService
+from app.services.seat_grid_service import ROWS_PER_LINE
+
+def make_layout(students: int, cols_per_section: int, slack: float):
+    """좌석 열 2개(또는 지정 수)짜리 섹션을 통로(break)로 나눈 합성 레이아웃"""
+    lines = -(-int(students * (1 + slack)) // ROWS_PER_LINE)
+    sections = []
+    index = 0
+    while lines > 0:
+        cols = min(cols_per_section, lines)
+        name = f'S{index + 1}'
+        sections.append({
+            'name': name,
+            'type': 'double' if cols > 1 else 'single',
+            'cols': [{'col': f'{name}{c + 1}'} for c in range(cols)]
+        })
+        lines -= cols
+        index += 1
+        if lines > 0 and index % 3 == 0:
+            sections.append({'name': f'B{index}', 'type': 'break', 'cols': []})
+    return {
+        'classroom_key': f'bench_{students}',
+        'updated_at': 'bench',
+        'layout_config': {'sections': sections}
+    }
+
+def make_students(count: int, classes: int):
+    return [{
+        'email': f'student{i:04d}@dshs.kr',
+        'grade': 1,
+        'class_number': i % classes + 1,
+        'no': f'1{i % classes + 1:02d}{i // classes + 1:02d}'
+    } for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description='자동 자리배치 성능/품질 측정')
+    parser.add_argument('--students', type=int, default=600)
+    parser.add_argument('--classes', type=int, default=8)
+    parser.add_argument('--pairs', type=int, default=60, help='떨어뜨릴 학생 쌍 수 (같은 반에서 뽑음)')
+    parser.add_argument('--fixed', type=int, default=20, help='고정 좌석 수')
+    parser.add_argument('--cols', type=int, default=2, help='섹션당 좌석 열 수')
+    parser.add_argument('--slack', type=float, default=0.1, help='학생 수 대비 여유 좌석 비율')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    layout = make_layout(args.students, args.cols, args.slack)
+    students = make_students(args.students, args.classes)
+
+    by_class = {}
+    for student in students:
+        by_class.setdefault(student['class_number'], []).append(student['email'])
+    pairs = [rng.sample(by_class[rng.randint(1, args.classes)], 2) for _ in range(args.pairs)]
+
+    line_keys = [f"{section['name']}-{col['col']}" for section in layout['layout_config']['sections']
+                 if section['type'] != 'break' for col in section['cols']]
+    fixed_slots = rng.sample([(key, row) for key in line_keys for row in range(ROWS_PER_LINE)], args.fixed)
+    fixed = [{'email': student['email'], 'position_key': key, 'row': row}
+             for student, (key, row) in zip(rng.sample(students, args.fixed), fixed_slots)]
+
+    engine = AutoSeatingService()
+    timings = []
+    for run in range(args.runs):
+        start = time.perf_counter()
+        result = engine.arrange(layout, students, fixed=fixed, separate=pairs, seed=run)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    baseline = engine.arrange(layout, students, fixed=fixed, separate=pairs, seed=0)
+    engine.max_iterations = 0
+    greedy = engine.arrange(layout, students, fixed=fixed, separate=pairs, seed=0)
+
+    print(f"학생 {args.students}명 / 반 {args.classes}개 / 좌석 열 {len(line_keys)}개 "
+          f"({len(line_keys) * ROWS_PER_LINE}석), 떨어뜨릴 쌍 {args.pairs}, 고정 {args.fixed}")
+    print(f"{'':14}{'비용':>8}{'위반 쌍':>10}{'배치':>8}{'미배치':>8}")
+    for label, item in (('탐욕 배치만', greedy), ('지역 탐색 포함', baseline)):
+        print(f"{label:14}{item['cost']:>8}{len(item['violations']):>10}{item['placed']:>8}{len(item['unplaced']):>8}")
+    timings.sort()
+    print(f"소요 시간: 중앙값 {timings[len(timings) // 2]:.1f} ms, 최대 {timings[-1]:.1f} ms ({args.runs}회)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+좌석 현황 전송 크기 벤치마크
+Nested-dict seat payload vs rendered board JSON vs compact array encoding
+
+/seating/api/seat-arrangement가 보내던 좌석마다 키를 반복하는 중첩 딕셔너리 형식,
+render_board 결과를 그대로 직렬화한 형식, 배열 기반 압축 형식(app/utils/seat_payload.py)의
+응답 크기(원본/gzip)와 변환 시간을 비교합니다.
+
+    python benchmarks/seat_payload_bench.py --lines 30 --fill 0.9 --absent 0.1
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.seat_grid_service import SeatGrid, ROWS_PER_LINE
+from app.utils.seat_payload import encode_board
+
+SURNAMES = '김이박최정강조윤장임한오서신권황안송류홍'
+GIVEN = '민서준지현우예은도하윤채수아시연건영'
+
+def make_board(lines: int, fill: float, absent: float, activity: float, rng: random.Random):
+    """합성 교실의 render_board 결과"""
+    sections = [{
+        'name': f'S{i // 2 + 1}', 'type': 'double',
+        'cols': [{'col': f'{c + 1}'} for c in range(min(2, lines - i))]
+    } for i in range(0, lines, 2)]
+    layout = {
+        'classroom_key': 'grade_1', 'updated_at': 'bench', 'classroom_name': '1학년',
+        'bottom_left_info': '교탁', 'layout_config': {'sections': sections}
+    }
+    grid = SeatGrid(layout)
+
+    seats, users, statuses = {}, {}, {}
+    number = 0
+    for position_key in grid.line_keys:
+        emails = []
+        for _ in range(ROWS_PER_LINE):
+            if rng.random() >= fill:
+                emails.append('')
+                continue
+            number += 1
+            email = f'student{number:04d}@dshs.kr'
+            emails.append(email)
+            users[email] = {
+                'uid': f'{rng.getrandbits(128):032x}', 'email': email,
+                'name': rng.choice(SURNAMES) + rng.choice(GIVEN) + rng.choice(GIVEN),
+                'no': f'1{number % 8 + 1:02d}{number % 30 + 1:02d}', 'grade': 1, 'class_number': number % 8 + 1
+            }
+            draw = rng.random()
+            if draw < absent:
+                statuses[email] = {'status': 'absent', 'version': rng.randint(1, 10 ** 6)}
+            elif draw < absent + activity:
+                statuses[email] = {'status': 'activity', 'activity_type': '상담',
+                                   'activity_location': '상담실', 'version': rng.randint(1, 10 ** 6)}
+        seats[position_key] = emails
+
+    board = grid.render(seats, users, statuses)
+    return {
+        'success': True, 'classroom': layout, 'sections': grid.sections,
+        'seat_lines': grid.lines(board), 'seats': seats, 'date': '2026-10-19', 'period': 11
+    }
+
+def nested_dicts(board):
+    """예전 샘플 응답과 같은 모양 (좌석마다 position/student/attendance_status/activity)"""
+    sections = []
+    for section in board['sections']:
+        rows = []
+        for col in section['cols']:
+            position_key = f"{section['name']}-{col['col']}"
+            rows.append({'seats': [{
+                'position': f'{position_key}-{row}',
+                'student': {
+                    'id': seat['user']['uid'], 'name': seat['user']['name'],
+                    'student_number': seat['user']['no']
+                } if seat['user'] else None,
+                'attendance_status': seat.get('status', 'present') if seat['user'] else 'empty',
+                'activity': seat['items'][0]['place'] if seat['items'] else None
+            } for row, seat in enumerate(board['seat_lines'][position_key])]})
+        sections.append({'name': section['name'], 'rows': rows})
+    return {'success': True, 'grade': 1, 'date': board['date'], 'period': board['period'], 'sections': sections}
+
+def dumps(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def main():
+    parser = argparse.ArgumentParser(description='좌석 현황 응답 형식별 크기 비교')
+    parser.add_argument('--lines', type=int, default=30, help='좌석 열 수 (열마다 7석)')
+    parser.add_argument('--fill', type=float, default=0.9, help='좌석 점유율')
+    parser.add_argument('--absent', type=float, default=0.1)
+    parser.add_argument('--activity', type=float, default=0.05)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    board = make_board(args.lines, args.fill, args.absent, args.activity, rng)
+    seated = sum(1 for line in board['seat_lines'].values() for seat in line if seat['user'])
+
+    formats = [
+        ('중첩 딕셔너리', lambda: dumps(nested_dicts(board))),
+        ('보드 JSON', lambda: dumps(board)),
+        ('압축 배열', lambda: dumps(encode_board(board))),
+    ]
+
+    print(f"좌석 {args.lines * ROWS_PER_LINE}석, 학생 {seated}명, 반복 {args.iterations}회")
+    print(f"{'':14}{'원본':>12}{'gzip':>12}{'변환+직렬화':>14}")
+    base = None
+    for label, encode in formats:
+        payload = encode()
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            encode()
+        elapsed = (time.perf_counter() - start) / args.iterations * 1000
+        compressed = len(gzip.compress(payload))
+        base = base or (len(payload), compressed)
+        print(f"{label:14}{len(payload):>10,} B{compressed:>10,} B{elapsed:>11.3f} ms"
+              f"   ({len(payload) / base[0]:.0%} / {compressed / base[1]:.0%})")
+
+if __name__ == '__main__':
+    main()
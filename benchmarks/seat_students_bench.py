@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+좌석 현황 학생 조회 벤치마크
+Whole-school student fetch vs seated-only fetch vs shared directory
+
+get_seat_arrangement_with_status가 요청마다 전교생(users + student_profiles)을 받아
+딕셔너리를 만들던 방식과, 그 교실에 배치된 학생만 받거나 공유 학생 디렉터리에서
+찾는 방식의 응답 크기와 처리 시간을 비교합니다.
+
+    python benchmarks/seat_students_bench.py --students 600 --seated 200
+"""
+
+import argparse
+import json
+import random
+import time
+import uuid
+
+SURNAMES = '김이박최정강조윤장임한오서신권황안송류홍'
+GIVEN = '민서준지현우예은도하윤채수아시연건영'
+
+def make_students(count: int, rng: random.Random):
+    """PostgREST users?select=id,email,name,student_profiles(...) 응답 형식의 학생 목록"""
+    students = []
+    for i in range(count):
+        grade = i % 3 + 1
+        class_number = i // 3 % 8 + 1
+        students.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'email': f'student{i:04d}@dshs.kr',
+            'name': rng.choice(SURNAMES) + rng.choice(GIVEN) + rng.choice(GIVEN),
+            'student_profiles': [{
+                'student_id': f'{grade}{class_number:02d}{i % 30 + 1:02d}',
+                'grade': grade,
+                'class_number': class_number
+            }]
+        })
+    return students
+
+def to_info(user):
+    profile = user['student_profiles'][0] if user['student_profiles'] else {}
+    return {
+        'uid': user['id'],
+        'email': user['email'],
+        'name': user['name'],
+        'no': profile.get('student_id', ''),
+        'grade': profile.get('grade', 0),
+        'class_number': profile.get('class_number', 0)
+    }
+
+def whole_school(payload: bytes, seated):
+    """기존 방식: 전교생 응답을 파싱해 전체 딕셔너리를 만든 뒤 배치된 학생만 사용"""
+    users_dict = {user['email']: to_info(user) for user in json.loads(payload)}
+    return {email: users_dict[email] for email in seated if email in users_dict}
+
+def seated_only(payload: bytes, seated):
+    """배치된 학생만 email=in.(...)로 받은 응답을 파싱"""
+    return {user['email']: to_info(user) for user in json.loads(payload)}
+
+def directory(directory_map, seated):
+    """공유 학생 디렉터리 조회 (요청마다 원본 조회 없음)"""
+    return {email: directory_map[email] for email in seated if email in directory_map}
+
+def measure(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='좌석 현황 학생 조회 방식 비교')
+    parser.add_argument('--students', type=int, default=600, help='전교생 수')
+    parser.add_argument('--seated', type=int, default=200, help='교실 하나에 배치된 학생 수')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--mbps', type=float, default=50.0, help='Supabase까지의 대역폭 (전송 시간 추정용)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    students = make_students(args.students, rng)
+    seated = [student['email'] for student in rng.sample(students, min(args.seated, len(students)))]
+    seated_set = set(seated)
+
+    all_payload = json.dumps(students, ensure_ascii=False).encode('utf-8')
+    seated_payload = json.dumps([s for s in students if s['email'] in seated_set], ensure_ascii=False).encode('utf-8')
+    directory_map = {student['email']: to_info(student) for student in students}
+
+    # URL 길이 (email=in.(...) 필터)
+    in_filter = len(','.join(seated).encode('utf-8'))
+
+    rows = [
+        ('전교생 조회', len(all_payload), measure(lambda: whole_school(all_payload, seated), args.iterations)),
+        ('배치 학생만 조회', len(seated_payload), measure(lambda: seated_only(seated_payload, seated), args.iterations)),
+        ('공유 디렉터리', 0, measure(lambda: directory(directory_map, seated), args.iterations)),
+    ]
+
+    print(f"전교생 {args.students}명, 교실 배치 {len(seated)}명, 반복 {args.iterations}회")
+    print(f"{'':16}{'응답 크기':>14}{'전송(추정)':>14}{'처리 시간':>14}")
+    for label, size, elapsed in rows:
+        transfer = size * 8 / (args.mbps * 1_000_000) * 1000
+        print(f"{label:16}{size:>12,} B{transfer:>11.2f} ms{elapsed:>11.3f} ms")
+    print(f"(배치 학생만 조회 시 요청 URL의 email 필터 길이: {in_filter:,} B)")
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 # 개발 환경에서만 .env 파일 로드 (Railway에서는 무시됨)
 try:
@@ -50,6 +51,32 @@ class Config:
     SEND_FILE_MAX_AGE_DEFAULT = 31536000  # 1년 캐시
     TEMPLATES_AUTO_RELOAD = False
     
+    # 출석 기록 보관 (종료된 학기 기록을 보관 테이블로 이동)
+    ATTENDANCE_ARCHIVE_ENABLED = os.getenv('ATTENDANCE_ARCHIVE_ENABLED', 'False').lower() == 'true'
+    ATTENDANCE_ARCHIVE_INTERVAL_HOURS = int(os.getenv('ATTENDANCE_ARCHIVE_INTERVAL_HOURS', 24))
+    
+    # 옛 attendance 테이블 기록도 함께 읽기 (마이그레이션이 attendance_records로 옮겨 두므로 기본 False,
+    # 켜면 출석으로 정정해 지워진 통합 행 대신 옛 행의 예외 상태가 다시 보일 수 있음)
+    ATTENDANCE_DUAL_READ = os.getenv('ATTENDANCE_DUAL_READ', 'False').lower() == 'true'
+    
+    # 자습 부재 이상 탐지 기준 (최근 기간 내 부재 교시 수 / 연속 부재 평일 수 / 같은 교시 부재 수)
+    ANOMALY_WINDOW_DAYS = int(os.getenv('ANOMALY_WINDOW_DAYS', 14))
+    ANOMALY_MIN_ABSENCES = int(os.getenv('ANOMALY_MIN_ABSENCES', 4))
+    ANOMALY_STREAK_DAYS = int(os.getenv('ANOMALY_STREAK_DAYS', 3))
+    ANOMALY_PERIOD_ABSENCES = int(os.getenv('ANOMALY_PERIOD_ABSENCES', 3))
+    ANOMALY_PERIODS = [int(period) for period in os.getenv('ANOMALY_PERIODS', '11,12').split(',')]
+    
+    # 좌석 현황 실시간 스트림 (채널별 보관 변경분 수 / keepalive 주기 / 연결 유지 시간, 초)
+    SEAT_STREAM_BUFFER = int(os.getenv('SEAT_STREAM_BUFFER', 500))
+    SEAT_STREAM_KEEPALIVE = int(os.getenv('SEAT_STREAM_KEEPALIVE', 15))
+    SEAT_STREAM_MAX_SECONDS = int(os.getenv('SEAT_STREAM_MAX_SECONDS', 120))
+    # 워커 프로세스당 동시 스트림 수 (연결마다 gthread 스레드 하나를 점유하므로 Procfile의 --threads보다
+    # 작게 유지, 기본값은 32 스레드 중 8개를 일반 요청용으로 남김, 넘으면 503 + Retry-After)
+    SEAT_STREAM_MAX_STREAMS = int(os.getenv('SEAT_STREAM_MAX_STREAMS', 24))
+    
+    # 학기 분석 큐브 파일 위치 (같은 서버의 워커들이 공유)
+    ATTENDANCE_CUBE_DIR = os.getenv('ATTENDANCE_CUBE_DIR', os.path.join(tempfile.gettempdir(), 'attendance_cube'))
+    
     # 역할 기반 접근 제어 설정
     ROLES = {
         'student': {
@@ -296,7 +296,7 @@ CREATE TABLE IF NOT EXISTS attendance_records (
     period INTEGER NOT NULL CHECK (period >= 1 AND period <= 25), -- 교시 (1-7: 일반교시, 11-15: 자습, 21-25: 식사/외박)
     student_id UUID REFERENCES users(id) ON DELETE CASCADE,
     student_email VARCHAR(255) NOT NULL, -- 이메일도 저장 (성능 최적화)
-    status VARCHAR(20) DEFAULT 'present' CHECK (status IN ('present', 'absent', 'returned', 'activity')),
+    status VARCHAR(20) NOT NULL CHECK (status IN ('absent', 'returned', 'activity')), -- 예외 상태만 저장 (기록 없음 = 출석)
     marked_by UUID REFERENCES users(id), -- 처리한 교사
     marked_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     returned_by UUID REFERENCES users(id), -- 복귀 처리한 교사
@@ -305,7 +305,8 @@ CREATE TABLE IF NOT EXISTS attendance_records (
     activity_type VARCHAR(100), -- 활동 유형 (분임토의실, 특별활동 등)
     activity_location VARCHAR(100), -- 활동 장소
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(attendance_date, period, student_id) -- 날짜/교시/학생별 현재 상태는 1행
 );
 
 -- 교시 설정 테이블
@@ -369,6 +370,7 @@ CREATE INDEX IF NOT EXISTS idx_seat_arrangements_date ON seat_arrangements(arran
 CREATE INDEX IF NOT EXISTS idx_seat_arrangements_position ON seat_arrangements(position_key);
 
 CREATE INDEX IF NOT EXISTS idx_attendance_records_date_period ON attendance_records(attendance_date, period);
+CREATE INDEX IF NOT EXISTS idx_attendance_records_keyset ON attendance_records(attendance_date, period, id); -- 내보내기 키셋 페이지네이션
 CREATE INDEX IF NOT EXISTS idx_attendance_records_student_email ON attendance_records(student_email);
 CREATE INDEX IF NOT EXISTS idx_attendance_records_student_id ON attendance_records(student_id);
 CREATE INDEX IF NOT EXISTS idx_attendance_records_status ON attendance_records(status);
@@ -547,16 +549,465 @@ INSERT INTO seat_arrangements (classroom, position_key, student_emails, arrangem
 
 ON CONFLICT (classroom, position_key, arrangement_date) DO NOTHING;
 
--- 오늘 출석 샘플 데이터 (자습시간 11교시)
+-- 오늘 출석 샘플 데이터 (자습시간 11교시, 예외 상태만 저장 - 나머지 학생은 출석)
 INSERT INTO attendance_records (attendance_date, period, student_id, student_email, status, notes) VALUES
-(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student1@school.com'), 'student1@school.com', 'present', '정상 출석'),
-(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student2@school.com'), 'student2@school.com', 'present', '정상 출석'),
 (CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student3@school.com'), 'student3@school.com', 'absent', '화장실'),
 (CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student4@school.com'), 'student4@school.com', 'activity', '분임토의실'),
-(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student5@school.com'), 'student5@school.com', 'present', '정상 출석'),
-(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student6@school.com'), 'student6@school.com', 'present', '정상 출석'),
-(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student7@school.com'), 'student7@school.com', 'present', '정상 출석'),
-(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student8@school.com'), 'student8@school.com', 'absent', '의무실'),
-(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student9@school.com'), 'student9@school.com', 'present', '정상 출석'),
-(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student10@school.com'), 'student10@school.com', 'present', '정상 출석')
-ON CONFLICT (attendance_date, period, student_id) DO NOTHING;
\ No newline at end of file
+(CURRENT_DATE, 11, (SELECT id FROM users WHERE email = 'student8@school.com'), 'student8@school.com', 'absent', '의무실')
+ON CONFLICT (attendance_date, period, student_id) DO NOTHING;
+
+-- =============================================================================
+-- 출석 이벤트 로그 (추가 전용)
+-- 부재/복귀/활동/정정 요청을 그대로 쌓고, 트리거가 attendance_records(현재 상태)로 압축합니다.
+-- =============================================================================
+
+-- 기존 DB에 attendance_records 유니크 제약이 없다면 추가
+CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_records_date_period_student
+    ON attendance_records(attendance_date, period, student_id);
+
+CREATE TABLE IF NOT EXISTS attendance_events (
+    id BIGSERIAL PRIMARY KEY, -- 적재 순서 = 재생 순서
+    attendance_date DATE NOT NULL,
+    period INTEGER NOT NULL CHECK (period >= 1 AND period <= 25),
+    student_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    student_email VARCHAR(255) NOT NULL,
+    event_type VARCHAR(20) NOT NULL CHECK (event_type IN ('miss', 'return', 'activity', 'correction')),
+    status VARCHAR(20) CHECK (status IN ('present', 'absent', 'returned', 'activity')), -- correction 이벤트의 지정 상태
+    actor_id UUID REFERENCES users(id), -- 처리한 교사
+    notes TEXT,
+    activity_type VARCHAR(100),
+    activity_location VARCHAR(100),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_attendance_events_date_period ON attendance_events(attendance_date, period);
+CREATE INDEX IF NOT EXISTS idx_attendance_events_student_email ON attendance_events(student_email, attendance_date);
+
+-- 이벤트 1건을 현재 상태 테이블에 반영 (miss: 이미 부재면 무시, return: 부재일 때만 복귀)
+CREATE OR REPLACE FUNCTION apply_attendance_event_row(e attendance_events)
+RETURNS VOID AS $$
+DECLARE
+    current_status VARCHAR(20);
+    next_status VARCHAR(20);
+BEGIN
+    -- 보관된 기록에 대한 이벤트는 기록을 현재 테이블로 되돌린 뒤 반영 (다음 보관 작업 때 다시 이동)
+    IF e.attendance_date < attendance_archive_cutoff() THEN
+        WITH restored AS (
+            DELETE FROM attendance_records_archive
+             WHERE attendance_date = e.attendance_date AND period = e.period AND student_id = e.student_id
+            RETURNING *
+        )
+        INSERT INTO attendance_records SELECT * FROM restored;
+    END IF;
+
+    SELECT status INTO current_status
+      FROM attendance_records
+     WHERE attendance_date = e.attendance_date AND period = e.period AND student_id = e.student_id
+       FOR UPDATE;
+
+    IF e.event_type = 'miss' THEN
+        IF current_status = 'absent' THEN RETURN; END IF;
+        next_status := 'absent';
+    ELSIF e.event_type = 'return' THEN
+        IF current_status IS DISTINCT FROM 'absent' THEN RETURN; END IF;
+        next_status := 'returned';
+    ELSIF e.event_type = 'activity' THEN
+        next_status := 'activity';
+    ELSE
+        next_status := COALESCE(e.status, 'present');
+    END IF;
+
+    -- 출석은 저장하지 않음 (기록 삭제 = 출석)
+    IF next_status = 'present' THEN
+        DELETE FROM attendance_records
+         WHERE attendance_date = e.attendance_date AND period = e.period AND student_id = e.student_id;
+        RETURN;
+    END IF;
+
+    INSERT INTO attendance_records (attendance_date, period, student_id, student_email, class_id, status,
+                                    marked_by, marked_at, returned_by, returned_at,
+                                    notes, activity_type, activity_location)
+    VALUES (e.attendance_date, e.period, e.student_id, e.student_email, e.class_id, next_status,
+            CASE WHEN next_status <> 'returned' THEN e.actor_id END,
+            CASE WHEN next_status <> 'returned' THEN e.created_at END,
+            CASE WHEN next_status = 'returned' THEN e.actor_id END,
+            CASE WHEN next_status = 'returned' THEN e.created_at END,
+            e.notes, e.activity_type, e.activity_location)
+    ON CONFLICT (attendance_date, period, student_id) DO UPDATE SET
+        class_id = COALESCE(EXCLUDED.class_id, attendance_records.class_id),
+        status = EXCLUDED.status,
+        marked_by = COALESCE(EXCLUDED.marked_by, attendance_records.marked_by),
+        marked_at = COALESCE(EXCLUDED.marked_at, attendance_records.marked_at),
+        returned_by = COALESCE(EXCLUDED.returned_by, attendance_records.returned_by),
+        returned_at = COALESCE(EXCLUDED.returned_at, attendance_records.returned_at),
+        notes = EXCLUDED.notes,
+        activity_type = EXCLUDED.activity_type,
+        activity_location = EXCLUDED.activity_location,
+        version = nextval('attendance_record_version_seq');
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_attendance_event()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_attendance_event_row(NEW);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER apply_attendance_events
+    AFTER INSERT ON attendance_events
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_attendance_event();
+
+-- 기간 내 현재 상태를 이벤트 재생으로 다시 만들기 (집계 재구성/복구용)
+CREATE OR REPLACE FUNCTION rebuild_attendance_records(p_from DATE, p_to DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    e attendance_events;
+    replayed INTEGER := 0;
+BEGIN
+    DELETE FROM attendance_records
+     WHERE attendance_date BETWEEN p_from AND p_to
+       AND EXISTS (SELECT 1 FROM attendance_events ev
+                    WHERE ev.attendance_date = attendance_records.attendance_date
+                      AND ev.period = attendance_records.period
+                      AND ev.student_id = attendance_records.student_id);
+
+    DELETE FROM attendance_records_archive
+     WHERE attendance_date BETWEEN p_from AND p_to
+       AND EXISTS (SELECT 1 FROM attendance_events ev
+                    WHERE ev.attendance_date = attendance_records_archive.attendance_date
+                      AND ev.period = attendance_records_archive.period
+                      AND ev.student_id = attendance_records_archive.student_id);
+
+    FOR e IN SELECT * FROM attendance_events
+              WHERE attendance_date BETWEEN p_from AND p_to
+              ORDER BY id
+    LOOP
+        PERFORM apply_attendance_event_row(e);
+        replayed := replayed + 1;
+    END LOOP;
+
+    RETURN replayed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- 출석 기록 보관 (현재 학기: attendance_records / 종료된 학기: 월별 파티션 보관 테이블)
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS attendance_records_archive (
+    LIKE attendance_records INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (attendance_date, id),
+    UNIQUE (attendance_date, period, student_id),
+    FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+) PARTITION BY RANGE (attendance_date);
+
+-- 월 파티션이 없는 날짜를 위한 기본 파티션
+CREATE TABLE IF NOT EXISTS attendance_records_archive_default
+    PARTITION OF attendance_records_archive DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_attendance_records_archive_keyset ON attendance_records_archive(attendance_date, period, id);
+CREATE INDEX IF NOT EXISTS idx_attendance_records_archive_student_email ON attendance_records_archive(student_email, attendance_date);
+
+-- 보관 경계 (이 날짜 이전 기록은 보관 테이블에 있음, 1행)
+CREATE TABLE IF NOT EXISTS attendance_archive_state (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    archived_before DATE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION attendance_archive_cutoff()
+RETURNS DATE AS $$
+    SELECT COALESCE((SELECT archived_before FROM attendance_archive_state WHERE id = 1), '-infinity'::DATE);
+$$ LANGUAGE sql STABLE;
+
+-- 월 파티션 생성 (예: attendance_records_archive_202603)
+CREATE OR REPLACE FUNCTION ensure_attendance_archive_partition(p_month DATE)
+RETURNS VOID AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF attendance_records_archive FOR VALUES FROM (%L) TO (%L)',
+        'attendance_records_archive_' || to_char(month_start, 'YYYYMM'),
+        month_start,
+        (month_start + INTERVAL '1 month')::DATE
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- p_before 이전 기록을 한 묶음 이동 (이동한 행 수 반환, p_batch_size 미만이면 완료)
+-- 경계를 먼저 올려서 이동 중에도 조회가 두 테이블을 함께 읽도록 함
+CREATE OR REPLACE FUNCTION archive_attendance_records(p_before DATE, p_batch_size INTEGER DEFAULT 5000)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE;
+    moved INTEGER;
+BEGIN
+    -- 다른 워커가 보관 중이면 건너뜀
+    IF NOT pg_try_advisory_xact_lock(hashtext('archive_attendance_records')) THEN
+        RETURN 0;
+    END IF;
+
+    INSERT INTO attendance_archive_state (id, archived_before) VALUES (1, p_before)
+    ON CONFLICT (id) DO UPDATE SET
+        archived_before = GREATEST(attendance_archive_state.archived_before, EXCLUDED.archived_before),
+        updated_at = NOW();
+
+    FOR month_start IN
+        SELECT DISTINCT date_trunc('month', attendance_date)::DATE
+          FROM attendance_records
+         WHERE attendance_date < p_before
+    LOOP
+        PERFORM ensure_attendance_archive_partition(month_start);
+    END LOOP;
+
+    WITH moved_rows AS (
+        DELETE FROM attendance_records
+         WHERE id IN (SELECT id FROM attendance_records
+                       WHERE attendance_date < p_before
+                       ORDER BY attendance_date, period, id
+                       LIMIT p_batch_size)
+        RETURNING *
+    )
+    INSERT INTO attendance_records_archive SELECT * FROM moved_rows
+    ON CONFLICT (attendance_date, period, student_id) DO UPDATE SET
+        status = EXCLUDED.status,
+        marked_by = EXCLUDED.marked_by,
+        marked_at = EXCLUDED.marked_at,
+        returned_by = EXCLUDED.returned_by,
+        returned_at = EXCLUDED.returned_at,
+        notes = EXCLUDED.notes,
+        activity_type = EXCLUDED.activity_type,
+        activity_location = EXCLUDED.activity_location,
+        updated_at = EXCLUDED.updated_at,
+        class_id = EXCLUDED.class_id,
+        version = EXCLUDED.version;
+    GET DIAGNOSTICS moved = ROW_COUNT;
+
+    RETURN moved;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- 예외 상태만 저장하도록 기존 데이터 변환
+-- 출석(present)은 기록하지 않고 명단과 교시 설정으로 계산합니다.
+-- =============================================================================
+
+DELETE FROM attendance_records WHERE status = 'present';
+DELETE FROM attendance_records_archive WHERE status = 'present';
+
+ALTER TABLE attendance_records ALTER COLUMN status DROP DEFAULT;
+ALTER TABLE attendance_records DROP CONSTRAINT IF EXISTS attendance_records_status_check;
+ALTER TABLE attendance_records ADD CONSTRAINT attendance_records_status_check
+    CHECK (status IN ('absent', 'returned', 'activity'));
+
+-- =============================================================================
+-- 출석 저장소 통합 (attendance -> attendance_records)
+-- 대시보드 학급 출석(attendance)도 attendance_records 한 곳에 저장합니다.
+-- 상태: 출석 -> 기록 없음, 지각 -> late, 조퇴 -> early_leave, 결석 -> absent, 공결 -> excused
+-- attendance 테이블은 이중 읽기 기간(ATTENDANCE_DUAL_READ) 동안만 유지 후 삭제합니다.
+-- =============================================================================
+
+ALTER TABLE attendance_records ADD COLUMN IF NOT EXISTS class_id UUID REFERENCES classes(id) ON DELETE SET NULL;
+ALTER TABLE attendance_records_archive ADD COLUMN IF NOT EXISTS class_id UUID;
+ALTER TABLE attendance_events ADD COLUMN IF NOT EXISTS class_id UUID REFERENCES classes(id) ON DELETE SET NULL;
+
+ALTER TABLE attendance_records DROP CONSTRAINT IF EXISTS attendance_records_status_check;
+ALTER TABLE attendance_records ADD CONSTRAINT attendance_records_status_check
+    CHECK (status IN ('absent', 'returned', 'activity', 'late', 'early_leave', 'excused'));
+ALTER TABLE attendance_records_archive DROP CONSTRAINT IF EXISTS attendance_records_status_check;
+ALTER TABLE attendance_records_archive ADD CONSTRAINT attendance_records_status_check
+    CHECK (status IN ('absent', 'returned', 'activity', 'late', 'early_leave', 'excused'));
+ALTER TABLE attendance_events DROP CONSTRAINT IF EXISTS attendance_events_status_check;
+ALTER TABLE attendance_events ADD CONSTRAINT attendance_events_status_check
+    CHECK (status IN ('present', 'absent', 'returned', 'activity', 'late', 'early_leave', 'excused'));
+
+CREATE INDEX IF NOT EXISTS idx_attendance_records_student_date ON attendance_records(student_email, attendance_date DESC, period DESC);
+CREATE INDEX IF NOT EXISTS idx_attendance_records_class_date ON attendance_records(class_id, attendance_date);
+
+-- 기존 학급 출석 이관 (출석은 기록하지 않음, 이미 있는 날짜/교시/학생은 유지)
+INSERT INTO attendance_records (attendance_date, period, student_id, student_email, class_id, status, notes, marked_at, created_at)
+SELECT a.attendance_date, a.period, u.id, a.student_email, a.class_id,
+       CASE a.status WHEN '지각' THEN 'late' WHEN '조퇴' THEN 'early_leave'
+                     WHEN '결석' THEN 'absent' WHEN '공결' THEN 'excused' END,
+       a.note, a.updated_at, a.created_at
+  FROM attendance a
+  JOIN users u ON u.email = a.student_email
+ WHERE a.status <> '출석'
+ON CONFLICT (attendance_date, period, student_id) DO NOTHING;
+
+-- 교실 명단 조회 (교실/날짜별 활성 배치의 학생 이메일만)
+CREATE INDEX IF NOT EXISTS idx_seat_arrangements_members
+    ON seat_arrangements(classroom, arrangement_date) INCLUDE (student_emails) WHERE is_active;
+
+-- =============================================================================
+-- 출석 기록 버전 (낙관적 동시성 제어)
+-- 기록이 바뀔 때마다 전역 시퀀스에서 새 버전을 받습니다. 기록이 없으면(출석) 버전 0.
+-- =============================================================================
+
+CREATE SEQUENCE IF NOT EXISTS attendance_record_version_seq;
+ALTER TABLE attendance_records ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT nextval('attendance_record_version_seq');
+ALTER TABLE attendance_records_archive ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+
+-- 출석 이벤트 기록과 상태 전이를 한 번의 호출로 적용하고 항목별 결과 반환 (사전 조회 없음)
+-- p_events 항목에 expected_version이 있으면 현재 버전과 같을 때만 적용합니다.
+-- reason: NULL = 적용, 'noop' = 바뀔 상태 없음 (예: 이미 부재), 'conflict' = 버전 불일치
+CREATE OR REPLACE FUNCTION record_attendance_events(p_events JSONB)
+RETURNS TABLE (idx INTEGER, applied BOOLEAN, previous_status VARCHAR, status VARCHAR, version BIGINT, reason TEXT) AS $$
+#variable_conflict use_column
+DECLARE
+    item JSONB;
+    e attendance_events;
+    expected BIGINT;
+    cur_status VARCHAR(20);
+    cur_version BIGINT;
+    new_status VARCHAR(20);
+BEGIN
+    FOR item, idx IN
+        SELECT value, (ordinality - 1)::INTEGER FROM jsonb_array_elements(p_events) WITH ORDINALITY
+    LOOP
+        e := jsonb_populate_record(NULL::attendance_events, item);
+        expected := (item->>'expected_version')::BIGINT;
+
+        -- 같은 날짜/교시/학생에 대한 동시 쓰기 직렬화 (기록이 없는 출석 상태도 잠금)
+        PERFORM pg_advisory_xact_lock(hashtext(e.attendance_date::TEXT || '/' || e.period || '/' || e.student_id::TEXT));
+
+        SELECT r.status, r.version INTO cur_status, cur_version
+          FROM attendance_records r
+         WHERE r.attendance_date = e.attendance_date AND r.period = e.period AND r.student_id = e.student_id;
+
+        IF NOT FOUND AND e.attendance_date < attendance_archive_cutoff() THEN
+            SELECT a.status, a.version INTO cur_status, cur_version
+              FROM attendance_records_archive a
+             WHERE a.attendance_date = e.attendance_date AND a.period = e.period AND a.student_id = e.student_id;
+        END IF;
+
+        previous_status := COALESCE(cur_status, 'present');
+        cur_version := COALESCE(cur_version, 0);
+
+        IF expected IS NOT NULL AND expected <> cur_version THEN
+            applied := FALSE; status := previous_status; version := cur_version; reason := 'conflict';
+            RETURN NEXT;
+            CONTINUE;
+        END IF;
+
+        new_status := CASE e.event_type
+            WHEN 'miss' THEN CASE WHEN cur_status = 'absent' THEN NULL ELSE 'absent' END
+            WHEN 'return' THEN CASE WHEN cur_status = 'absent' THEN 'returned' END
+            WHEN 'activity' THEN 'activity'
+            ELSE COALESCE(e.status, 'present')
+        END;
+
+        IF new_status IS NULL THEN
+            applied := FALSE; status := previous_status; version := cur_version; reason := 'noop';
+            RETURN NEXT;
+            CONTINUE;
+        END IF;
+
+        -- 적용되는 이벤트만 기록 (현재 상태 반영은 apply_attendance_events 트리거)
+        INSERT INTO attendance_events (attendance_date, period, student_id, student_email, event_type, status,
+                                       actor_id, notes, activity_type, activity_location, class_id)
+        VALUES (e.attendance_date, e.period, e.student_id, e.student_email, e.event_type, e.status,
+                e.actor_id, e.notes, e.activity_type, e.activity_location, e.class_id);
+
+        SELECT r.version INTO cur_version
+          FROM attendance_records r
+         WHERE r.attendance_date = e.attendance_date AND r.period = e.period AND r.student_id = e.student_id;
+
+        applied := TRUE; status := new_status; version := COALESCE(cur_version, 0); reason := NULL;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- 자리배치 버전 (유효 기간)
+-- 자리배치는 바뀐 날짜에만 새 버전으로 저장하고 다음 버전 시작 전까지 유효합니다.
+-- seat_arrangements.arrangement_date = 해당 버전의 effective_from
+-- effective_to는 배타적이며 NULL이면 이후 계속 유효합니다.
+-- =============================================================================
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+CREATE TABLE IF NOT EXISTS seat_arrangement_versions (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    classroom VARCHAR(50) NOT NULL,
+    effective_from DATE NOT NULL,
+    effective_to DATE, -- 배타적, NULL = 계속 유효
+    created_by UUID REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(classroom, effective_from),
+    CHECK (effective_to IS NULL OR effective_to > effective_from),
+    -- 같은 교실의 유효 기간은 겹치지 않음
+    EXCLUDE USING gist (classroom WITH =, daterange(effective_from, effective_to) WITH &&)
+);
+
+-- 기존 날짜별 배치를 버전으로 변환 (다음 배치 날짜까지 유효)
+INSERT INTO seat_arrangement_versions (classroom, effective_from, effective_to)
+SELECT classroom, arrangement_date,
+       LEAD(arrangement_date) OVER (PARTITION BY classroom ORDER BY arrangement_date)
+  FROM (SELECT DISTINCT classroom, arrangement_date FROM seat_arrangements WHERE is_active) dates
+ON CONFLICT (classroom, effective_from) DO NOTHING;
+
+-- 날짜 p_date에 시작하는 버전을 열고 그 버전 행 반환 (이미 있으면 그대로 반환)
+-- 그날 유효하던 버전은 p_date에서 끝나고, 새 버전은 그 버전의 종료일까지 유효하며 좌석을 복사해 시작합니다.
+-- 유효하던 버전이 없으면 다음 버전 시작일(없으면 NULL)까지 빈 배치로 시작합니다.
+CREATE OR REPLACE FUNCTION open_seat_arrangement_version(p_classroom VARCHAR, p_date DATE, p_created_by UUID)
+RETURNS seat_arrangement_versions AS $$
+DECLARE
+    prev seat_arrangement_versions;
+    result seat_arrangement_versions;
+    next_from DATE;
+BEGIN
+    -- 같은 교실의 버전 분할 직렬화
+    PERFORM pg_advisory_xact_lock(hashtext('seat_arrangement_versions/' || p_classroom));
+
+    SELECT * INTO result FROM seat_arrangement_versions
+     WHERE classroom = p_classroom AND effective_from = p_date;
+    IF FOUND THEN
+        RETURN result;
+    END IF;
+
+    SELECT * INTO prev FROM seat_arrangement_versions
+     WHERE classroom = p_classroom AND effective_from < p_date
+       AND (effective_to IS NULL OR effective_to > p_date)
+     ORDER BY effective_from DESC LIMIT 1;
+
+    IF FOUND THEN
+        UPDATE seat_arrangement_versions SET effective_to = p_date WHERE id = prev.id;
+        next_from := prev.effective_to;
+
+        INSERT INTO seat_arrangements (classroom, position_key, student_emails, arrangement_date, created_by, is_active)
+        SELECT classroom, position_key, student_emails, p_date, p_created_by, true
+          FROM seat_arrangements
+         WHERE classroom = p_classroom AND arrangement_date = prev.effective_from AND is_active;
+    ELSE
+        SELECT MIN(effective_from) INTO next_from FROM seat_arrangement_versions
+         WHERE classroom = p_classroom AND effective_from > p_date;
+    END IF;
+
+    INSERT INTO seat_arrangement_versions (classroom, effective_from, effective_to, created_by)
+    VALUES (p_classroom, p_date, next_from, p_created_by)
+    RETURNING * INTO result;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 날짜에 유효한 모든 교실의 자리배치를 한 번에 조회 (건물 전체 좌석 현황)
+CREATE OR REPLACE FUNCTION get_building_seats(p_date DATE)
+RETURNS TABLE (classroom VARCHAR, effective_from DATE, position_key VARCHAR, student_emails TEXT[]) AS $$
+    SELECT s.classroom, v.effective_from, s.position_key, s.student_emails
+      FROM seat_arrangement_versions v
+      JOIN seat_arrangements s
+        ON s.classroom = v.classroom AND s.arrangement_date = v.effective_from AND s.is_active
+     WHERE v.effective_from <= p_date AND (v.effective_to IS NULL OR v.effective_to > p_date)
+     ORDER BY s.classroom, s.position_key;
+$$ LANGUAGE sql STABLE;
+
+-- 학생 이메일로 자리배치 행 찾기 (student_emails @> ARRAY[...], PostgREST cs.{...})
+CREATE INDEX IF NOT EXISTS idx_seat_arrangements_student_emails
+    ON seat_arrangements USING GIN (student_emails);
@@ -4,6 +4,7 @@ Flask 애플리케이션 실행 스크립트
 """
 
 import os
+import click
 from app import create_app, db
 from app.models.user import User
 
@@ -38,6 +39,28 @@ def create_admin():
     db.session.commit()
     print(f'관리자 계정이 생성되었습니다: {admin.email}')
 
+@app.cli.command()
+def archive_attendance():
+    """종료된 학기 출석 기록 보관"""
+    from app.services.archive_service import archive_service
+    result = archive_service.run_once()
+    if result['success']:
+        print(f"{result['archived_before']} 이전 출석 기록 {result['archived_count']}건을 보관했습니다.")
+    else:
+        print(f"출석 기록 보관 실패: {result['error']}")
+
+@app.cli.command()
+@click.argument('date_from')
+@click.argument('date_to')
+def rebuild_attendance(date_from, date_to):
+    """출석 이벤트 로그로 기간 내 출석 기록 재구성 (YYYY-MM-DD YYYY-MM-DD)"""
+    from app.services.attendance_event_service import attendance_events
+    result = attendance_events.rebuild(date_from, date_to)
+    if result['success']:
+        print(f"{date_from} ~ {date_to} 출석 이벤트 {result['replayed_count']}건을 다시 적용했습니다. 웹 워커를 재시작하세요.")
+    else:
+        print(f"출석 기록 재구성 실패: {result['error']}")
+
 if __name__ == '__main__':
     # 개발 환경에서만 HTTPS 비활성화
     if os.getenv('FLASK_ENV') != 'production':